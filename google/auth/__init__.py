@@ -16,11 +16,15 @@
 
 import logging
 
+from google.auth._bulk_refresh import refresh_many
+from google.auth._bulk_refresh import RefreshOutcome
 from google.auth._default import default
 
 
 __all__ = [
     'default',
+    'refresh_many',
+    'RefreshOutcome',
 ]
 
 
@@ -0,0 +1,178 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Refreshing many credentials at once."""
+
+import collections
+import threading
+
+from six.moves import queue
+
+from google.auth import _helpers
+from google.auth import exceptions
+
+_DEFAULT_MAX_WORKERS = 8
+
+
+RefreshOutcome = collections.namedtuple(
+    'RefreshOutcome', ['credentials', 'error'])
+"""The outcome of refreshing one of the credentials passed to
+:func:`refresh_many`.
+
+Attributes:
+    credentials (google.auth.credentials.Credentials): The credentials.
+    error (Optional[Exception]): The error raised by the refresh, or None if
+        the credentials were refreshed.
+"""
+
+
+class _BulkRefresh(object):
+    """The state shared by the worker threads of :func:`refresh_many`.
+
+    Args:
+        credentials (Sequence[google.auth.credentials.Credentials]): The
+            credentials to refresh.
+        request (google.auth.transport.Request): The object used to make
+            HTTP requests.
+        deadline (Optional[float]): When to stop starting refreshes, on the
+            monotonic clock.
+    """
+
+    def __init__(self, credentials, request, deadline):
+        self._credentials = credentials
+        self._request = request
+        self._deadline = deadline
+        self._pending = queue.Queue()
+        for index in range(len(credentials)):
+            self._pending.put(index)
+        self._lock = threading.Lock()
+        self._errors = {}
+        self._remaining = len(credentials)
+        self.done = threading.Event()
+        if not credentials:
+            self.done.set()
+
+    def _refresh(self, credentials):
+        """Refreshes one set of credentials, unless the deadline passed.
+
+        Returns:
+            Optional[Exception]: The error, if any.
+        """
+        # pylint: disable=protected-access
+        if (self._deadline is not None and
+                _helpers.monotonic() >= self._deadline):
+            return _deadline_error()
+        try:
+            with credentials._refresh_lock:
+                credentials.refresh(self._request)
+        except Exception as exc:  # pylint: disable=broad-except
+            return exc
+        return None
+
+    def work(self):
+        """Refreshes credentials until none are left."""
+        while True:
+            try:
+                index = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            error = self._refresh(self._credentials[index])
+            with self._lock:
+                self._errors[index] = error
+                self._remaining -= 1
+                if not self._remaining:
+                    self.done.set()
+
+    def outcomes(self):
+        """Returns the outcome for each set of credentials, in order.
+
+        Credentials whose refresh didn't finish get an error saying so.
+        """
+        with self._lock:
+            errors = dict(self._errors)
+        return [
+            RefreshOutcome(credentials, errors.get(index, _deadline_error()))
+            for index, credentials in enumerate(self._credentials)]
+
+
+def _deadline_error():
+    """Returns the error for credentials not refreshed before the
+    deadline."""
+    return exceptions.RefreshError(
+        'The deadline passed before the credentials were refreshed.')
+
+
+def refresh_many(credentials, request, max_workers=_DEFAULT_MAX_WORKERS,
+                 deadline=None):
+    """Refreshes many credentials concurrently.
+
+    The credentials are refreshed by up to ``max_workers`` threads, which all
+    use the same ``request``. This means they share its connection pool, so
+    the transport must be thread-safe, as
+    :class:`google.auth.transport.urllib3.Request` is. Each set of
+    credentials is refreshed while holding the lock that
+    :meth:`~google.auth.credentials.Credentials.before_request` holds, so
+    refreshes don't overlap with refreshes made by other threads.
+
+    Errors don't stop the other refreshes. They are returned in the outcome
+    of the credentials that failed instead::
+
+        outcomes = google.auth.refresh_many(
+            [credentials.with_subject(user) for user in users], request,
+            max_workers=16, deadline=30)
+        failed = [outcome for outcome in outcomes if outcome.error]
+
+    Args:
+        credentials (Iterable[google.auth.credentials.Credentials]): The
+            credentials to refresh.
+        request (google.auth.transport.Request): The object used to make
+            HTTP requests.
+        max_workers (int): The maximum number of refreshes in progress at
+            once.
+        deadline (Optional[float]): The number of seconds after which to
+            return, whether or not all refreshes finished. Refreshes in
+            progress at that time continue in the background, refreshes not
+            yet started are skipped. If None, wait for all refreshes.
+
+    Returns:
+        Sequence[RefreshOutcome]: The outcome for each set of credentials, in
+            the order they were given. Credentials that weren't refreshed
+            before the deadline have a
+            :class:`~google.auth.exceptions.RefreshError`.
+
+    Raises:
+        ValueError: If ``max_workers`` is not positive.
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be positive.')
+
+    credentials = list(credentials)
+    if deadline is not None:
+        deadline_at = _helpers.monotonic() + deadline
+    else:
+        deadline_at = None
+    bulk = _BulkRefresh(credentials, request, deadline_at)
+
+    for _ in range(min(max_workers, len(credentials))):
+        thread = threading.Thread(
+            target=bulk.work, name='google-auth-refresh-many')
+        thread.daemon = True
+        thread.start()
+
+    if deadline is None:
+        bulk.done.wait()
+    else:
+        bulk.done.wait(max(deadline_at - _helpers.monotonic(), 0))
+
+    return bulk.outcomes()
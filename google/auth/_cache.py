@@ -0,0 +1,317 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded, thread-safe least-recently-used caches, whose items may
+expire."""
+
+import collections
+
+from google.auth import _fork
+from google.auth import _helpers
+
+
+# Serializes the creation of caches held by other objects, see get_or_create.
+_create_lock = _fork.Lock()
+
+
+def get_or_create(obj, name, create):
+    """Returns a cache held in an attribute of an object, creating it on
+    first use.
+
+    Objects create their caches on demand so that the many objects that
+    never use them stay small. Concurrent first uses create a single cache.
+
+    Args:
+        obj (Any): The object holding the cache.
+        name (str): The name of the attribute, None until the cache is
+            created.
+        create (Callable[[], Any]): Creates the cache.
+
+    Returns:
+        Any: The cache.
+    """
+    cache = getattr(obj, name)
+    if cache is None:
+        with _create_lock:
+            cache = getattr(obj, name)
+            if cache is None:
+                cache = create()
+                setattr(obj, name, cache)
+    return cache
+
+
+class LRUCache(object):
+    """A mapping that holds at most ``maxsize`` items, discarding the least
+    recently used item when full.
+
+    Items can optionally be weighed, in which case the least recently used
+    items are also discarded when the total weight exceeds ``maxweight``. The
+    most recently added item is never discarded for being too heavy.
+
+    All operations are thread-safe.
+
+    Args:
+        maxsize (int): The maximum number of items.
+        maxweight (Optional[int]): The maximum total weight of the items.
+        weigher (Optional[Callable[[Any], int]]): Returns the weight of an
+            item. Required if ``maxweight`` is specified.
+    """
+
+    def __init__(self, maxsize, maxweight=None, weigher=None):
+        if maxweight is not None and weigher is None:
+            raise ValueError('A weigher is required to limit the weight.')
+        self.maxsize = maxsize
+        self.maxweight = maxweight
+        self._weigher = weigher
+        self._items = collections.OrderedDict()
+        self._weights = {}
+        self._lock = _fork.Lock()
+        self.weight = 0
+        """int: The total weight of the items."""
+        self.evictions = 0
+        """int: The number of items discarded to make room for others."""
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def _touch(self, key):
+        """Marks an item as the most recently used."""
+        value = self._items.pop(key)
+        self._items[key] = value
+        return value
+
+    def _add(self, key, value):
+        """Adds an item as the most recently used."""
+        self._items[key] = value
+        if self._weigher is not None:
+            weight = self._weigher(value)
+            self._weights[key] = weight
+            self.weight += weight
+
+    def _remove(self, key):
+        """Removes an item."""
+        value = self._items.pop(key)
+        self.weight -= self._weights.pop(key, 0)
+        return value
+
+    def _too_heavy(self):
+        """Checks if the items weigh more than allowed."""
+        return self.maxweight is not None and self.weight > self.maxweight
+
+    def _evict(self):
+        """Discards the least recently used items until the cache fits."""
+        while len(self._items) > self.maxsize or (
+                self._too_heavy() and len(self._items) > 1):
+            self._remove(next(iter(self._items)))
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        """Gets an item and marks it as the most recently used.
+
+        Args:
+            key (Hashable): The item's key.
+            default (Any): The value to return if the key isn't present.
+
+        Returns:
+            Any: The item, or ``default``.
+        """
+        with self._lock:
+            if key not in self._items:
+                return default
+            return self._touch(key)
+
+    def set(self, key, value):
+        """Adds or replaces an item.
+
+        Args:
+            key (Hashable): The item's key.
+            value (Any): The item.
+        """
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+            self._add(key, value)
+            self._evict()
+
+    def setdefault(self, key, value):
+        """Gets an item, adding it first if the key isn't present.
+
+        Args:
+            key (Hashable): The item's key.
+            value (Any): The item to add if the key isn't present.
+
+        Returns:
+            Any: The item that is in the cache.
+        """
+        with self._lock:
+            if key in self._items:
+                return self._touch(key)
+            self._add(key, value)
+            self._evict()
+            return value
+
+    def pop(self, key, default=None):
+        """Removes an item.
+
+        Args:
+            key (Hashable): The item's key.
+            default (Any): The value to return if the key isn't present.
+
+        Returns:
+            Any: The removed item, or ``default``.
+        """
+        with self._lock:
+            if key not in self._items:
+                return default
+            return self._remove(key)
+
+    def discard(self, key, value):
+        """Removes an item if it is still the given value.
+
+        Args:
+            key (Hashable): The item's key.
+            value (Any): The item to remove. Another item with the same key,
+                for example one that replaced it, is kept.
+        """
+        with self._lock:
+            if self._items.get(key) is value:
+                self._remove(key)
+
+    def clear(self):
+        """Removes all items."""
+        with self._lock:
+            self._items.clear()
+            self._weights.clear()
+            self.weight = 0
+
+
+class TTLCache(object):
+    """A bounded, thread-safe cache whose items expire.
+
+    Each item is added with a deadline on the monotonic clock, see
+    :func:`google.auth._helpers.monotonic`. Expired items are never returned.
+    They are discarded when they are looked up, and are otherwise evicted
+    like other items when the cache is full: the cache wraps a
+    :class:`LRUCache` that holds each item together with its deadline.
+
+    Args:
+        maxsize (int): The maximum number of items.
+        maxweight (Optional[int]): The maximum total weight of the items.
+        weigher (Optional[Callable[[Any], int]]): Returns the weight of an
+            item. Required if ``maxweight`` is specified.
+    """
+
+    def __init__(self, maxsize, maxweight=None, weigher=None):
+        if weigher is not None:
+            item_weigher = weigher
+
+            def weigher(item):  # pylint: disable=function-redefined
+                """Weighs an item's value, without its deadline."""
+                return item_weigher(item[0])
+
+        self._cache = LRUCache(maxsize, maxweight=maxweight, weigher=weigher)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    @property
+    def maxsize(self):
+        """int: The maximum number of items."""
+        return self._cache.maxsize
+
+    @property
+    def weight(self):
+        """int: The total weight of the items."""
+        return self._cache.weight
+
+    @property
+    def evictions(self):
+        """int: The number of items discarded to make room for others."""
+        return self._cache.evictions
+
+    def get(self, key, default=None):
+        """Gets an unexpired item and marks it as the most recently used.
+
+        Args:
+            key (Hashable): The item's key.
+            default (Any): The value to return if the key isn't present or
+                the item expired.
+
+        Returns:
+            Any: The item, or ``default``.
+        """
+        item = self._cache.get(key)
+        if item is None:
+            return default
+        if item[1] <= _helpers.monotonic():
+            self._cache.discard(key, item)
+            return default
+        return item[0]
+
+    def set(self, key, value, deadline):
+        """Adds or replaces an item.
+
+        Args:
+            key (Hashable): The item's key.
+            value (Any): The item.
+            deadline (float): When the item expires, on the monotonic clock.
+        """
+        self._cache.set(key, (value, deadline))
+
+    def setdefault(self, key, value, deadline):
+        """Gets an unexpired item, adding it first if the key isn't present
+        or the item expired.
+
+        Args:
+            key (Hashable): The item's key.
+            value (Any): The item to add.
+            deadline (float): When the added item expires, on the monotonic
+                clock.
+
+        Returns:
+            Any: The item that is in the cache.
+        """
+        new_item = (value, deadline)
+        while True:
+            item = self._cache.setdefault(key, new_item)
+            if item is new_item or item[1] > _helpers.monotonic():
+                return item[0]
+            # Replace the expired item, unless another thread did.
+            self._cache.discard(key, item)
+
+    def pop(self, key, default=None):
+        """Removes an item.
+
+        Args:
+            key (Hashable): The item's key.
+            default (Any): The value to return if the key isn't present or
+                the item expired.
+
+        Returns:
+            Any: The removed item, or ``default``.
+        """
+        item = self._cache.pop(key)
+        if item is None or item[1] <= _helpers.monotonic():
+            return default
+        return item[0]
+
+    def clear(self):
+        """Removes all items."""
+        self._cache.clear()
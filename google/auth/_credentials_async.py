@@ -0,0 +1,189 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""asyncio support for credentials.
+
+This module implements the :mod:`asyncio` methods of
+:class:`google.auth.credentials.Credentials`. It uses ``async`` syntax and is
+therefore only imported on Python 3.5 and later.
+
+Concurrent coroutines that find the credentials invalid share a single
+refresh instead of each refreshing the credentials. The refresh runs as a
+task, so cancelling one of the waiting coroutines does not cancel it for the
+others.
+"""
+
+import asyncio
+import functools
+import logging
+
+from google.auth import _helpers
+from google.auth import _refresh
+from google.auth import token_sharing
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def run_in_executor(func, *args):
+    """Runs a blocking function in the event loop's default executor, for
+    example to sign an assertion without blocking the event loop.
+
+    Args:
+        func (Callable): The function.
+        args: The function's arguments.
+
+    Returns:
+        asyncio.Future: The function's result.
+    """
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(None, func, *args)
+
+
+def refresh_method(method):
+    """Decorator for ``refresh_async`` implementations.
+
+    This is the asynchronous counterpart of
+    :func:`google.auth._refresh.refresh_method`. Refresh hooks are notified,
+    but only the ``'total'`` timing is reported. Shared tokens are used and
+    published, but the refresh doesn't wait for equivalent credentials that
+    are being refreshed by other threads.
+
+    Args:
+        method (Callable): The coroutine function refreshing the credentials.
+
+    Returns:
+        Callable: The decorated coroutine function.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, request):
+        # pylint: disable=missing-docstring,protected-access
+        shared = token_sharing.shared_token(self)
+        if shared is not None and shared.adopt(self):
+            return None
+
+        _refresh.check_throttled(self)
+
+        hooks = self._refresh_hooks
+        _refresh.notify(hooks, 'on_refresh_start', self)
+        start = _helpers.monotonic()
+
+        try:
+            result = await method(self, request)
+        except Exception as exc:
+            timings = {'total': _helpers.monotonic() - start}
+            _refresh.record_failure(self, exc, timings['total'])
+            _refresh.notify(hooks, 'on_refresh_failure', self, exc, timings)
+            raise
+
+        timings = {'total': _helpers.monotonic() - start}
+        result = _refresh.record_success(self, timings['total'], result)
+        if shared is not None:
+            shared.publish(self)
+        _refresh.notify(hooks, 'on_refresh_success', self, timings)
+        return result
+
+    return wrapper
+
+
+def _in_flight_refresh(credentials):
+    """Returns the refresh of the credentials running on the current event
+    loop, if any."""
+    # pylint: disable=protected-access
+    in_flight = credentials._async_refresh
+    if in_flight is None:
+        return None
+    loop, task = in_flight
+    if loop is not asyncio.get_event_loop() or task.done():
+        return None
+    return task
+
+
+def _start_refresh(credentials, request):
+    """Starts refreshing the credentials in a task shared by all coroutines
+    waiting for the refresh."""
+    # pylint: disable=protected-access
+    loop = asyncio.get_event_loop()
+    task = asyncio.ensure_future(
+        credentials.refresh_async(request), loop=loop)
+    credentials._async_refresh = (loop, task)
+    return task
+
+
+async def refresh_once(credentials, request):
+    """Refreshes the credentials, or waits for the refresh that is already in
+    progress.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the credentials could
+            not be refreshed.
+    """
+    task = _in_flight_refresh(credentials)
+    if task is None:
+        task = _start_refresh(credentials, request)
+    await asyncio.shield(task)
+
+
+def _log_revalidation_error(task):
+    """Logs the error of a failed refresh of stale credentials."""
+    if not task.cancelled() and task.exception() is not None:
+        _LOGGER.warning(
+            'Failed to refresh stale credentials: %s', task.exception())
+
+
+def revalidate(credentials, request):
+    """Starts refreshing stale credentials in the background, unless they are
+    already being refreshed or are backing off from a failed refresh.
+
+    Errors are logged, the next request made with the stale credentials after
+    the backoff delay tries again.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+    """
+    if _in_flight_refresh(credentials) is not None:
+        return
+
+    failure = credentials._refresh_failure  # pylint: disable=protected-access
+    if failure is not None and failure.retry_at > _helpers.monotonic():
+        return
+
+    task = _start_refresh(credentials, request)
+    task.add_done_callback(_log_revalidation_error)
+
+
+async def before_request(credentials, request, method, url, headers):
+    """Implements
+    :meth:`google.auth.credentials.Credentials.before_request_async`.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+        method (str): The request's HTTP method.
+        url (str): The request's URI.
+        headers (Mapping): The request's headers.
+    """
+    # pylint: disable=unused-argument
+    if not credentials.valid:
+        await refresh_once(credentials, request)
+    elif credentials.stale:
+        revalidate(credentials, request)
+    credentials.apply(headers)
@@ -0,0 +1,121 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers for surviving :func:`os.fork`.
+
+Pre-fork servers, such as gunicorn or uWSGI with application preloading, may
+create and refresh credentials in a parent process and then fork workers. The
+workers inherit a copy of the credentials including their access token, which
+can keep being used, but not the threads of the parent. A lock held by another
+thread at the time of the fork stays locked forever in the child, and
+background threads are simply gone.
+
+Code in this library that uses locks or threads therefore tracks the
+:func:`generation` it created them in and re-creates them lazily when the
+generation changes.
+"""
+
+import os
+import threading
+
+_generation = 0
+# Guards replacing the locks of a previous generation.
+_swap_lock = threading.Lock()
+
+
+def _after_fork_in_child():
+    """Starts a new generation in a newly forked child process."""
+    global _generation, _swap_lock  # pylint: disable=global-statement
+    _generation += 1
+    # The lock may have been held by a thread that doesn't exist in the
+    # child.
+    _swap_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+    def generation():
+        """Returns a value that changes in every forked child process.
+
+        Returns:
+            int: The current generation.
+        """
+        return _generation
+else:  # pragma: NO COVER
+    # Without at-fork handlers (before Python 3.7) fall back to the process
+    # ID, which also changes in child processes.
+    def generation():
+        """Returns a value that changes in every forked child process.
+
+        Returns:
+            int: The current generation.
+        """
+        return os.getpid()
+
+
+class Lock(object):
+    """A lock that is released in forked child processes.
+
+    If the process forks while the lock is held by another thread, the child
+    gets a new, released lock instead of one that can never be released.
+    """
+    __slots__ = ('_lock', '_generation', '_held')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = generation()
+        # The lock acquired by the current holder, which is the one to
+        # release even if the generation changed in between.
+        self._held = None
+
+    def _current(self):
+        """Returns the lock for the current process."""
+        current = generation()
+        if self._generation != current:
+            with _swap_lock:
+                # Another thread may have replaced the lock in the meantime.
+                if self._generation != current:
+                    self._lock = threading.Lock()
+                    self._generation = current
+        return self._lock
+
+    def acquire(self, blocking=True):
+        """Acquires the lock.
+
+        Args:
+            blocking (bool): Whether to wait for the lock to be available.
+
+        Returns:
+            bool: True if the lock was acquired.
+        """
+        lock = self._current()
+        if not lock.acquire(blocking):
+            return False
+        self._held = lock
+        return True
+
+    def release(self):
+        """Releases the lock acquired by :meth:`acquire`."""
+        lock, self._held = self._held, None
+        if lock is None:
+            raise RuntimeError('Release of an unacquired lock.')
+        lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
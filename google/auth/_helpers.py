@@ -16,6 +16,7 @@
 
 import calendar
 import datetime
+import time
 
 import six
 from six.moves import urllib
@@ -53,13 +54,132 @@ def copy_docstring(source_class):
     return decorator
 
 
+# time.monotonic is not available in Python 2.7, fall back to the wall clock.
+_monotonic = getattr(time, 'monotonic', time.time)
+
+
+class Clock(object):
+    """A source of the current time.
+
+    Token expiration is exposed as a UTC :class:`datetime.datetime`, but
+    credentials track it internally as a deadline on a monotonic clock so that
+    adjustments to the system clock (for example, NTP corrections) do not cause
+    early or late refreshes.
+
+    The clock used by this library can be replaced using :func:`set_clock`,
+    which allows tests and benchmarks to control the passage of time.
+    """
+
+    def utcnow(self):
+        """Returns the current UTC datetime.
+
+        Returns:
+            datetime: The current time in UTC.
+        """
+        return datetime.datetime.utcnow()
+
+    def time(self):
+        """Returns the current wall-clock time.
+
+        Returns:
+            float: The number of seconds since the UNIX epoch.
+        """
+        return time.time()
+
+    def monotonic(self):
+        """Returns the current value of a monotonic clock.
+
+        Returns:
+            float: A number of seconds that never decreases. Only the
+                difference between two values is meaningful.
+        """
+        return _monotonic()
+
+    def sleep(self, secs):
+        """Waits for some time.
+
+        Args:
+            secs (float): The number of seconds to wait.
+        """
+        time.sleep(secs)
+
+
+_CLOCK = Clock()
+
+
+def get_clock():
+    """Returns the clock currently used by this library.
+
+    Returns:
+        Clock: The current clock.
+    """
+    return _CLOCK
+
+
+def set_clock(clock):
+    """Replaces the clock used by this library.
+
+    Args:
+        clock (Clock): The new clock.
+
+    Returns:
+        Clock: The previous clock, so that it can be restored.
+    """
+    global _CLOCK  # pylint: disable=global-statement
+    previous, _CLOCK = _CLOCK, clock
+    return previous
+
+
 def utcnow():
     """Returns the current UTC datetime.
 
     Returns:
         datetime: The current time in UTC.
     """
-    return datetime.datetime.utcnow()
+    return _CLOCK.utcnow()
+
+
+def utcnow_secs():
+    """Returns the current time without constructing a datetime.
+
+    Returns:
+        int: The number of seconds since the UNIX epoch.
+    """
+    return int(_CLOCK.time())
+
+
+def monotonic():
+    """Returns the current value of the monotonic clock.
+
+    Returns:
+        float: The current monotonic time in seconds.
+    """
+    return _CLOCK.monotonic()
+
+
+def expiry_to_deadline(expiry):
+    """Converts an expiration datetime to a deadline on the monotonic clock.
+
+    Args:
+        expiry (datetime): The expiration time in UTC.
+
+    Returns:
+        float: The value of :func:`monotonic` at which the expiration time
+            is reached.
+    """
+    remaining = (expiry - utcnow()).total_seconds()
+    return monotonic() + remaining
+
+
+def sleep(secs):
+    """Waits for some time using the current clock.
+
+    Args:
+        secs (float): The number of seconds to wait. Nothing happens if this
+            is not positive.
+    """
+    if secs > 0:
+        _CLOCK.sleep(secs)
 
 
 def datetime_to_secs(value):
@@ -186,11 +306,14 @@ def string_to_scopes(scopes):
 
     Args:
         scopes (Union[Sequence, str]): The string of space-separated scopes
-            to convert.
+            to convert. If a sequence is given, it is returned as a list.
     Returns:
         Sequence(str): The separated scopes.
     """
     if not scopes:
         return []
 
+    if not isinstance(scopes, six.string_types):
+        return list(scopes)
+
     return scopes.split(' ')
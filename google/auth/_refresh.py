@@ -0,0 +1,425 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers for instrumenting credential refreshes.
+
+Credentials implementations decorate their ``refresh`` method with
+:func:`refresh_method`, which notifies any registered
+:class:`google.auth.credentials.RefreshHook` instances. Code that runs during
+a refresh, such as signing an assertion or calling the token endpoint, can
+record how long it took using :func:`phase`::
+
+    with _refresh.phase('http'):
+        response = request(...)
+
+When no hooks are registered neither of these do any bookkeeping.
+
+:func:`refresh_method` also backs off after failed refreshes, see
+:mod:`google.auth.throttling`, and shares tokens between equivalent
+credentials, see :mod:`google.auth.token_sharing`.
+
+Finally, it keeps a :class:`RefreshHistory` of the latency and outcome of
+the credentials' recent refreshes. :func:`refresh_ahead` uses it to decide how
+long before the token expires the credentials become stale: long enough to
+retry a slow or unreliable refresh a few times, but no longer. Refresh methods
+that got their token from a cache rather than the token endpoint return
+:data:`CACHE_HIT`, so that the cache's latency doesn't skew the history.
+"""
+
+import array
+import functools
+import logging
+import math
+import random
+import threading
+
+import six
+
+from google.auth import _helpers
+from google.auth import exceptions
+from google.auth import token_sharing
+
+_LOGGER = logging.getLogger(__name__)
+
+_INITIAL_BACKOFF_SECS = 1.0
+_MAX_BACKOFF_SECS = 60.0
+_BACKOFF_MULTIPLIER = 2.0
+# The fraction of the backoff delay that is randomized, so that credentials
+# that failed at the same time don't all retry at the same time.
+_BACKOFF_JITTER = 0.5
+# Errors that suggest that another refresh made right away would fail too.
+_BACKOFF_ERRORS = (exceptions.RefreshError, exceptions.TransportError)
+
+# The number of recent refreshes whose latency and outcome are kept.
+_HISTORY_SIZE = 16
+# The percentile of the refresh latency that the refresh-ahead time is based
+# on.
+_LATENCY_PERCENTILE = 95
+# How long before the token expires credentials become stale before anything
+# is known about their refreshes.
+_DEFAULT_REFRESH_AHEAD_SECS = 300.0  # 5 minutes in seconds
+_MIN_REFRESH_AHEAD_SECS = 30.0
+_MAX_REFRESH_AHEAD_SECS = 900.0  # 15 minutes in seconds
+# The refresh-ahead time is this many times the time the expected number of
+# attempts take.
+_REFRESH_AHEAD_SAFETY_FACTOR = 2.0
+# Stale credentials should become expired before they are refreshed with at
+# most this probability, given the observed error rate.
+_ACCEPTABLE_EXPIRY_PROBABILITY = 0.01
+_MAX_REFRESH_ATTEMPTS = 8
+
+# Returned by refresh methods whose token was served from a cache instead of
+# the token endpoint. The decorated method returns None instead.
+CACHE_HIT = object()
+
+# Holds the timings for the refresh in progress on the current thread, if it
+# is being instrumented.
+_LOCAL = threading.local()
+
+
+class _NullPhase(object):
+    """A phase that records nothing."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase(object):
+    """Adds the time spent in a block to the timings of a refresh.
+
+    Args:
+        timings (MutableMapping[str, float]): The refresh's timings.
+        name (str): The name of the phase.
+    """
+
+    def __init__(self, timings, name):
+        self._timings = timings
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = _helpers.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = _helpers.monotonic() - self._start
+        self._timings[self._name] = self._timings.get(self._name, 0) + elapsed
+        return False
+
+
+def phase(name):
+    """Times a phase of the refresh in progress on the current thread.
+
+    Args:
+        name (str): The name of the phase, for example ``'sign'``, ``'http'``
+            or ``'parse'``.
+
+    Returns:
+        ContextManager: A context manager timing the enclosed block. If the
+            current refresh isn't being instrumented, the time isn't recorded.
+    """
+    timings = getattr(_LOCAL, 'timings', None)
+    if timings is None:
+        return _NULL_PHASE
+    return _Phase(timings, name)
+
+
+class _RefreshFailure(object):
+    """The outcome of failed refreshes, cached to back off from refreshing.
+
+    Args:
+        failures (int): The number of consecutive failed refreshes.
+        retry_at (float): When to allow the next refresh, on the monotonic
+            clock.
+        error (Exception): The error raised by the last refresh.
+    """
+    __slots__ = ('failures', 'retry_at', 'error')
+
+    def __init__(self, failures, retry_at, error):
+        self.failures = failures
+        self.retry_at = retry_at
+        self.error = error
+
+
+def _max_backoff_delay(failures):
+    """Returns the number of seconds to wait before the next refresh after a
+    number of consecutive failures, before randomization."""
+    return min(
+        _INITIAL_BACKOFF_SECS * _BACKOFF_MULTIPLIER ** (failures - 1),
+        _MAX_BACKOFF_SECS)
+
+
+def backoff_delay(failures):
+    """Returns the randomized number of seconds to wait before the next
+    refresh after a number of consecutive failures."""
+    delay = _max_backoff_delay(failures)
+    return delay * (1 - _BACKOFF_JITTER * random.random())
+
+
+class RefreshHistory(object):
+    """The latency and outcome of the most recent refreshes of a set of
+    credentials.
+
+    Only the last ``size`` refreshes are kept, so that the statistics follow
+    changes in the token endpoint's behavior. Concurrent refreshes of the
+    same credentials may occasionally lose a sample, which only affects the
+    statistics.
+
+    Args:
+        size (int): The number of refreshes to keep.
+    """
+    __slots__ = ('_latencies', '_failures', '_count', '_size')
+
+    def __init__(self, size=_HISTORY_SIZE):
+        self._latencies = array.array('d')
+        # A bit for each entry of _latencies, set if the refresh failed.
+        self._failures = 0
+        self._count = 0
+        self._size = size
+
+    def __len__(self):
+        return len(self._latencies)
+
+    def record(self, latency, failed=False):
+        """Records the outcome of a refresh.
+
+        Args:
+            latency (float): How long the refresh took, in seconds.
+            failed (bool): Whether the refresh failed.
+        """
+        index = self._count % self._size
+        if index < len(self._latencies):
+            self._latencies[index] = latency
+        else:
+            self._latencies.append(latency)
+        bit = 1 << index
+        if failed:
+            self._failures |= bit
+        else:
+            self._failures &= ~bit
+        self._count += 1
+
+    def latency_percentile(self, percentile):
+        """Returns a percentile of the refresh latency.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+
+        Returns:
+            Optional[float]: The latency in seconds, or None if no refreshes
+                were recorded.
+        """
+        if not self._latencies:
+            return None
+        latencies = sorted(self._latencies)
+        rank = int(math.ceil(percentile / 100.0 * len(latencies)))
+        return latencies[min(max(rank, 1), len(latencies)) - 1]
+
+    @property
+    def error_rate(self):
+        """float: The fraction of the recorded refreshes that failed."""
+        if not self._latencies:
+            return 0.0
+        return bin(self._failures).count('1') / float(len(self._latencies))
+
+
+def _attempts_needed(error_rate):
+    """Returns the number of refresh attempts needed for one to succeed with
+    high probability, given the fraction of refreshes that fail."""
+    if error_rate <= 0:
+        return 1
+    if error_rate >= 1:
+        return _MAX_REFRESH_ATTEMPTS
+    attempts = math.ceil(
+        math.log(_ACCEPTABLE_EXPIRY_PROBABILITY) / math.log(error_rate))
+    return int(min(max(attempts, 1), _MAX_REFRESH_ATTEMPTS))
+
+
+def refresh_ahead(history):
+    """Returns how many seconds before their token expires credentials should
+    become stale.
+
+    This is the time that refreshing the credentials takes at the
+    :data:`_LATENCY_PERCENTILE` percentile of the latency, repeated as often as
+    the error rate suggests and including the backoff delays between
+    attempts, with a safety factor. It is bounded by
+    :data:`_MIN_REFRESH_AHEAD_SECS` and :data:`_MAX_REFRESH_AHEAD_SECS`.
+
+    Args:
+        history (Optional[RefreshHistory]): The credentials' refresh history.
+
+    Returns:
+        float: The number of seconds.
+    """
+    if history is None or not len(history):
+        return _DEFAULT_REFRESH_AHEAD_SECS
+
+    latency = history.latency_percentile(_LATENCY_PERCENTILE)
+    attempts = _attempts_needed(history.error_rate)
+    needed = attempts * latency + sum(
+        _max_backoff_delay(failures) for failures in range(1, attempts))
+    return min(
+        max(needed * _REFRESH_AHEAD_SAFETY_FACTOR, _MIN_REFRESH_AHEAD_SECS),
+        _MAX_REFRESH_AHEAD_SECS)
+
+
+def _record_latency(credentials, latency, failed):
+    """Adds a refresh to the credentials' refresh history."""
+    # pylint: disable=protected-access
+    history = credentials._refresh_history
+    if history is None:
+        history = RefreshHistory()
+        credentials._refresh_history = history
+    history.record(latency, failed)
+
+
+def check_throttled(credentials):
+    """Raises an error if the credentials may not be refreshed right now."""
+    # pylint: disable=protected-access
+    failure = credentials._refresh_failure
+    if failure is not None:
+        remaining = failure.retry_at - _helpers.monotonic()
+        if remaining > 0:
+            new_exc = exceptions.RefreshError(
+                'Not refreshing the credentials for another {:.1f} seconds '
+                'because the previous refresh failed: {}'.format(
+                    remaining, failure.error))
+            six.raise_from(new_exc, failure.error)
+
+
+def record_failure(credentials, exc, latency):
+    """Backs off from refreshing the credentials after a failed refresh, if
+    the error suggests that refreshing again right away would fail too."""
+    # pylint: disable=protected-access
+    if not isinstance(exc, _BACKOFF_ERRORS):
+        return
+    _record_latency(credentials, latency, failed=True)
+    previous = credentials._refresh_failure
+    failures = 1 if previous is None else previous.failures + 1
+    retry_at = _helpers.monotonic() + backoff_delay(failures)
+    credentials._refresh_failure = _RefreshFailure(failures, retry_at, exc)
+
+
+def record_success(credentials, latency, result=None):
+    """Resets the backoff after a successful refresh.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+        latency (float): How long the refresh took, in seconds.
+        result (Any): The value returned by the refresh method. If it is
+            :data:`CACHE_HIT` the latency isn't recorded.
+
+    Returns:
+        Any: The value the decorated refresh method should return.
+    """
+    credentials._refresh_failure = None  # pylint: disable=protected-access
+    if result is CACHE_HIT:
+        return None
+    _record_latency(credentials, latency, failed=False)
+    return result
+
+
+def notify(hooks, method_name, *args):
+    """Calls a method on each hook, logging instead of raising errors."""
+    for hook in hooks:
+        try:
+            getattr(hook, method_name)(*args)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception('Refresh hook %r failed.', hook)
+
+
+def _instrumented_refresh(method, credentials, request, hooks):
+    """Runs a refresh method, notifying hooks and collecting timings."""
+    notify(hooks, 'on_refresh_start', credentials)
+
+    timings = {}
+    previous_timings = getattr(_LOCAL, 'timings', None)
+    _LOCAL.timings = timings
+    start = _helpers.monotonic()
+
+    try:
+        result = method(credentials, request)
+    except Exception as exc:
+        timings['total'] = _helpers.monotonic() - start
+        _LOCAL.timings = previous_timings
+        notify(hooks, 'on_refresh_failure', credentials, exc, timings)
+        raise
+
+    timings['total'] = _helpers.monotonic() - start
+    _LOCAL.timings = previous_timings
+    notify(hooks, 'on_refresh_success', credentials, timings)
+    return result
+
+
+def refresh_method(method):
+    """Decorator for :meth:`google.auth.credentials.Credentials.refresh`
+    implementations.
+
+    Notifies the credentials' refresh hooks when the refresh starts, succeeds
+    or fails. After a failed refresh, further refreshes fail immediately until
+    a backoff delay has passed. The latency and outcome of the refresh are
+    added to the credentials' :class:`RefreshHistory`, unless the method
+    returns :data:`CACHE_HIT`.
+
+    If tokens are shared, the credentials use the token of equivalent
+    credentials instead of refreshing if it is fresh, and otherwise refresh
+    while holding the lock shared with them.
+
+    Args:
+        method (Callable): The refresh method.
+
+    Returns:
+        Callable: The decorated method.
+    """
+    @functools.wraps(method)
+    def wrapper(self, request):
+        # pylint: disable=missing-docstring
+        shared = token_sharing.shared_token(self)
+        if shared is None:
+            return _throttled_refresh(method, self, request)
+
+        with shared.lock:
+            if shared.adopt(self):
+                return None
+            result = _throttled_refresh(method, self, request)
+            shared.publish(self)
+            return result
+
+    return wrapper
+
+
+def _throttled_refresh(method, credentials, request):
+    """Runs a refresh method unless throttled, recording its outcome."""
+    # pylint: disable=protected-access
+    check_throttled(credentials)
+
+    hooks = credentials._refresh_hooks
+    start = _helpers.monotonic()
+    try:
+        if not hooks:
+            result = method(credentials, request)
+        else:
+            result = _instrumented_refresh(
+                method, credentials, request, hooks)
+    except Exception as exc:
+        record_failure(credentials, exc, _helpers.monotonic() - start)
+        raise
+
+    return record_success(credentials, _helpers.monotonic() - start, result)
@@ -16,13 +16,22 @@
 
 import io
 import json
+import logging
+import os
 
 import six
 
+from google.auth import _fork
+from google.auth import _helpers
 from google.auth import crypt
 
+_LOGGER = logging.getLogger(__name__)
 
-def from_dict(data, require=None):
+# How often a reloading signer checks if its file changed.
+_RELOAD_CHECK_INTERVAL_SECS = 10
+
+
+def from_dict(data, require=None, lazy=False):
     """Validates a dictionary containing Google service account data.
 
     Creates and returns a :class:`google.auth.crypt.Signer` instance from the
@@ -32,6 +41,9 @@ def from_dict(data, require=None):
         data (Mapping[str, str]): The service account data
         require (Sequence[str]): List of keys required to be present in the
             info.
+        lazy (bool): Whether to return a
+            :class:`google.auth.crypt.LazySigner`, which parses the private
+            key when it is first used.
 
     Returns:
         google.auth.crypt.Signer: A signer created from the private key in the
@@ -54,24 +66,154 @@ def from_dict(data, require=None):
             'fields {}.'.format(', '.join(missing)))
 
     # Create a signer.
-    signer = crypt.Signer.from_string(
+    if lazy:
+        return crypt.LazySigner(
+            data['private_key'], data.get('private_key_id'))
+    return crypt.Signer.from_string(
         data['private_key'], data.get('private_key_id'))
 
-    return signer
 
+def _file_version(stat):
+    """Returns what identifies a version of a file.
 
-def from_filename(filename, require=None):
+    Rotating a key either replaces the file, which changes its inode, or
+    rewrites it, which changes its modification time or size.
+
+    Args:
+        stat (os.stat_result): The file's status.
+
+    Returns:
+        Tuple[int, int, float, int]: The version.
+    """
+    return stat.st_dev, stat.st_ino, stat.st_mtime, stat.st_size
+
+
+def _read(filename, require, lazy=False):
+    """Reads a Google service account JSON file.
+
+    Returns:
+        Tuple[ Tuple, Mapping[str, str], google.auth.crypt.Signer ]: The
+            version of the file that was read, the verified info and a signer
+            instance.
+    """
+    with io.open(filename, 'r', encoding='utf-8') as json_file:
+        version = _file_version(os.fstat(json_file.fileno()))
+        data = json.load(json_file)
+    return version, data, from_dict(data, require=require, lazy=lazy)
+
+
+class ReloadingSigner(object):
+    """Signs messages with the private key currently in a service account
+    file.
+
+    Before signing, the signer checks if the file was replaced or modified,
+    at most every few seconds. If it was, the file is parsed again and the
+    new key is used from then on. If the new file can't be parsed, for
+    example because it is being rewritten, the previous key keeps being
+    used until the next check.
+
+    Args:
+        filename (str): The path to the service account .json file.
+        version (Tuple): The version of the file ``signer`` was read from.
+        signer (google.auth.crypt.Signer): The signer for the key in the
+            file.
+        require (Sequence[str]): List of keys required to be present in the
+            info.
+    """
+    __slots__ = ('_filename', '_require', '_state', '_next_check', '_lock')
+
+    def __init__(self, filename, version, signer, require=None):
+        self._filename = filename
+        self._require = require
+        # The file version and its signer, swapped together.
+        self._state = (version, signer)
+        self._next_check = (
+            _helpers.monotonic() + _RELOAD_CHECK_INTERVAL_SECS)
+        self._lock = _fork.Lock()
+
+    def __getstate__(self):
+        version, signer = self._state
+        return {
+            'filename': self._filename, 'require': self._require,
+            'version': version, 'signer': signer}
+
+    def __setstate__(self, state):
+        self.__init__(
+            state['filename'], state['version'], state['signer'],
+            require=state['require'])
+
+    @property
+    def key_id(self):
+        """Optional[str]: The ID of the current private key."""
+        return self._state[1].key_id
+
+    def _check(self):
+        """Reloads the file if it changed since it was last read."""
+        try:
+            current = _file_version(os.stat(self._filename))
+        except OSError as exc:
+            _LOGGER.warning(
+                'Failed to check service account file %s: %s',
+                self._filename, exc)
+            return
+        if current == self._state[0]:
+            return
+
+        try:
+            version, _, signer = _read(self._filename, self._require)
+        except (IOError, OSError, ValueError) as exc:
+            _LOGGER.warning(
+                'Failed to reload service account file %s: %s',
+                self._filename, exc)
+            return
+        self._state = (version, signer)
+
+    def reload_if_changed(self):
+        """Reloads the file if it changed, unless it was checked recently or
+        another thread is checking it."""
+        if _helpers.monotonic() < self._next_check:
+            return
+        if not self._lock.acquire(False):
+            return
+        try:
+            self._next_check = (
+                _helpers.monotonic() + _RELOAD_CHECK_INTERVAL_SECS)
+            self._check()
+        finally:
+            self._lock.release()
+
+    def sign(self, message):
+        """Signs a message with the current private key.
+
+        Args:
+            message (Union[str, bytes]): The message to be signed.
+
+        Returns:
+            bytes: The signature of the message.
+        """
+        self.reload_if_changed()
+        return self._state[1].sign(message)
+
+
+def from_filename(filename, require=None, reload=False, lazy=False):
     """Reads a Google service account JSON file and returns its parsed info.
 
     Args:
         filename (str): The path to the service account .json file.
         require (Sequence[str]): List of keys required to be present in the
             info.
+        reload (bool): Whether to return a :class:`ReloadingSigner`, which
+            picks up keys rotated by rewriting the file.
+        lazy (bool): Whether the private key is parsed when it is first
+            used, see :class:`google.auth.crypt.LazySigner`. Reloaded keys
+            are always parsed right away, so that a key that can't be
+            parsed doesn't replace the current one.
 
     Returns:
         Tuple[ Mapping[str, str], google.auth.crypt.Signer ]: The verified
             info and a signer instance.
     """
-    with io.open(filename, 'r', encoding='utf-8') as json_file:
-        data = json.load(json_file)
-        return data, from_dict(data, require=require)
+    version, data, signer = _read(filename, require, lazy=lazy)
+    if reload:
+        signer = ReloadingSigner(filename, version, signer, require=require)
+    return data, signer
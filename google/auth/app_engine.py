@@ -25,6 +25,7 @@ the standard environment using the `App Identity API`_.
 import datetime
 
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import credentials
 
 try:
@@ -55,6 +56,7 @@ class Credentials(credentials.Scoped, credentials.Signing,
     These credentials use the App Engine App Identity API to obtain access
     tokens.
     """
+    __slots__ = ('_scopes', '_derived_credentials', '_service_account_id')
 
     def __init__(self, scopes=None, service_account_id=None):
         """
@@ -77,14 +79,28 @@ class Credentials(credentials.Scoped, credentials.Signing,
         self._scopes = scopes
         self._service_account_id = service_account_id
 
+    def _token_identity(self):
+        """Returns the identity that App Engine credentials share tokens by.
+
+        Returns:
+            Hashable: The identity.
+        """
+        return (
+            type(self),
+            self._service_account_id,
+            frozenset(self._scopes or ()),
+            None,
+            None)
+
     @_helpers.copy_docstring(credentials.Credentials)
+    @_refresh.refresh_method
     def refresh(self, request):
         # pylint: disable=unused-argument
         token, ttl = app_identity.get_access_token(
             self._scopes, self._service_account_id)
         expiry = _helpers.utcnow() + datetime.timedelta(seconds=ttl)
 
-        self.token, self.expiry = token, expiry
+        self._set_token(token, expiry)
 
     @property
     def requires_scopes(self):
@@ -97,8 +113,15 @@ class Credentials(credentials.Scoped, credentials.Signing,
 
     @_helpers.copy_docstring(credentials.Scoped)
     def with_scopes(self, scopes):
-        return Credentials(
-            scopes=scopes, service_account_id=self._service_account_id)
+        def create():
+            """Creates the credentials."""
+            return Credentials(
+                scopes=scopes, service_account_id=self._service_account_id)
+
+        # Key on the scopes as given, so that the memoized credentials have
+        # exactly the requested scopes.
+        key = tuple(scopes) if scopes is not None else None
+        return self._derive(key, create)
 
     @_helpers.copy_docstring(credentials.Signing)
     def sign_bytes(self, message):
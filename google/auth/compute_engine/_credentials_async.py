@@ -0,0 +1,56 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""asyncio support for Compute Engine credentials.
+
+This module implements ``refresh_async`` for
+:class:`google.auth.compute_engine.Credentials`. It uses ``async`` syntax and
+is therefore only imported on Python 3.5 and later.
+"""
+
+from google.auth import _credentials_async
+from google.auth import _helpers
+from google.auth import exceptions
+from google.auth.compute_engine import _metadata_async
+
+# pylint: disable=protected-access
+
+
+@_credentials_async.refresh_method
+async def refresh(credentials, request):
+    """Refreshes the access token and scopes.
+
+    Args:
+        credentials (google.auth.compute_engine.Credentials): The
+            credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the Compute Engine metadata
+            service can't be reached if if the instance has not
+            credentials.
+    """
+    try:
+        info = await _metadata_async.get_service_account_info(
+            request, service_account=credentials._service_account_email)
+        credentials._service_account_email = info['email']
+        credentials._scopes = _helpers.string_to_scopes(info['scopes'])
+
+        credentials._set_token(
+            *await _metadata_async.get_service_account_token(
+                request,
+                service_account=credentials._service_account_email))
+    except exceptions.TransportError as exc:
+        raise exceptions.RefreshError(exc)
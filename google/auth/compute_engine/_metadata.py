@@ -26,16 +26,22 @@ from six.moves import http_client
 from six.moves.urllib import parse as urlparse
 
 from google.auth import _helpers
+from google.auth import _refresh
+from google.auth import environment_vars
 from google.auth import exceptions
+from google.auth import throttling
 
 _LOGGER = logging.getLogger(__name__)
 
-_METADATA_ROOT = 'http://metadata.google.internal/computeMetadata/v1/'
+_METADATA_ROOT = 'http://{}/computeMetadata/v1/'.format(
+    os.getenv(environment_vars.GCE_METADATA_ROOT,
+              'metadata.google.internal'))
 
 # This is used to ping the metadata server, it avoids the cost of a DNS
 # lookup.
-_METADATA_IP_ROOT = 'http://169.254.169.254'
-_METADATA_FLAVOR_HEADER = 'metdata-flavor'
+_METADATA_IP_ROOT = 'http://{}'.format(
+    os.getenv(environment_vars.GCE_METADATA_IP, '169.254.169.254'))
+_METADATA_FLAVOR_HEADER = 'metadata-flavor'
 _METADATA_FLAVOR_VALUE = 'Google'
 _METADATA_HEADERS = {_METADATA_FLAVOR_HEADER: _METADATA_FLAVOR_VALUE}
 
@@ -100,21 +106,33 @@ def get(request, path, root=_METADATA_ROOT, recursive=False):
         google.auth.exceptions.TransportError: if an error occurred while
             retrieving metadata.
     """
+    url = _make_url(path, root, recursive)
+
+    with _refresh.phase('http'):
+        response = request(url=url, method='GET', headers=_METADATA_HEADERS)
+
+    return _decode_response(url, response)
+
+
+def _make_url(path, root, recursive):
+    """Returns the URL of a metadata resource, see :func:`get`."""
     base_url = urlparse.urljoin(root, path)
     query_params = {}
 
     if recursive:
         query_params['recursive'] = 'true'
 
-    url = _helpers.update_query(base_url, query_params)
+    return _helpers.update_query(base_url, query_params)
 
-    response = request(url=url, method='GET', headers=_METADATA_HEADERS)
 
+def _decode_response(url, response):
+    """Decodes a metadata server response, see :func:`get`."""
     if response.status == http_client.OK:
         content = _helpers.from_bytes(response.data)
         if response.headers['content-type'] == 'application/json':
             try:
-                return json.loads(content)
+                with _refresh.phase('parse'):
+                    return json.loads(content)
             except ValueError:
                 raise exceptions.TransportError(
                     'Received invalid JSON from the Google Compute Engine'
@@ -190,10 +208,18 @@ def get_service_account_token(request, service_account='default'):
     Raises:
         google.auth.exceptions.TransportError: if an error occurred while
             retrieving metadata.
+        google.auth.exceptions.RefreshError: If the refresh rate limit was
+            exceeded.
     """
+    throttling.check_refresh_rate_limit()
     token_json = get(
         request,
         'instance/service-accounts/{0}/token'.format(service_account))
+    return _parse_token(token_json)
+
+
+def _parse_token(token_json):
+    """Extracts the access token and its expiration from a token response."""
     token_expiry = _helpers.utcnow() + datetime.timedelta(
         seconds=token_json['expires_in'])
     return token_json['access_token'], token_expiry
@@ -0,0 +1,103 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Helpers for talking to the Compute Engine metadata server with asyncio.
+
+This is the asynchronous counterpart of
+:mod:`google.auth.compute_engine._metadata`. It uses ``async`` syntax and is
+therefore only imported on Python 3.5 and later.
+"""
+
+from google.auth import throttling
+from google.auth.compute_engine import _metadata
+
+# pylint: disable=protected-access
+
+
+async def get(request, path, root=_metadata._METADATA_ROOT, recursive=False):
+    """Fetch a resource from the metadata server.
+
+    See :func:`google.auth.compute_engine._metadata.get`.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        path (str): The resource to retrieve.
+        root (str): The full path to the metadata server root.
+        recursive (bool): Whether to do a recursive query of metadata.
+
+    Returns:
+        Union[Mapping, str]: If the metadata server returns JSON, a mapping of
+            the decoded JSON is return. Otherwise, the response content is
+            returned as a string.
+
+    Raises:
+        google.auth.exceptions.TransportError: if an error occurred while
+            retrieving metadata.
+    """
+    url = _metadata._make_url(path, root, recursive)
+    response = await request(
+        url=url, method='GET', headers=_metadata._METADATA_HEADERS)
+    return _metadata._decode_response(url, response)
+
+
+async def get_service_account_info(request, service_account='default'):
+    """Get information about a service account from the metadata server.
+
+    See :func:`google.auth.compute_engine._metadata.get_service_account_info`.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        service_account (str): The string 'default' or a service account email
+            address.
+
+    Returns:
+        Mapping: The service account's information.
+
+    Raises:
+        google.auth.exceptions.TransportError: if an error occurred while
+            retrieving metadata.
+    """
+    return await get(
+        request,
+        'instance/service-accounts/{0}/'.format(service_account),
+        recursive=True)
+
+
+async def get_service_account_token(request, service_account='default'):
+    """Get the OAuth 2.0 access token for a service account.
+
+    See :func:`google.auth.compute_engine._metadata.get_service_account_token`.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        service_account (str): The string 'default' or a service account email
+            address.
+
+    Returns:
+        Union[str, datetime]: The access token and its expiration.
+
+    Raises:
+        google.auth.exceptions.TransportError: if an error occurred while
+            retrieving metadata.
+        google.auth.exceptions.RefreshError: If the refresh rate limit was
+            exceeded.
+    """
+    throttling.check_refresh_rate_limit()
+    token_json = await get(
+        request,
+        'instance/service-accounts/{0}/token'.format(service_account))
+    return _metadata._parse_token(token_json)
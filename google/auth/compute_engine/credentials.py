@@ -20,10 +20,17 @@ Engine using the Compute Engine metadata server.
 """
 
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import credentials
 from google.auth import exceptions
 from google.auth.compute_engine import _metadata
 
+try:
+    from google.auth.compute_engine import _credentials_async
+except SyntaxError:  # pragma: NO COVER
+    # asyncio support requires Python 3.5 or later.
+    _credentials_async = None
+
 
 class Credentials(credentials.Scoped, credentials.Credentials):
     """Compute Engine Credentials.
@@ -46,6 +53,7 @@ class Credentials(credentials.Scoped, credentials.Credentials):
     .. _Compute Engine authentication documentation:
         https://cloud.google.com/compute/docs/authentication#using
     """
+    __slots__ = ('_scopes', '_derived_credentials', '_service_account_email')
 
     def __init__(self, service_account_email='default'):
         """
@@ -73,6 +81,18 @@ class Credentials(credentials.Scoped, credentials.Credentials):
         self._service_account_email = info['email']
         self._scopes = _helpers.string_to_scopes(info['scopes'])
 
+    def _token_identity(self):
+        """Returns the identity that Compute Engine credentials share tokens
+        by.
+
+        The scopes are those of the instance and not part of the identity.
+
+        Returns:
+            Hashable: The identity.
+        """
+        return (type(self), self._service_account_email, None, None, None)
+
+    @_refresh.refresh_method
     def refresh(self, request):
         """Refresh the access token and scopes.
 
@@ -87,12 +107,30 @@ class Credentials(credentials.Scoped, credentials.Credentials):
         """
         try:
             self._retrieve_info(request)
-            self.token, self.expiry = _metadata.get_service_account_token(
+            self._set_token(*_metadata.get_service_account_token(
                 request,
-                service_account=self._service_account_email)
+                service_account=self._service_account_email))
         except exceptions.TransportError as exc:
             raise exceptions.RefreshError(exc)
 
+    def refresh_async(self, request):
+        """Refresh the access token and scopes without blocking the event
+        loop.
+
+        Args:
+            request (google.auth.transport.AsyncRequest): The object used to
+                make HTTP requests.
+
+        Returns:
+            Awaitable[None]: Completes when the credentials are refreshed.
+
+        Raises:
+            google.auth.exceptions.RefreshError: If the Compute Engine metadata
+                service can't be reached if if the instance has not
+                credentials.
+        """
+        return _credentials_async.refresh(self, request)
+
     @property
     def requires_scopes(self):
         """False: Compute Engine credentials can not be scoped."""
@@ -0,0 +1,385 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A local token server compatible with the Compute Engine metadata server.
+
+The token server holds a single set of credentials, keeps their access token
+refreshed ahead of its expiration and serves it over HTTP using the same paths
+as the Compute Engine metadata server. Every process on a host, written in any
+language, can then use its regular metadata server code path to share one
+access token instead of each refreshing its own.
+
+Start the server with a service account key file::
+
+    python -m google.auth.compute_engine.token_server \\
+        --port 8080 \\
+        --credentials service-account.json \\
+        --scopes https://www.googleapis.com/auth/cloud-platform
+
+If ``--credentials`` isn't specified, :func:`google.auth.default` is used.
+Then point processes at the server with the ``GCE_METADATA_ROOT`` and
+``GCE_METADATA_IP`` environment variables::
+
+    export GCE_METADATA_ROOT=127.0.0.1:8080
+    export GCE_METADATA_IP=127.0.0.1:8080
+
+The following paths are served, relative to ``/computeMetadata/v1/``:
+
+* ``project/project-id``, if the project ID is known.
+* ``instance/service-accounts/{account}/`` (with ``?recursive=true``).
+* ``instance/service-accounts/{account}/email``.
+* ``instance/service-accounts/{account}/scopes``.
+* ``instance/service-accounts/{account}/token``.
+
+Where ``{account}`` is ``default`` or the service account's email.
+
+.. note:: The server only listens on the loopback interface by default. Any
+    process that can connect to it can obtain the access token.
+"""
+
+import argparse
+import json
+import logging
+import threading
+
+from six.moves import BaseHTTPServer
+from six.moves import http_client
+from six.moves import socketserver
+from six.moves.urllib import parse as urlparse
+
+from google.auth import _fork
+from google.auth import _helpers
+
+_LOGGER = logging.getLogger(__name__)
+
+_METADATA_FLAVOR_HEADER = 'Metadata-Flavor'
+_METADATA_FLAVOR_VALUE = 'Google'
+_PROJECT_ID_PATH = '/computeMetadata/v1/project/project-id'
+_SERVICE_ACCOUNTS_PATH = '/computeMetadata/v1/instance/service-accounts/'
+_JSON_CONTENT_TYPE = 'application/json'
+_TEXT_CONTENT_TYPE = 'application/text'
+
+# How long before the token expires to refresh it.
+_DEFAULT_REFRESH_MARGIN_SECS = 300  # 5 minutes in seconds
+# How long to wait before retrying a failed background refresh.
+_RETRY_INTERVAL_SECS = 10
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves metadata server requests for a :class:`TokenServer`."""
+
+    def _send(self, status, body=b'', content_type=_TEXT_CONTENT_TYPE):
+        """Sends a response."""
+        body = _helpers.to_bytes(body)
+        self.send_response(status)
+        self.send_header(_METADATA_FLAVOR_HEADER, _METADATA_FLAVOR_VALUE)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data):
+        """Sends a JSON response."""
+        self._send(http_client.OK, json.dumps(data), _JSON_CONTENT_TYPE)
+
+    def _handle_service_account(self, token_server, path):
+        """Handles requests for service account resources."""
+        account, _, resource = path.partition('/')
+
+        if account not in token_server.service_account_aliases:
+            self._send(http_client.NOT_FOUND)
+        elif resource == '':
+            self._send_json({
+                'email': token_server.service_account_email,
+                'scopes': token_server.scopes,
+                'aliases': ['default'],
+            })
+        elif resource == 'email':
+            self._send(http_client.OK, token_server.service_account_email)
+        elif resource == 'scopes':
+            self._send(http_client.OK, '\n'.join(token_server.scopes))
+        elif resource == 'token':
+            token, expires_in = token_server.get_token()
+            self._send_json({
+                'access_token': token,
+                'expires_in': expires_in,
+                'token_type': 'Bearer',
+            })
+        else:
+            self._send(http_client.NOT_FOUND)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handles a GET request."""
+        token_server = self.server.token_server
+        path = urlparse.urlsplit(self.path).path
+
+        # Like the metadata server, require the flavor header to prevent
+        # requests forwarded by unsuspecting proxies from obtaining tokens.
+        flavor = self.headers.get(_METADATA_FLAVOR_HEADER)
+        if flavor != _METADATA_FLAVOR_VALUE:
+            self._send(http_client.FORBIDDEN)
+            return
+
+        try:
+            if path == '/':
+                self._send(http_client.OK)
+            elif path == _PROJECT_ID_PATH and token_server.project_id:
+                self._send(http_client.OK, token_server.project_id)
+            elif path.startswith(_SERVICE_ACCOUNTS_PATH):
+                self._handle_service_account(
+                    token_server, path[len(_SERVICE_ACCOUNTS_PATH):])
+            else:
+                self._send(http_client.NOT_FOUND)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception('Failed to serve %s', path)
+            self._send(http_client.SERVICE_UNAVAILABLE)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """Logs requests with the module's logger."""
+        _LOGGER.debug(format, *args)
+
+
+class _HTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """A threaded HTTP server that refers back to its token server."""
+    daemon_threads = True
+
+    def __init__(self, address, token_server):
+        BaseHTTPServer.HTTPServer.__init__(self, address, _Handler)
+        self.token_server = token_server
+
+
+class TokenServer(object):
+    """Serves access tokens for a set of credentials over HTTP, emulating the
+    Compute Engine metadata server.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials to
+            serve access tokens for.
+        request (google.auth.transport.Request): The object used to make
+            HTTP requests when refreshing the credentials.
+        host (str): The address to listen on.
+        port (int): The port to listen on. If 0, an unused port is picked.
+        project_id (Optional[str]): The project ID to serve, if any.
+        refresh_margin (int): How many seconds before the access token
+            expires to refresh it.
+    """
+
+    def __init__(self, credentials, request, host='127.0.0.1', port=0,
+                 project_id=None,
+                 refresh_margin=_DEFAULT_REFRESH_MARGIN_SECS):
+        self._credentials = credentials
+        self._request = request
+        self._refresh_margin = refresh_margin
+        self._refresh_lock = _fork.Lock()
+        self._stopped = threading.Event()
+        self._threads = []
+        # The generation the background refresher was started in, if any.
+        self._refresher_generation = None
+        self.project_id = project_id
+        self._httpd = _HTTPServer((host, port), self)
+
+    @property
+    def address(self):
+        """str: The ``host:port`` the server is listening on, suitable for the
+        ``GCE_METADATA_ROOT`` environment variable."""
+        host, port = self._httpd.server_address[:2]
+        return '{}:{}'.format(host, port)
+
+    @property
+    def service_account_email(self):
+        """str: The email of the service account, or ``'default'`` if it
+        isn't known."""
+        return getattr(self._credentials, '_service_account_email', None) or (
+            'default')
+
+    @property
+    def service_account_aliases(self):
+        """Sequence[str]: The names the service account is served under."""
+        return ('default', self.service_account_email)
+
+    @property
+    def scopes(self):
+        """Sequence[str]: The scopes of the credentials."""
+        return list(getattr(self._credentials, 'scopes', None) or ())
+
+    def _seconds_remaining(self):
+        """Returns how long the current access token remains valid, or None if
+        it doesn't expire."""
+        expiry = self._credentials.expiry
+        if expiry is None:
+            return None
+        return (expiry - _helpers.utcnow()).total_seconds()
+
+    def _needs_refresh(self):
+        """Checks if the access token is missing or about to expire."""
+        if not self._credentials.valid:
+            return True
+        remaining = self._seconds_remaining()
+        return remaining is not None and remaining < self._refresh_margin
+
+    def _refresh_if_needed(self):
+        """Refreshes the credentials if the access token is about to expire.
+
+        Only one thread refreshes at a time, others wait for its result.
+        """
+        if not self._needs_refresh():
+            return
+        with self._refresh_lock:
+            if self._needs_refresh():
+                _LOGGER.info('Refreshing served credentials.')
+                self._credentials.refresh(self._request)
+
+    def get_token(self):
+        """Gets the current access token, refreshing it if needed.
+
+        Returns:
+            Tuple[str, int]: The access token and the number of seconds it
+                remains valid for.
+
+        Raises:
+            google.auth.exceptions.RefreshError: If the credentials could
+                not be refreshed.
+        """
+        self._ensure_refresher()
+        self._refresh_if_needed()
+        remaining = self._seconds_remaining()
+        if remaining is None:
+            remaining = self._refresh_margin
+        return (_helpers.from_bytes(self._credentials.token),
+                max(int(remaining), 0))
+
+    def _refresh_loop(self):
+        """Keeps the access token refreshed ahead of its expiration."""
+        while not self._stopped.is_set():
+            try:
+                self._refresh_if_needed()
+                remaining = self._seconds_remaining()
+                if remaining is None:
+                    # The token never expires, there is nothing left to do.
+                    return
+                delay = max(remaining - self._refresh_margin, 0)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception('Failed to refresh served credentials.')
+                delay = _RETRY_INTERVAL_SECS
+            self._stopped.wait(max(delay, 1))
+
+    def _start_thread(self, target):
+        """Starts a daemon thread."""
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+        self._threads.append(thread)
+
+    def _start_refresher(self):
+        """Starts refreshing the access token in a background thread."""
+        self._refresher_generation = _fork.generation()
+        self._start_thread(self._refresh_loop)
+
+    def _ensure_refresher(self):
+        """Restarts the background refresher if the process has forked since
+        it was started, as the thread doesn't exist in the child."""
+        generation = self._refresher_generation
+        if generation is not None and generation != _fork.generation():
+            self._start_refresher()
+
+    def serve_forever(self):
+        """Serves requests until :meth:`stop` is called, refreshing the
+        access token in a background thread."""
+        self._start_refresher()
+        self._httpd.serve_forever()
+
+    def start(self):
+        """Starts serving requests in a background thread."""
+        self._start_thread(self.serve_forever)
+
+    def stop(self):
+        """Stops the server and its background threads."""
+        self._stopped.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+
+
+def _load_credentials(filename, scopes):
+    """Loads the credentials to serve.
+
+    Args:
+        filename (Optional[str]): The path to a service account key file. If
+            not specified, application default credentials are used.
+        scopes (Sequence[str]): The scopes to request.
+
+    Returns:
+        Tuple[google.auth.credentials.Credentials, Optional[str]]: The
+            credentials and project ID.
+    """
+    # pylint: disable=redefined-outer-name
+    import google.auth
+    from google.oauth2 import service_account
+
+    if filename is not None:
+        with open(filename, 'r') as file_obj:
+            project_id = json.load(file_obj).get('project_id')
+        credentials = service_account.Credentials.from_service_account_file(
+            filename, scopes=scopes)
+        return credentials, project_id
+
+    credentials, project_id = google.auth.default()
+    if scopes and getattr(credentials, 'requires_scopes', False):
+        credentials = credentials.with_scopes(scopes)
+    return credentials, project_id
+
+
+def main(argv=None):
+    """Runs the token server until interrupted.
+
+    Args:
+        argv (Sequence[str]): The command line arguments.
+    """
+    # The token endpoint uses HTTPS, which the internal http.client transport
+    # doesn't support.
+    import google.auth.transport.urllib3
+
+    parser = argparse.ArgumentParser(
+        description='Serves access tokens using the Compute Engine metadata '
+                    'server protocol.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument(
+        '--credentials',
+        help='Path to a service account key file. Defaults to application '
+             'default credentials.')
+    parser.add_argument('--scopes', nargs='*', default=[])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    credentials, project_id = _load_credentials(args.credentials, args.scopes)
+    request = google.auth.transport.urllib3.Request(
+        google.auth.transport.urllib3._make_default_http())
+    server = TokenServer(
+        credentials, request, host=args.host, port=args.port,
+        project_id=project_id)
+
+    _LOGGER.info('Serving tokens on %s', server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':  # pragma: NO COVER
+    main()
@@ -16,10 +16,106 @@
 """Interfaces for credentials."""
 
 import abc
+import collections
+import functools
+import logging
+import threading
 
 import six
 
+from google.auth import _cache
+from google.auth import _fork
 from google.auth import _helpers
+from google.auth import _refresh
+from google.auth import exceptions
+
+try:
+    from google.auth import _credentials_async
+except SyntaxError:  # pragma: NO COVER
+    # asyncio support requires Python 3.5 or later.
+    _credentials_async = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# The maximum number of derived credentials each set of credentials keeps.
+_DERIVED_CREDENTIALS_CACHE_SIZE = 32
+
+
+def _attribute_names(obj):
+    """Returns the names of an object's slotted and regular attributes."""
+    names = []
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        if isinstance(slots, six.string_types):
+            slots = (slots,)
+        names.extend(slots)
+    names.extend(getattr(obj, '__dict__', ()))
+    return names
+
+
+def _unpickled_attribute_names(obj):
+    """Returns the names of the attributes that an object's classes declare
+    in their ``_UNPICKLED_ATTRIBUTES``."""
+    names = set()
+    for cls in type(obj).__mro__:
+        names.update(cls.__dict__.get('_UNPICKLED_ATTRIBUTES', ()))
+    return names
+
+
+def _authorization_header(token):
+    """Returns the value of the authorization header for a bearer token."""
+    return 'Bearer {}'.format(_helpers.from_bytes(token))
+
+
+class _TokenState(collections.namedtuple('_TokenState', [
+        'token', 'expiry', 'expiry_deadline', 'stale_deadline', 'header'])):
+    """A token, when it expires and its authorization header.
+
+    The state is immutable. Credentials replace it as a whole when they are
+    refreshed, so that readers can use it without taking a lock.
+
+    Attributes:
+        token (Optional[str]): The bearer token.
+        expiry (Optional[datetime]): When the token expires.
+        expiry_deadline (Optional[float]): When the token expires, on the
+            monotonic clock, see :class:`google.auth._helpers.Clock`.
+        stale_deadline (Optional[float]): When the credentials become stale,
+            on the monotonic clock.
+        header (Optional[str]): The authorization header for the token, or
+            None if there is no token.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, token, expiry, refresh_ahead):
+        """Creates the state for a token.
+
+        Args:
+            token (Optional[str]): The bearer token.
+            expiry (Optional[datetime]): When the token expires.
+            refresh_ahead (float): How many seconds before the token expires
+                the credentials become stale, at most halfway through the
+                token's lifetime.
+
+        Returns:
+            _TokenState: The state.
+        """
+        expiry_deadline = None
+        stale_deadline = None
+        if expiry is not None:
+            expiry_deadline = _helpers.expiry_to_deadline(expiry)
+            remaining = max(expiry_deadline - _helpers.monotonic(), 0)
+            stale_deadline = expiry_deadline - min(
+                refresh_ahead, remaining / 2.0)
+
+        header = None
+        if isinstance(token, (six.text_type, six.binary_type)):
+            header = _authorization_header(token)
+
+        return cls(token, expiry, expiry_deadline, stale_deadline, header)
+
+
+_EMPTY_TOKEN_STATE = _TokenState(None, None, None, None, None)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -34,20 +130,181 @@ class Credentials(object):
     Credentials can do this automatically before the first HTTP request in
     :meth:`before_request`.
 
+    Shortly before the token expires the credentials become :attr:`stale`.
+    :meth:`before_request` then refreshes them ahead of time in a background
+    thread, while requests keep using the current token. Failed refreshes of
+    stale credentials are logged and retried, backing off between attempts,
+    until they succeed or the token expires.
+
+    How long before the token expires that happens depends on how long
+    refreshing the credentials took recently and how often it failed, see
+    :attr:`refresh_stats`. Until the credentials have been refreshed, they
+    become stale five minutes before the token expires. In any case they
+    become stale halfway through the token's lifetime at the latest.
+
     Although the token and expiration will change as the credentials are
     :meth:`refreshed <refresh>` and used, credentials should be considered
     immutable. Various credentials will accept configuration such as private
     keys, scopes, and other options. These options are not changeable after
     construction. Some classes will provide mechanisms to copy the credentials
     with modifications such as :meth:`ScopedCredentials.with_scopes`.
+
+    Applications using :mod:`asyncio` can refresh credentials without
+    blocking the event loop with :meth:`refresh_async` and
+    :meth:`before_request_async`, which take a
+    :class:`google.auth.transport.AsyncRequest`. Coroutines that need to
+    refresh the same credentials at the same time share a single refresh.
+    This requires Python 3.5 or later, and not all credentials support it.
+
+    The token and its expiration are replaced together in a single
+    assignment when the credentials are refreshed, so threads using the
+    credentials while another thread refreshes them see a consistent token
+    and expiration without taking a lock.
+
+    Credentials can be created and refreshed before the process forks, for
+    example when a pre-fork web server preloads the application. Child
+    processes keep using the parent's access token until it expires and do
+    not inherit any locks held by the parent's threads.
+
+    Credentials are slotted to keep their memory footprint small when many of
+    them are held at once. Subclasses that define ``__slots__`` must declare
+    their own attributes, subclasses that don't get a ``__dict__`` as usual.
+
+    Credentials can be pickled, for example to pass them to the workers of a
+    :class:`multiprocessing.Pool`. The pickle includes the current token and
+    its expiration so the workers don't need to refresh the credentials
+    before using them. Refresh hooks are not pickled. Attributes that are
+    specific to a process, such as locks and caches, are listed in the
+    ``_UNPICKLED_ATTRIBUTES`` of the class that defines them; such classes
+    recreate them in ``__setstate__``.
+
+    .. warning:: Pickled credentials contain secrets such as access tokens
+        and private keys. Only unpickle credentials from trusted sources and
+        don't store the pickles where others can read them.
     """
+    __slots__ = (
+        '_token_state', '_refresh_hooks', '_refresh_lock', '_refresh_failure',
+        '_revalidation', '_async_refresh', '_refresh_history', '__weakref__')
+    # Attributes that are specific to a process and therefore not pickled.
+    # Subclasses and mixins list their own, they are combined along the MRO.
+    _UNPICKLED_ATTRIBUTES = frozenset((
+        '__weakref__', '__dict__', '_token_state', '_refresh_hooks',
+        '_refresh_lock', '_refresh_failure', '_revalidation',
+        '_async_refresh', '_refresh_history'))
+
     def __init__(self):
-        self.token = None
+        # The token, its expiration and the authorization header, replaced
+        # as a whole so that readers don't need a lock, see _set_token.
+        self._token_state = _EMPTY_TOKEN_STATE
+        self._refresh_hooks = ()
+        # Serializes refreshes made by before_request, so that concurrent
+        # requests don't each refresh the credentials.
+        self._refresh_lock = _fork.Lock()
+        # Set after a failed refresh to back off from refreshing again, see
+        # google.auth.throttling.
+        self._refresh_failure = None
+        # The generation and thread of a background refresh of stale
+        # credentials, see google.auth._fork.
+        self._revalidation = None
+        # The event loop and task of an asynchronous refresh in progress.
+        self._async_refresh = None
+        # The latency and outcome of recent refreshes, see refresh_stats.
+        self._refresh_history = None
+
+    def __getstate__(self):
+        state = {}
+        unpickled = _unpickled_attribute_names(self)
+        for name in _attribute_names(self):
+            if name not in unpickled and hasattr(self, name):
+                state[name] = getattr(self, name)
+        token_state = self._token_state
+        state['token'] = token_state.token
+        state['_expiry'] = token_state.expiry
+        return state
+
+    def __setstate__(self, state):
+        self._token_state = _EMPTY_TOKEN_STATE
+        self._refresh_hooks = ()
+        self._refresh_lock = _fork.Lock()
+        self._refresh_failure = None
+        self._revalidation = None
+        self._async_refresh = None
+        self._refresh_history = None
+        state = dict(state)
+        token = state.pop('token', None)
+        expiry = state.pop('_expiry', None)
+        for name, value in six.iteritems(state):
+            setattr(self, name, value)
+        # Deadlines on the monotonic clock are meaningless in other processes,
+        # so recompute them from the expiration.
+        self._set_token(token, expiry)
+
+    def _set_token(self, token, expiry):
+        """Replaces the token and its expiration.
+
+        Both are replaced at once, so that concurrent readers see either the
+        previous token and expiration or the new ones but never a mix.
+        :meth:`refresh` implementations should use this instead of setting
+        :attr:`token` and :attr:`expiry` one after the other.
+
+        Args:
+            token (Optional[str]): The new token.
+            expiry (Optional[datetime]): When the new token expires, or None
+                if it doesn't.
+        """
+        self._token_state = _TokenState.create(
+            token, expiry, _refresh.refresh_ahead(self._refresh_history))
+
+    def _token_identity(self):
+        """Returns what makes the tokens of these credentials
+        interchangeable with those of other credentials.
+
+        Credentials with equal identities share their tokens if a
+        :class:`google.auth.token_sharing.TokenStore` is set. Subclasses
+        return a hashable tuple of their type, principal, scopes, subject and
+        token endpoint, or anything else that determines their tokens.
+
+        Returns:
+            Optional[Hashable]: The identity, or None if the credentials
+                don't share tokens.
+        """
+        return None
+
+    def _shared_state(self):
+        """Returns state that equivalent credentials adopt along with the
+        token of these credentials, such as a rotated refresh token.
+
+        Returns:
+            Any: The state, or None if there is none.
+        """
+        return None
+
+    def _adopt_shared_state(self, state):
+        """Adopts the :meth:`_shared_state` of equivalent credentials.
+
+        Args:
+            state (Any): The state, or None if there is none.
+        """
+
+    @property
+    def token(self):
         """str: The bearer token that can be used in HTTP headers to make
         authenticated requests."""
-        self.expiry = None
+        return self._token_state.token
+
+    @token.setter
+    def token(self, value):
+        self._set_token(value, self._token_state.expiry)
+
+    @property
+    def expiry(self):
         """Optional[datetime]: When the token expires and is no longer valid.
         If this is None, the token is assumed to never expire."""
+        return self._token_state.expiry
+
+    @expiry.setter
+    def expiry(self, value):
+        self._set_token(self._token_state.token, value)
 
     @property
     def expired(self):
@@ -56,8 +313,32 @@ class Credentials(object):
         Note that credentials can be invalid but not expired becaue Credentials
         with :attr:`expiry` set to None is considered to never expire.
         """
-        now = _helpers.utcnow()
-        return self.expiry is not None and self.expiry <= now
+        deadline = self._token_state.expiry_deadline
+        return deadline is not None and deadline <= _helpers.monotonic()
+
+    @property
+    def stale(self):
+        """Checks if the credentials should be refreshed soon.
+
+        Stale credentials can still be used until they are :attr:`expired`.
+        """
+        deadline = self._token_state.stale_deadline
+        return deadline is not None and deadline <= _helpers.monotonic()
+
+    @property
+    def refresh_stats(self):
+        """RefreshStats: Statistics about the recent refreshes of these
+        credentials, and how long before the token expires the credentials
+        become :attr:`stale` as a result."""
+        history = self._refresh_history
+        if history is None:
+            history = _refresh.RefreshHistory()
+        return RefreshStats(
+            refreshes=len(history),
+            error_rate=history.error_rate,
+            latency_p50=history.latency_percentile(50),
+            latency_p95=history.latency_percentile(95),
+            refresh_ahead=_refresh.refresh_ahead(history))
 
     @property
     def valid(self):
@@ -66,7 +347,10 @@ class Credentials(object):
         This is True if the credentials have a :attr:`token` and the token
         is not :attr:`expired`.
         """
-        return self.token is not None and not self.expired
+        state = self._token_state
+        deadline = state.expiry_deadline
+        return state.token is not None and (
+            deadline is None or deadline > _helpers.monotonic())
 
     @abc.abstractmethod
     def refresh(self, request):
@@ -84,6 +368,54 @@ class Credentials(object):
         # (pylint doesn't recognize that this is abstract)
         raise NotImplementedError('Refresh must be implemented')
 
+    def refresh_async(self, request):
+        """Refreshes the access token without blocking the event loop.
+
+        This is the :mod:`asyncio` counterpart of :meth:`refresh`. Blocking
+        work such as signing is done in the event loop's default executor.
+
+        Args:
+            request (google.auth.transport.AsyncRequest): The object used to
+                make HTTP requests.
+
+        Returns:
+            Awaitable[None]: Completes when the credentials are refreshed.
+
+        Raises:
+            google.auth.exceptions.RefreshError: If the credentials could
+                not be refreshed.
+            NotImplementedError: If the credentials don't support
+                asynchronous refreshes.
+        """
+        raise NotImplementedError(
+            '{} can not be refreshed asynchronously.'.format(
+                type(self).__name__))
+
+    def add_refresh_hook(self, hook):
+        """Registers a hook that is notified about refreshes of these
+        credentials.
+
+        Hooks are not copied to credentials derived from these credentials,
+        for example by :meth:`Scoped.with_scopes`.
+
+        Args:
+            hook (RefreshHook): The hook to register.
+        """
+        self._refresh_hooks = self._refresh_hooks + (hook,)
+
+    def remove_refresh_hook(self, hook):
+        """Unregisters a hook registered with :meth:`add_refresh_hook`.
+
+        Args:
+            hook (RefreshHook): The hook to unregister.
+
+        Raises:
+            ValueError: If the hook isn't registered.
+        """
+        hooks = list(self._refresh_hooks)
+        hooks.remove(hook)
+        self._refresh_hooks = tuple(hooks)
+
     def apply(self, headers, token=None):
         """Apply the token to the authentication header.
 
@@ -92,14 +424,22 @@ class Credentials(object):
             token (Optional[str]): If specified, overrides the current access
                 token.
         """
-        headers['authorization'] = 'Bearer {}'.format(
-            _helpers.from_bytes(token or self.token))
+        if token:
+            headers['authorization'] = _authorization_header(token)
+            return
+        state = self._token_state
+        if state.header is not None:
+            headers['authorization'] = state.header
+        else:
+            headers['authorization'] = _authorization_header(state.token)
 
     def before_request(self, request, method, url, headers):
         """Performs credential-specific before request logic.
 
         Refreshes the credentials if necessary, then calls :meth:`apply` to
-        apply the token to the authentication header.
+        apply the token to the authentication header. If the credentials are
+        :attr:`stale` but not expired, they are refreshed in the background
+        and the request goes ahead with the current token.
 
         Args:
             request (google.auth.transport.Request): The object used to make
@@ -111,10 +451,199 @@ class Credentials(object):
         # pylint: disable=unused-argument
         # (Subclasses may use these arguments to ascertain information about
         # the http request.)
-        if not self.valid:
-            self.refresh(request)
+        self._ensure_valid(request)
         self.apply(headers)
 
+    def before_request_async(self, request, method, url, headers):
+        """Performs credential-specific before request logic without blocking
+        the event loop.
+
+        This is the :mod:`asyncio` counterpart of :meth:`before_request`. It
+        refreshes the credentials with :meth:`refresh_async` if necessary,
+        then calls :meth:`apply`. Stale credentials are refreshed in the
+        background while the request goes ahead with the current token.
+
+        Args:
+            request (google.auth.transport.AsyncRequest): The object used to
+                make HTTP requests.
+            method (str): The request's HTTP method.
+            url (str): The request's URI.
+            headers (Mapping): The request's headers.
+
+        Returns:
+            Awaitable[None]: Completes when the headers are updated.
+        """
+        return _credentials_async.before_request(
+            self, request, method, url, headers)
+
+    def _ensure_valid(self, request):
+        """Refreshes the credentials if they are invalid or stale.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+
+        Raises:
+            google.auth.exceptions.RefreshError: If the credentials are
+                invalid and could not be refreshed.
+        """
+        if not self.valid:
+            self._refresh_once(request)
+        elif self.stale:
+            self._revalidate(request)
+
+    def _refresh_once(self, request):
+        """Refreshes the credentials unless another thread refreshed them
+        while this one waited for its turn.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+        """
+        with self._refresh_lock:
+            if not self.valid:
+                self.refresh(request)
+
+    def _revalidating(self):
+        """Checks if stale credentials are being refreshed in the
+        background."""
+        revalidation = self._revalidation
+        return (
+            revalidation is not None and
+            revalidation[0] == _fork.generation() and
+            revalidation[1].is_alive())
+
+    def _revalidate(self, request):
+        """Starts refreshing stale credentials in the background, unless
+        that is already in progress.
+
+        The caller and other threads keep using the current token while the
+        credentials are being refreshed.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+        """
+        if self._revalidating() or not self._refresh_lock.acquire(False):
+            return
+
+        try:
+            if not self.stale or self._revalidating():
+                return
+            thread = threading.Thread(
+                target=self._revalidate_in_background, args=(request,),
+                name='google-auth-revalidate')
+            thread.daemon = True
+            self._revalidation = (_fork.generation(), thread)
+            thread.start()
+        finally:
+            self._refresh_lock.release()
+
+    def _revalidate_in_background(self, request):
+        """Refreshes stale credentials until it succeeds or the credentials
+        expire, backing off between attempts.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+        """
+        failures = 0
+        while self.valid and self.stale:
+            with self._refresh_lock:
+                if not (self.valid and self.stale):
+                    return
+                try:
+                    self.refresh(request)
+                    return
+                except exceptions.GoogleAuthError as exc:
+                    _LOGGER.warning(
+                        'Failed to refresh stale credentials: %s', exc)
+
+            # Not every failure sets a backoff, for example if the refresh
+            # was rejected before it started, so always wait at least as
+            # long as the backoff after that many failures.
+            failures += 1
+            delay = _refresh.backoff_delay(failures)
+            failure = self._refresh_failure
+            if failure is not None:
+                delay = max(delay, failure.retry_at - _helpers.monotonic())
+            _helpers.sleep(delay)
+
+
+RefreshStats = collections.namedtuple(
+    'RefreshStats', [
+        'refreshes', 'error_rate', 'latency_p50', 'latency_p95',
+        'refresh_ahead'])
+"""Statistics about the recent refreshes of a set of credentials.
+
+Only refreshes that succeeded or failed with a
+:class:`~google.auth.exceptions.RefreshError` or
+:class:`~google.auth.exceptions.TransportError` are included, refreshes that
+were throttled are not.
+
+Attributes:
+    refreshes (int): The number of recent refreshes the statistics are based
+        on.
+    error_rate (float): The fraction of these refreshes that failed.
+    latency_p50 (Optional[float]): The median refresh latency in seconds, or
+        None if the credentials haven't been refreshed.
+    latency_p95 (Optional[float]): The 95th percentile of the refresh
+        latency in seconds, or None if the credentials haven't been
+        refreshed.
+    refresh_ahead (float): How many seconds before the token expires the
+        credentials become stale, unless the token's lifetime is shorter than
+        twice that.
+"""
+
+
+class RefreshHook(object):
+    """Receives notifications about credential refreshes.
+
+    Register an instance with :meth:`Credentials.add_refresh_hook` and
+    override the methods for the events of interest, for example to record
+    metrics::
+
+        class MetricsHook(credentials.RefreshHook):
+            def on_refresh_success(self, credentials, timings):
+                histogram.observe(timings['total'])
+
+        credentials.add_refresh_hook(MetricsHook())
+
+    Timings are reported in seconds as a mapping of phase names to durations.
+    ``'total'`` is always present and covers the whole refresh. Depending on
+    the credentials other phases may be present: ``'sign'`` for signing an
+    assertion, ``'http'`` for HTTP round trips and ``'parse'`` for parsing
+    responses.
+
+    Exceptions raised by hooks are logged and otherwise ignored.
+    """
+
+    def on_refresh_start(self, credentials):
+        """Called before the credentials are refreshed.
+
+        Args:
+            credentials (Credentials): The credentials being refreshed.
+        """
+
+    def on_refresh_success(self, credentials, timings):
+        """Called after the credentials were successfully refreshed.
+
+        Args:
+            credentials (Credentials): The refreshed credentials.
+            timings (Mapping[str, float]): The time spent in each phase of
+                the refresh.
+        """
+
+    def on_refresh_failure(self, credentials, exc, timings):
+        """Called after the credentials failed to refresh.
+
+        Args:
+            credentials (Credentials): The credentials being refreshed.
+            exc (Exception): The error raised by the refresh.
+            timings (Mapping[str, float]): The time spent in each phase of
+                the refresh.
+        """
+
 
 @six.add_metaclass(abc.ABCMeta)
 class Scoped(object):
@@ -143,11 +672,28 @@ class Scoped(object):
     Some credentials have scopes but do not allow or require scopes to be set,
     these credentials can be used as-is.
 
+    Credentials may return the same instance when :meth:`with_scopes` is
+    called again with the same scopes, so that libraries that scope
+    credentials for each client they construct share one access token.
+
     .. _RFC6749 Section 3.3: https://tools.ietf.org/html/rfc6749#section-3.3
+
+    Subclasses that define ``__slots__`` must include the ``_scopes`` and
+    ``_derived_credentials`` attributes.
     """
+    __slots__ = ()
+    _UNPICKLED_ATTRIBUTES = frozenset(('_derived_credentials',))
+
     def __init__(self):
         super(Scoped, self).__init__()
         self._scopes = None
+        # Credentials derived from these credentials, created on demand, see
+        # _derive.
+        self._derived_credentials = None
+
+    def __setstate__(self, state):
+        self._derived_credentials = None
+        super(Scoped, self).__setstate__(state)
 
     @property
     def scopes(self):
@@ -164,9 +710,16 @@ class Scoped(object):
     def with_scopes(self, scopes):
         """Create a copy of these credentials with the specified scopes.
 
+        Credentials may memoize the copy: calling this method again with the
+        same scopes, in the same order, then returns the same instance, which
+        shares its access token with the previous callers.
+
         Args:
             scopes (Sequence[str]): The list of scopes to request.
 
+        Returns:
+            google.auth.credentials.Credentials: The scoped credentials.
+
         Raises:
             NotImplementedError: If the credentials' scopes can not be changed.
                 This can be avoided by checking :attr:`requires_scopes` before
@@ -174,6 +727,29 @@ class Scoped(object):
         """
         raise NotImplementedError('This class does not require scoping.')
 
+    def _derive(self, key, create):
+        """Returns credentials derived from these credentials, reusing
+        previously derived credentials with the same key.
+
+        Only the most recently used derived credentials are kept.
+
+        Args:
+            key (Hashable): Identifies the derived credentials, for example
+                the tuple of scopes.
+            create (Callable[[], Credentials]): Creates the derived
+                credentials if they haven't been derived yet.
+
+        Returns:
+            Credentials: The derived credentials.
+        """
+        derived = _cache.get_or_create(
+            self, '_derived_credentials', functools.partial(
+                _cache.LRUCache, _DERIVED_CREDENTIALS_CACHE_SIZE))
+        credentials = derived.get(key)
+        if credentials is None:
+            credentials = derived.setdefault(key, create())
+        return credentials
+
     def has_scopes(self, scopes):
         """Checks if the credentials have the given scopes.
 
@@ -189,6 +765,7 @@ class Scoped(object):
 @six.add_metaclass(abc.ABCMeta)
 class Signing(object):
     """Interface for credentials that can cryptographically sign messages."""
+    __slots__ = ()
 
     @abc.abstractmethod
     def sign_bytes(self, message):
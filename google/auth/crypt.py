@@ -37,6 +37,11 @@ To sign messages use :class:`Signer` with a private key::
     signer = crypt.Signer(private_key)
     signature = signer.sign(message)
 
+Parsing a private key is expensive. If the key may never be used, a
+:class:`LazySigner` defers parsing it until the first message is signed::
+
+    signer = crypt.LazySigner(private_key)
+
 """
 
 from pyasn1.codec.der import decoder
@@ -86,10 +91,17 @@ class Verifier(object):
         public_key (rsa.key.PublicKey): The public key used to verify
             signatures.
     """
+    __slots__ = ('_pubkey',)
 
     def __init__(self, public_key):
         self._pubkey = public_key
 
+    def __getstate__(self):
+        return {'public_key': self._pubkey}
+
+    def __setstate__(self, state):
+        self._pubkey = state['public_key']
+
     def verify(self, message, signature):
         """Verifies a message against a cryptographic signature.
 
@@ -168,17 +180,27 @@ def verify_signature(message, signature, certs):
 class Signer(object):
     """Signs messages with a private key.
 
+    Signers can be pickled. Note that the pickle contains the private key.
+
     Args:
         private_key (rsa.key.PrivateKey): The private key to sign with.
         key_id (str): Optional key ID used to identify this private key. This
             can be useful to associate the private key with its associated
             public key or certificate.
     """
+    __slots__ = ('_key', 'key_id')
 
     def __init__(self, private_key, key_id=None):
         self._key = private_key
         self.key_id = key_id
 
+    def __getstate__(self):
+        return {'private_key': self._key, 'key_id': self.key_id}
+
+    def __setstate__(self, state):
+        self._key = state['private_key']
+        self.key_id = state['key_id']
+
     def sign(self, message):
         """Signs a message.
 
@@ -227,3 +249,61 @@ class Signer(object):
             raise ValueError('No key could be detected.')
 
         return cls(private_key, key_id=key_id)
+
+
+class LazySigner(object):
+    """Signs messages with a private key that is parsed when the first
+    message is signed.
+
+    Only the presence of a PEM marker is checked when the signer is created,
+    errors found while parsing the key are raised by :meth:`sign`.
+
+    Signers can be pickled. Note that the pickle contains the private key.
+
+    Args:
+        key (Union[str, bytes]): Private key in PEM format.
+        key_id (str): An optional key id used to identify the private key.
+
+    Raises:
+        ValueError: If the key is not in PEM format.
+    """
+    __slots__ = ('_key', '_signer', 'key_id')
+
+    def __init__(self, key, key_id=None):
+        key = _helpers.from_bytes(key)
+        if _PKCS1_MARKER[0] not in key and _PKCS8_MARKER[0] not in key:
+            raise ValueError('No key could be detected.')
+        self._key = key
+        self._signer = None
+        self.key_id = key_id
+
+    def __getstate__(self):
+        return {'key': self._key, 'key_id': self.key_id}
+
+    def __setstate__(self, state):
+        self.__init__(state['key'], key_id=state['key_id'])
+
+    def _load(self):
+        """Returns the signer for the parsed key, parsing it if needed."""
+        signer = self._signer
+        if signer is None:
+            # Threads signing concurrently may each parse the key, only one
+            # of the results is kept.
+            signer = Signer.from_string(self._key, key_id=self.key_id)
+            self._signer = signer
+        return signer
+
+    def sign(self, message):
+        """Signs a message, parsing the private key first if needed.
+
+        Args:
+            message (Union[str, bytes]): The message to be signed.
+
+        Returns:
+            bytes: The signature of the message for the given key.
+
+        Raises:
+            ValueError: If the key cannot be parsed as PKCS#1 or PKCS#8 in
+                PEM format.
+        """
+        return self._load().sign(message)
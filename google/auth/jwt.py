@@ -48,6 +48,7 @@ import json
 from six.moves import urllib
 
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import _service_account_info
 from google.auth import credentials
 from google.auth import crypt
@@ -160,7 +161,7 @@ def _verify_iat_and_exp(payload):
     Raises:
         ValueError: if any checks failed.
     """
-    now = _helpers.datetime_to_secs(_helpers.utcnow())
+    now = _helpers.utcnow_secs()
 
     # Make sure the iat and exp claims are present
     for key in ('iat', 'exp'):
@@ -288,6 +289,9 @@ class Credentials(credentials.Signing,
         new_credentials = credentials.with_claims(
             audience='https://vision.googleapis.com')
     """
+    __slots__ = (
+        '_signer', '_issuer', '_subject', '_audience', '_token_lifetime',
+        '_additional_claims')
 
     def __init__(self, signer, issuer=None, subject=None, audience=None,
                  additional_claims=None,
@@ -341,6 +345,8 @@ class Credentials(credentials.Signing,
         """Creates a Credentials instance from a dictionary containing service
         account info in Google format.
 
+        The private key is parsed when the credentials first sign a token.
+
         Args:
             info (Mapping[str, str]): The service account info in Google
                 format.
@@ -353,7 +359,7 @@ class Credentials(credentials.Signing,
             ValueError: If the info is not in the expected format.
         """
         signer = _service_account_info.from_dict(
-            info, require=['client_email'])
+            info, require=['client_email'], lazy=True)
         return cls._from_signer_and_info(signer, info, **kwargs)
 
     @classmethod
@@ -369,7 +375,7 @@ class Credentials(credentials.Signing,
             google.auth.jwt.Credentials: The constructed credentials.
         """
         info, signer = _service_account_info.from_filename(
-            filename, require=['client_email'])
+            filename, require=['client_email'], lazy=True)
         return cls._from_signer_and_info(signer, info, **kwargs)
 
     def with_claims(self, issuer=None, subject=None, audience=None,
@@ -422,7 +428,8 @@ class Credentials(credentials.Signing,
 
         payload.update(self._additional_claims)
 
-        jwt = encode(self._signer, payload)
+        with _refresh.phase('sign'):
+            jwt = encode(self._signer, payload)
 
         return jwt, expiry
 
@@ -442,6 +449,7 @@ class Credentials(credentials.Signing,
         token, _ = self._make_jwt(audience=audience)
         return token
 
+    @_refresh.refresh_method
     def refresh(self, request):
         """Refreshes the access token.
 
@@ -450,7 +458,7 @@ class Credentials(credentials.Signing,
         """
         # pylint: disable=unused-argument
         # (pylint doesn't correctly recognize overridden methods.)
-        self.token, self.expiry = self._make_jwt()
+        self._set_token(*self._make_jwt())
 
     def sign_bytes(self, message):
         """Signs the given message.
@@ -483,8 +491,7 @@ class Credentials(credentials.Signing,
         # If this set of credentials has a pre-set audience, just ensure that
         # there is a valid token and apply the auth headers.
         if self._audience:
-            if not self.valid:
-                self.refresh(request)
+            self._ensure_valid(request)
             self.apply(headers)
         # Otherwise, generate a one-time token using the URL
         # (without the query string and fragment) as the audience.
@@ -0,0 +1,283 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bundles of many service account keys.
+
+Applications holding a service account key per tenant would otherwise read
+and parse thousands of JSON files at startup. A key bundle packs the keys
+into a single file, built ahead of time::
+
+    google.auth.key_bundle.build_from_files(
+        '/keys/bundle.keys', glob.glob('/keys/*.json'))
+
+A :class:`KeyBundle` memory-maps the file and finds keys through an index
+stored in it, by client email or by private key ID. Opening a bundle reads
+nothing but its header, and only the pages holding the keys that are looked
+up are loaded into memory. Combined with a
+:class:`~google.auth.registry.CredentialsRegistry`, the key of a tenant is
+parsed when its credentials are first used::
+
+    bundle = google.auth.key_bundle.KeyBundle('/keys/bundle.keys')
+
+    def load(client_email):
+        return service_account.Credentials.from_service_account_info(
+            bundle.get(client_email=client_email), scopes=SCOPES)
+
+    registry = google.auth.registry.CredentialsRegistry(load)
+
+The bundle starts with a header holding its format version and the location
+of the two indexes. It is followed by the service account info of each key,
+as JSON, and then by the indexes. Each index is an array of fixed-size
+records, sorted by a hash of the client email or key ID, which point to the
+info. A lookup is a binary search of an index.
+"""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+from google.auth import _helpers
+from google.auth import _service_account_info
+
+_MAGIC = b'GAKEYS01'
+# The magic string, then the offset and the number of records of the index by
+# client email, then those of the index by key ID.
+_HEADER = struct.Struct('>8sQIQI')
+# The hash of the client email or key ID, then the offset and the length of
+# the service account info.
+_RECORD = struct.Struct('>QQI')
+
+# os.replace is not available in Python 2.7, where os.rename is atomic on
+# POSIX systems.
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _hash(value):
+    """Returns the hash of a client email or key ID used in the indexes.
+
+    Args:
+        value (str): The client email or key ID.
+
+    Returns:
+        int: The hash, an unsigned 64-bit integer.
+    """
+    digest = hashlib.sha256(_helpers.to_bytes(value)).digest()
+    return struct.unpack('>Q', digest[:8])[0]
+
+
+def _index(records):
+    """Serializes an index.
+
+    Args:
+        records (Sequence[Tuple[int, int, int]]): The hash, offset and length
+            of each entry.
+
+    Returns:
+        bytes: The index, sorted by hash. Entries with the same hash keep
+            their order.
+    """
+    records = sorted(records, key=lambda record: record[0])
+    return b''.join(_RECORD.pack(*record) for record in records)
+
+
+def build(filename, infos):
+    """Builds a key bundle.
+
+    The bundle is written to a temporary file which then replaces
+    ``filename``, so that processes that are reading the previous bundle
+    keep reading a consistent file.
+
+    Args:
+        filename (str): The path of the bundle.
+        infos (Iterable[Mapping[str, str]]): The service account info of each
+            key, in Google format. If several keys have the same client
+            email, looking that email up finds the first of them.
+
+    Raises:
+        ValueError: If the info is not in the expected format, or if its
+            private key can't be parsed.
+    """
+    entries = []
+    email_records = []
+    key_id_records = []
+    offset = _HEADER.size
+
+    for info in infos:
+        # Parse the key now rather than when it's used.
+        _service_account_info.from_dict(info, require=['client_email'])
+        entry = json.dumps(info, sort_keys=True).encode('utf-8')
+        entries.append(entry)
+        email_records.append(
+            (_hash(info['client_email']), offset, len(entry)))
+        if info.get('private_key_id'):
+            key_id_records.append(
+                (_hash(info['private_key_id']), offset, len(entry)))
+        offset += len(entry)
+
+    email_index = _index(email_records)
+    key_id_index = _index(key_id_records)
+    header = _HEADER.pack(
+        _MAGIC, offset, len(email_records),
+        offset + len(email_index), len(key_id_records))
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with io.open(fd, 'wb') as file_obj:
+            file_obj.write(header)
+            for entry in entries:
+                file_obj.write(entry)
+            file_obj.write(email_index)
+            file_obj.write(key_id_index)
+        _replace(temp_path, filename)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def _read_infos(filenames):
+    """Reads service account info files one at a time."""
+    for key_filename in filenames:
+        with io.open(key_filename, 'r', encoding='utf-8') as json_file:
+            yield json.load(json_file)
+
+
+def build_from_files(filename, key_filenames):
+    """Builds a key bundle from service account JSON files.
+
+    Args:
+        filename (str): The path of the bundle.
+        key_filenames (Iterable[str]): The paths of the service account
+            files.
+
+    Raises:
+        ValueError: If a file is not in the expected format, or if its
+            private key can't be parsed.
+    """
+    build(filename, _read_infos(key_filenames))
+
+
+class KeyBundle(object):
+    """A memory-mapped key bundle built with :func:`build`.
+
+    Lookups are thread-safe. The bundle stays mapped until :meth:`close` is
+    called; replacing the file with a new bundle doesn't affect bundles that
+    are already open.
+
+    Args:
+        filename (str): The path of the bundle.
+
+    Raises:
+        ValueError: If the file is not a key bundle.
+    """
+
+    def __init__(self, filename):
+        with io.open(filename, 'rb') as file_obj:
+            size = os.fstat(file_obj.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(
+                    '{} is not a key bundle.'.format(filename))
+            self._map = mmap.mmap(
+                file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, email_offset, email_count, key_id_offset, key_id_count = (
+            _HEADER.unpack_from(self._map, 0))
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError('{} is not a key bundle.'.format(filename))
+        self._email_index = (email_offset, email_count)
+        self._key_id_index = (key_id_offset, key_id_count)
+
+    def __len__(self):
+        return self._email_index[1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Unmaps the bundle."""
+        self._map.close()
+
+    def _record(self, index, position):
+        """Reads a record of an index."""
+        offset, _ = index
+        return _RECORD.unpack_from(self._map, offset + position * _RECORD.size)
+
+    def _find(self, index, field, value):
+        """Finds the info whose field has the given value.
+
+        Args:
+            index (Tuple[int, int]): The offset and number of records of the
+                index by that field.
+            field (str): The field, ``'client_email'`` or
+                ``'private_key_id'``.
+            value (str): The value to look up.
+
+        Returns:
+            Optional[Mapping[str, str]]: The info, or None if no key has the
+                value.
+        """
+        target = _hash(value)
+        low, high = 0, index[1]
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(index, middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+
+        # Distinct values may have the same hash.
+        for position in range(low, index[1]):
+            value_hash, offset, length = self._record(index, position)
+            if value_hash != target:
+                break
+            info = json.loads(
+                self._map[offset:offset + length].decode('utf-8'))
+            if info.get(field) == value:
+                return info
+        return None
+
+    def get(self, client_email=None, key_id=None):
+        """Looks up the service account info of a key.
+
+        Args:
+            client_email (str): The service account's email.
+            key_id (str): The private key ID. If both are specified, the key
+                with this ID is returned if it belongs to ``client_email``.
+
+        Returns:
+            Optional[Mapping[str, str]]: The service account info in Google
+                format, which can be passed to
+                :meth:`google.oauth2.service_account.Credentials.from_service_account_info`,
+                or None if the bundle has no such key.
+
+        Raises:
+            ValueError: If neither ``client_email`` nor ``key_id`` is
+                specified.
+        """
+        if key_id is not None:
+            info = self._find(self._key_id_index, 'private_key_id', key_id)
+            if info is None or client_email is None:
+                return info
+            return info if info['client_email'] == client_email else None
+        if client_email is not None:
+            return self._find(self._email_index, 'client_email', client_email)
+        raise ValueError('Either client_email or key_id must be specified.')
@@ -0,0 +1,145 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A registry of credentials for many tenants.
+
+Multi-tenant applications may hold separate credentials for each of their
+tenants, for example a service account key per customer project. Keeping all
+of them in memory is expensive, and re-creating them for every use means
+parsing the private key and acquiring a new access token each time.
+
+A :class:`CredentialsRegistry` creates credentials on first use with a loader
+callback and keeps the most recently used ones, including their access
+tokens::
+
+    def load(tenant_id):
+        return service_account.Credentials.from_service_account_file(
+            '/keys/{}.json'.format(tenant_id), scopes=SCOPES)
+
+    registry = google.auth.registry.CredentialsRegistry(load, max_size=1000)
+
+    credentials = registry.get('tenant-1234')
+
+The registry can be bounded by the number of credentials, by their total
+weight, or both. A weight can be anything that approximates the cost of
+keeping the credentials, such as their size in bytes::
+
+    registry = google.auth.registry.CredentialsRegistry(
+        load, max_size=100000, max_weight=256 * 1024 * 1024,
+        weigher=lambda credentials: 8 * 1024)
+"""
+
+import collections
+
+from google.auth import _cache
+from google.auth import _fork
+
+_DEFAULT_MAX_SIZE = 1000
+
+
+RegistryStats = collections.namedtuple(
+    'RegistryStats', ['hits', 'misses', 'evictions', 'size', 'weight'])
+"""Statistics about a :class:`CredentialsRegistry`.
+
+Attributes:
+    hits (int): The number of lookups that found credentials in the registry.
+    misses (int): The number of lookups that had to load credentials.
+    evictions (int): The number of credentials discarded to stay within the
+        registry's limits.
+    size (int): The number of credentials in the registry.
+    weight (int): The total weight of the credentials in the registry, or 0
+        if the registry doesn't weigh credentials.
+"""
+
+
+class CredentialsRegistry(object):
+    """Credentials for many tenants, loaded on demand and discarded when
+    unused.
+
+    Args:
+        loader (Callable[[Hashable], google.auth.credentials.Credentials]):
+            Creates the credentials for a tenant ID. It may be called
+            concurrently, and more than once for the same tenant if the
+            tenant is looked up by several threads at once; only one of the
+            resulting credentials is kept.
+        max_size (int): The maximum number of credentials to keep.
+        max_weight (Optional[int]): The maximum total weight of the
+            credentials to keep.
+        weigher (Optional[Callable[[google.auth.credentials.Credentials],
+            int]]): Returns the weight of credentials. Required if
+            ``max_weight`` is specified.
+    """
+
+    def __init__(self, loader, max_size=_DEFAULT_MAX_SIZE, max_weight=None,
+                 weigher=None):
+        self._loader = loader
+        self._cache = _cache.LRUCache(
+            max_size, maxweight=max_weight, weigher=weigher)
+        self._stats_lock = _fork.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self._cache
+
+    def get(self, tenant_id):
+        """Gets the credentials for a tenant, loading them if needed.
+
+        Args:
+            tenant_id (Hashable): The tenant ID.
+
+        Returns:
+            google.auth.credentials.Credentials: The tenant's credentials.
+
+        Raises:
+            Exception: Any error raised by the loader.
+        """
+        credentials = self._cache.get(tenant_id)
+        if credentials is not None:
+            with self._stats_lock:
+                self._hits += 1
+            return credentials
+
+        with self._stats_lock:
+            self._misses += 1
+
+        credentials = self._loader(tenant_id)
+        return self._cache.setdefault(tenant_id, credentials)
+
+    def invalidate(self, tenant_id):
+        """Discards the credentials for a tenant, for example because its key
+        was revoked. They are loaded again on the next lookup.
+
+        Args:
+            tenant_id (Hashable): The tenant ID.
+        """
+        self._cache.pop(tenant_id)
+
+    def clear(self):
+        """Discards all credentials."""
+        self._cache.clear()
+
+    @property
+    def stats(self):
+        """RegistryStats: Statistics about the registry's usage."""
+        with self._stats_lock:
+            return RegistryStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._cache.evictions,
+                size=len(self._cache),
+                weight=self._cache.weight)
@@ -0,0 +1,135 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Protection against refresh storms.
+
+When the token endpoint or the metadata server is unavailable, every request
+made with invalid credentials would otherwise try to refresh them again right
+away, piling more load onto a service that is already struggling.
+
+After a refresh fails with a :class:`~google.auth.exceptions.RefreshError` or
+:class:`~google.auth.exceptions.TransportError`, credentials therefore don't
+try again until an exponentially increasing, randomized delay has passed.
+Refreshes during that time fail immediately with a
+:class:`~google.auth.exceptions.RefreshError` that includes the original
+error. A successful refresh resets the delay.
+
+In addition, the number of refreshes per second across all credentials in the
+process can be limited::
+
+    google.auth.throttling.set_refresh_rate_limit(10, burst=50)
+
+The limit only applies to refreshes that call the token endpoint or the
+metadata server. Credentials that sign their own tokens, such as
+:class:`google.auth.jwt.Credentials`, aren't limited. Refreshes exceeding the
+limit also fail immediately with a
+:class:`~google.auth.exceptions.RefreshError`, and back off like other
+failed refreshes.
+"""
+
+from google.auth import _fork
+from google.auth import _helpers
+from google.auth import exceptions
+
+_refresh_rate_limit = None
+
+
+class TokenBucket(object):
+    """Limits the rate of events while allowing short bursts.
+
+    The bucket holds up to ``capacity`` tokens and is refilled with ``rate``
+    tokens per second. Each event takes a token from the bucket, and events
+    are rejected while the bucket is empty.
+
+    Args:
+        rate (float): The number of tokens added per second.
+        capacity (Optional[float]): The maximum number of tokens. Defaults to
+            one second worth of tokens, or a single token if the rate is less
+            than one per second.
+
+    Raises:
+        ValueError: If the rate or the capacity is not positive.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if capacity is None:
+            capacity = max(rate, 1)
+        if rate <= 0 or capacity <= 0:
+            raise ValueError('The rate and the capacity must be positive.')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = _helpers.monotonic()
+        self._lock = _fork.Lock()
+
+    def try_acquire(self):
+        """Takes a token from the bucket if one is available.
+
+        Returns:
+            bool: True if a token was taken, False if the bucket is empty.
+        """
+        with self._lock:
+            now = _helpers.monotonic()
+            elapsed = max(now - self._updated, 0)
+            self._tokens = min(
+                self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def set_refresh_rate_limit(rate, burst=None):
+    """Limits the number of refreshes per second across all credentials.
+
+    Args:
+        rate (Optional[float]): The number of refreshes allowed per second on
+            average, or None to remove the limit.
+        burst (Optional[float]): The number of refreshes allowed in a burst.
+            See :class:`TokenBucket` for the default.
+
+    Raises:
+        ValueError: If the rate or the burst is not positive.
+    """
+    global _refresh_rate_limit  # pylint: disable=global-statement
+    if rate is None:
+        _refresh_rate_limit = None
+    else:
+        _refresh_rate_limit = TokenBucket(rate, burst)
+
+
+def get_refresh_rate_limit():
+    """Returns the limit set with :func:`set_refresh_rate_limit`.
+
+    Returns:
+        Optional[TokenBucket]: The limit, or None if refreshes aren't limited.
+    """
+    return _refresh_rate_limit
+
+
+def check_refresh_rate_limit():
+    """Counts a request for a token against the limit set with
+    :func:`set_refresh_rate_limit`.
+
+    This is called before requesting a token from the token endpoint or the
+    metadata server, once per refresh.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the limit was exceeded.
+    """
+    rate_limit = get_refresh_rate_limit()
+    if rate_limit is not None and not rate_limit.try_acquire():
+        raise exceptions.RefreshError('The refresh rate limit was exceeded.')
@@ -0,0 +1,164 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Persistent access token caches.
+
+When many processes on the same host use the same credentials, for example
+the workers of a pre-fork web server, each of them would otherwise acquire its
+own access token. A :class:`FileTokenCache` lets the processes share tokens
+through files in a directory::
+
+    cache = token_cache.FileTokenCache('/var/run/myapp/tokens')
+    credentials = service_account.Credentials.from_service_account_file(
+        'service-account.json', token_cache=cache)
+
+When the credentials need to be refreshed they first check the cache while
+holding a lock, so only one process at a time goes to the network for a given
+set of credentials and the others pick up its token.
+
+.. warning:: Access tokens are written to disk in plain text. The cache
+    directory is created so that it is only accessible by the current user,
+    make sure an existing directory is not readable by others.
+"""
+
+import contextlib
+import datetime
+import errno
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # pragma: NO COVER
+    fcntl = None
+
+from google.auth import _helpers
+
+_DEFAULT_MIN_REMAINING_SECS = 300  # 5 minutes in seconds
+
+# os.replace is not available in Python 2.7, where os.rename is atomic on
+# POSIX systems.
+_replace = getattr(os, 'replace', os.rename)
+
+
+class FileTokenCache(object):
+    """A token cache backed by files in a directory, shared across processes.
+
+    Each entry is stored in its own file which is replaced atomically when the
+    entry is updated. Access to an entry is serialized across processes with an
+    advisory lock on a separate lock file. File locking is only available on
+    POSIX systems, elsewhere :meth:`lock` does not provide mutual exclusion.
+
+    Args:
+        directory (str): The directory to store tokens in. It is created if it
+            doesn't exist.
+        min_remaining (int): The minimum number of seconds a cached token must
+            remain valid for to be returned by :meth:`get`.
+    """
+
+    def __init__(self, directory,
+                 min_remaining=_DEFAULT_MIN_REMAINING_SECS):
+        self._directory = directory
+        self._min_remaining = min_remaining
+
+    def _path(self, key, suffix):
+        """Returns the path of a file for a cache key."""
+        digest = hashlib.sha256(_helpers.to_bytes(key)).hexdigest()
+        return os.path.join(self._directory, digest + suffix)
+
+    def _ensure_directory(self):
+        """Creates the cache directory if it doesn't exist."""
+        try:
+            os.makedirs(self._directory, 0o700)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        """Holds an exclusive lock on an entry.
+
+        The lock is shared with other processes using the same directory.
+
+        Args:
+            key (str): The cache key.
+
+        Yields:
+            None: While the lock is held.
+        """
+        self._ensure_directory()
+        fd = os.open(self._path(key, '.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file releases the lock.
+            os.close(fd)
+
+    def get(self, key):
+        """Gets a cached token.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Tuple[str, datetime]]: The token and its expiration, or
+                None if there is no token for the key or if the token is about
+                to expire.
+        """
+        try:
+            with io.open(self._path(key, '.json'), 'r',
+                         encoding='utf-8') as file_obj:
+                data = json.load(file_obj)
+            token = data['token']
+            expiry_secs = data['expiry']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+
+        if expiry_secs - _helpers.utcnow_secs() < self._min_remaining:
+            return None
+
+        expiry = datetime.datetime.utcfromtimestamp(expiry_secs)
+        return token, expiry
+
+    def set(self, key, token, expiry):
+        """Stores a token.
+
+        The entry is written to a temporary file which then replaces the
+        current entry, so concurrent readers never see a partial entry.
+
+        Args:
+            key (str): The cache key.
+            token (str): The access token.
+            expiry (datetime): The token's expiration.
+        """
+        self._ensure_directory()
+        data = json.dumps({
+            'token': _helpers.from_bytes(token),
+            'expiry': _helpers.datetime_to_secs(expiry),
+        })
+
+        fd, temp_path = tempfile.mkstemp(
+            dir=self._directory, suffix='.tmp')
+        try:
+            with io.open(fd, 'w', encoding='utf-8') as file_obj:
+                file_obj.write(_helpers.from_bytes(data))
+            _replace(temp_path, self._path(key, '.json'))
+        except Exception:
+            os.remove(temp_path)
+            raise
@@ -0,0 +1,183 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Sharing access tokens between equivalent credentials.
+
+Libraries used by the same application often create their own credentials,
+for example each by calling :func:`google.auth.default`. Each of these
+objects acquires and refreshes its own access token, even though they all
+stand for the same identity.
+
+With a process-wide :class:`TokenStore`, credentials that are equivalent
+share a single access token instead::
+
+    google.auth.token_sharing.set_token_store(
+        google.auth.token_sharing.TokenStore())
+
+Credentials are equivalent if they are of the same type and request tokens
+for the same principal, scopes, subject and token endpoint. When such
+credentials need to be refreshed, they use the token that another of them
+acquired if it is still fresh. Otherwise they refresh while holding a lock
+shared by all of them, so that only one of them goes to the network at a
+time and the others then use its token.
+
+Credentials also adopt state that goes with the token, such as the refresh
+token of user credentials when the token endpoint rotates it.
+
+A credentials object never adopts the token it already has, so calling
+:meth:`~google.auth.credentials.Credentials.refresh` after the server
+rejected a token always acquires a new one.
+
+Credentials that don't have an identity, such as
+:class:`google.auth.jwt.Credentials` which sign their tokens locally, don't
+share tokens. Credentials refreshed with
+:meth:`~google.auth.credentials.Credentials.refresh_async` use and publish
+shared tokens, but don't wait for each other's refreshes.
+"""
+
+from google.auth import _cache
+from google.auth import _fork
+from google.auth import _helpers
+
+_DEFAULT_MAX_SIZE = 1000
+
+_token_store = None
+
+
+class _SharedToken(object):
+    """The token shared by equivalent credentials.
+
+    Attributes:
+        lock (google.auth._fork.Lock): Held while one of the credentials is
+            being refreshed.
+        state (Optional[google.auth.credentials._TokenState]): The most
+            recently acquired token.
+        extra (Any): What the credentials that acquired the token returned
+            from ``_shared_state``.
+    """
+    __slots__ = ('lock', 'state', 'extra')
+
+    def __init__(self):
+        self.lock = _fork.Lock()
+        self.state = None
+        self.extra = None
+
+    def adopt(self, credentials):
+        """Makes credentials use the shared token if it is fresh and differs
+        from the token they have.
+
+        Args:
+            credentials (google.auth.credentials.Credentials): The
+                credentials.
+
+        Returns:
+            bool: True if the credentials now use the shared token.
+        """
+        # pylint: disable=protected-access
+        state = self.state
+        if state is None or state.token is None:
+            return False
+        if state.token == credentials._token_state.token:
+            return False
+        deadline = state.stale_deadline
+        if deadline is not None and deadline <= _helpers.monotonic():
+            return False
+        # publish() sets extra before state, so it is at least as recent as
+        # the token.
+        credentials._adopt_shared_state(self.extra)
+        credentials._token_state = state
+        return True
+
+    def publish(self, credentials):
+        """Shares the token of credentials that were just refreshed.
+
+        Args:
+            credentials (google.auth.credentials.Credentials): The
+                credentials.
+        """
+        # pylint: disable=protected-access
+        self.extra = credentials._shared_state()
+        self.state = credentials._token_state
+
+
+class TokenStore(object):
+    """The tokens shared by equivalent credentials in this process.
+
+    Args:
+        max_size (int): The maximum number of identities to keep tokens for.
+            The tokens of the least recently refreshed identities are
+            discarded first.
+    """
+
+    def __init__(self, max_size=_DEFAULT_MAX_SIZE):
+        self._entries = _cache.LRUCache(max_size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def shared_token(self, identity):
+        """Gets the shared token for an identity.
+
+        Args:
+            identity (Hashable): The identity, see
+                :meth:`google.auth.credentials.Credentials._token_identity`.
+
+        Returns:
+            _SharedToken: The shared token.
+        """
+        return self._entries.setdefault(identity, _SharedToken())
+
+    def clear(self):
+        """Discards all shared tokens."""
+        self._entries.clear()
+
+
+def set_token_store(store):
+    """Sets the store used to share tokens between equivalent credentials.
+
+    Args:
+        store (Optional[TokenStore]): The store, or None to stop sharing
+            tokens.
+    """
+    global _token_store  # pylint: disable=global-statement
+    _token_store = store
+
+
+def get_token_store():
+    """Returns the store set with :func:`set_token_store`.
+
+    Returns:
+        Optional[TokenStore]: The store, or None if tokens aren't shared.
+    """
+    return _token_store
+
+
+def shared_token(credentials):
+    """Gets the token shared with credentials equivalent to the given ones.
+
+    Args:
+        credentials (google.auth.credentials.Credentials): The credentials.
+
+    Returns:
+        Optional[_SharedToken]: The shared token, or None if tokens aren't
+            shared or the credentials don't have an identity.
+    """
+    # pylint: disable=protected-access
+    store = _token_store
+    if store is None:
+        return None
+    identity = credentials._token_identity()
+    if identity is None:
+        return None
+    return store.shared_token(identity)
@@ -41,6 +41,7 @@ DEFAULT_MAX_REFRESH_ATTEMPTS = 2
 @six.add_metaclass(abc.ABCMeta)
 class Response(object):
     """HTTP Response data."""
+    __slots__ = ()
 
     @abc.abstractproperty
     def status(self):
@@ -94,3 +95,61 @@ class Request(object):
         # pylint: disable=redundant-returns-doc, missing-raises-doc
         # (pylint doesn't play well with abstract docstrings.)
         raise NotImplementedError('__call__ must be implemented.')
+
+
+@six.add_metaclass(abc.ABCMeta)
+class AsyncRequest(object):
+    """Interface for a callable that makes HTTP requests with :mod:`asyncio`.
+
+    This is the asynchronous counterpart of :class:`Request`, used by
+    :meth:`google.auth.credentials.Credentials.refresh_async`. For example,
+    an adapter for `aiohttp`_ could look like this::
+
+        class AiohttpRequest(google.auth.transport.AsyncRequest):
+            def __init__(self, session):
+                self.session = session
+
+            async def __call__(self, url, method='GET', body=None,
+                               headers=None, timeout=None, **kwargs):
+                try:
+                    async with self.session.request(
+                            method, url, data=body, headers=headers,
+                            timeout=timeout, **kwargs) as response:
+                        data = await response.read()
+                        return AiohttpResponse(
+                            response.status, response.headers, data)
+                except aiohttp.ClientError as exc:
+                    raise google.auth.exceptions.TransportError(exc)
+
+    .. _aiohttp: https://aiohttp.readthedocs.io
+
+    .. automethod:: __call__
+    """
+
+    @abc.abstractmethod
+    def __call__(self, url, method='GET', body=None, headers=None,
+                 timeout=None, **kwargs):
+        """Make an HTTP request.
+
+        Args:
+            url (str): The URI to be requested.
+            method (str): The HTTP method to use for the request. Defaults
+                to 'GET'.
+            body (bytes): The payload / body in HTTP request.
+            headers (Mapping[str, str]): Request headers.
+            timeout (Optional[int]): The number of seconds to wait for a
+                response from the server. If not specified or if None, the
+                transport-specific default timeout will be used.
+            kwargs: Additionally arguments passed on to the transport's
+                request method.
+
+        Returns:
+            Awaitable[Response]: The HTTP response, with the body already
+                read.
+
+        Raises:
+            google.auth.exceptions.TransportError: If any exception occurred.
+        """
+        # pylint: disable=redundant-returns-doc, missing-raises-doc
+        # (pylint doesn't play well with abstract docstrings.)
+        raise NotImplementedError('__call__ must be implemented.')
@@ -16,15 +16,20 @@
 
 import logging
 import socket
+import ssl
 
 from six.moves import http_client
 from six.moves import urllib
 
+from google.auth import _fork
 from google.auth import exceptions
 from google.auth import transport
 
 _LOGGER = logging.getLogger(__name__)
 
+# The maximum number of idle connections kept for each host.
+_MAX_IDLE_CONNECTIONS = 4
+
 
 class Response(transport.Response):
     """http.client transport response adapter.
@@ -32,6 +37,8 @@ class Response(transport.Response):
     Args:
         response (http.client.HTTPResponse): The raw http client response.
     """
+    __slots__ = ('_status', '_headers', '_data')
+
     def __init__(self, response):
         self._status = response.status
         self._headers = {
@@ -51,8 +58,164 @@ class Response(transport.Response):
         return self._data
 
 
+class _HTTPSConnection(http_client.HTTPSConnection):
+    """An HTTPS connection that resumes the TLS session of its pool.
+
+    Resuming a session skips most of the TLS handshake when the pool has to
+    open a new connection. This requires Python 3.6 or later, earlier
+    versions always do a full handshake.
+
+    Args:
+        host (str): The host and port to connect to.
+        pool (_ConnectionPool): The pool the connection belongs to.
+        timeout (Union[float, object]): The socket timeout.
+    """
+
+    def __init__(self, host, pool, timeout):
+        http_client.HTTPSConnection.__init__(
+            self, host, timeout=timeout, context=_tls_context())
+        self._pool = pool
+
+    def connect(self):
+        """Connects to the host, resuming the pool's TLS session if
+        possible."""
+        http_client.HTTPConnection.connect(self)
+        kwargs = {}
+        if self._pool.tls_session is not None:
+            kwargs['session'] = self._pool.tls_session
+        self.sock = _tls_context().wrap_socket(
+            self.sock, server_hostname=self.host, **kwargs)
+
+
+_TLS_CONTEXT = None
+
+
+def _tls_context():
+    """Returns the TLS context shared by all HTTPS connections, so that they
+    share its certificates and session cache."""
+    global _TLS_CONTEXT  # pylint: disable=global-statement
+    if _TLS_CONTEXT is None:
+        _TLS_CONTEXT = ssl.create_default_context()
+    return _TLS_CONTEXT
+
+
+class _ConnectionPool(object):
+    """Idle keep-alive connections to a host.
+
+    Connections are taken from the pool for a single request and put back
+    once the response was read. Connections inherited from the parent process
+    after a fork are discarded, because the parent keeps using their sockets.
+
+    Args:
+        scheme (str): The URL scheme, ``'http'`` or ``'https'``.
+        netloc (str): The host and port.
+    """
+
+    def __init__(self, scheme, netloc):
+        self._scheme = scheme
+        self._netloc = netloc
+        self._idle = []
+        self._lock = _fork.Lock()
+        self._generation = _fork.generation()
+        self.tls_session = None
+        """Optional[ssl.SSLSession]: The TLS session to resume when
+        connecting."""
+
+    def _check_generation(self):
+        """Forgets the connections of the parent process after a fork."""
+        current = _fork.generation()
+        if self._generation != current:
+            self._idle = []
+            self.tls_session = None
+            self._generation = current
+
+    def connect(self, timeout):
+        """Opens a new connection.
+
+        Args:
+            timeout (Union[float, object]): The socket timeout.
+
+        Returns:
+            http.client.HTTPConnection: The connection.
+        """
+        if self._scheme == 'https':
+            return _HTTPSConnection(self._netloc, self, timeout)
+        return http_client.HTTPConnection(self._netloc, timeout=timeout)
+
+    def get(self, timeout):
+        """Takes an idle connection from the pool, or opens a new one.
+
+        Args:
+            timeout (Union[float, object]): The socket timeout.
+
+        Returns:
+            Tuple[http.client.HTTPConnection, bool]: The connection, and
+                whether it was used before.
+        """
+        with self._lock:
+            self._check_generation()
+            connection = self._idle.pop() if self._idle else None
+
+        if connection is None:
+            return self.connect(timeout), False
+
+        connection.timeout = timeout
+        if connection.sock is not None:
+            if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+                timeout = socket.getdefaulttimeout()
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def put(self, connection):
+        """Returns a connection to the pool after its response was read.
+
+        Args:
+            connection (http.client.HTTPConnection): The connection.
+        """
+        session = getattr(connection.sock, 'session', None)
+        with self._lock:
+            self._check_generation()
+            if session is not None:
+                self.tls_session = session
+            if len(self._idle) < _MAX_IDLE_CONNECTIONS:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+
+_POOLS = {}
+_POOLS_LOCK = _fork.Lock()
+
+
+def _get_pool(scheme, netloc):
+    """Returns the connection pool for a host."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get((scheme, netloc))
+        if pool is None:
+            pool = _ConnectionPool(scheme, netloc)
+            _POOLS[(scheme, netloc)] = pool
+        return pool
+
+
+def _send(connection, method, path, body, headers, kwargs):
+    """Sends a request and reads the response.
+
+    Returns:
+        Tuple[Response, bool]: The response, and whether the server closes
+            the connection afterwards.
+    """
+    connection.request(method, path, body=body, headers=headers, **kwargs)
+    response = connection.getresponse()
+    return Response(response), response.will_close
+
+
 class Request(transport.Request):
-    """http.client transport request adapter."""
+    """http.client transport request adapter.
+
+    Connections are kept alive and reused by later requests to the same host,
+    by this and all other instances, so that most requests don't need a new
+    TCP connection or TLS handshake.
+    """
 
     def __call__(self, url, method='GET', body=None, headers=None,
                  timeout=None, **kwargs):
@@ -89,23 +252,36 @@ class Request(transport.Request):
         path = urllib.parse.urlunsplit(
             ('', '', parts.path, parts.query, parts.fragment))
 
-        if parts.scheme != 'http':
+        if parts.scheme not in ('http', 'https'):
             raise exceptions.TransportError(
-                'http.client transport only supports the http scheme, {}'
-                'was specified'.format(parts.scheme))
+                'http.client transport only supports the http and https '
+                'schemes, {} was specified'.format(parts.scheme))
 
-        connection = http_client.HTTPConnection(parts.netloc)
+        pool = _get_pool(parts.scheme, parts.netloc)
+        connection, reused = pool.get(timeout)
 
         try:
             _LOGGER.debug('Making request: %s %s', method, url)
 
-            connection.request(
-                method, path, body=body, headers=headers, **kwargs)
-            response = connection.getresponse()
-            return Response(response)
+            try:
+                response, will_close = _send(
+                    connection, method, path, body, headers, kwargs)
+            except (http_client.HTTPException, socket.error):
+                if not reused:
+                    raise
+                # The server may have closed the idle connection, try again
+                # with a new one.
+                connection.close()
+                connection = pool.connect(timeout)
+                response, will_close = _send(
+                    connection, method, path, body, headers, kwargs)
 
         except (http_client.HTTPException, socket.error) as exc:
+            connection.close()
             raise exceptions.TransportError(exc)
 
-        finally:
+        if will_close:
             connection.close()
+        else:
+            pool.put(connection)
+        return response
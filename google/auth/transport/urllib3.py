@@ -45,6 +45,8 @@ class _Response(transport.Response):
     Args:
         response (urllib3.response.HTTPResponse): The raw urllib3 response.
     """
+    __slots__ = ('_response',)
+
     def __init__(self, response):
         self._response = response
 
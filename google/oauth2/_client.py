@@ -20,21 +20,289 @@ token endpoint.
 For more information about the token endpoint, see
 `Section 3.1 of rfc6749`_
 
+Requests that fail with a transport error or a status that suggests a
+temporary problem, such as ``503 Service Unavailable``, are retried with
+exponential backoff until a deadline passes, see :class:`RetryPolicy`. This
+is the default: a refresh makes attempts for up to 10 seconds, each of which
+times out when the deadline passes.
+
+Requests can also be hedged: if the token endpoint is slow to respond to a
+request, an identical request is sent and whichever response arrives first
+is used, see :class:`HedgePolicy`. Hedging is off unless a policy is set::
+
+    google.oauth2._client.set_hedge_policy(
+        google.oauth2._client.HedgePolicy())
+
+Only JWT grants are hedged. Refresh token grants aren't idempotent: the token
+endpoint may rotate the refresh token, so a duplicate grant could invalidate
+the refresh token returned by the other one.
+
 .. _Section 3.1 of rfc6749: https://tools.ietf.org/html/rfc6749#section-3.2
 """
 
 import datetime
+import email.utils
 import json
+import random
+import threading
 
+import six
 from six.moves import http_client
+from six.moves import queue
 from six.moves import urllib
 
+from google.auth import _fork
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import exceptions
+from google.auth import throttling
 
 _URLENCODED_CONTENT_TYPE = 'application/x-www-form-urlencoded'
 _JWT_GRANT_TYPE = 'urn:ietf:params:oauth:grant-type:jwt-bearer'
 _REFRESH_GRANT_TYPE = 'refresh_token'
+# Statuses that suggest that the same request may succeed later.
+_RETRYABLE_STATUSES = frozenset((
+    429,  # Too Many Requests
+    http_client.INTERNAL_SERVER_ERROR,
+    http_client.BAD_GATEWAY,
+    http_client.SERVICE_UNAVAILABLE,
+    http_client.GATEWAY_TIMEOUT,
+))
+
+
+class RetryPolicy(object):
+    """How requests to the token endpoint are retried.
+
+    After a failed attempt the request is retried after a randomized,
+    exponentially increasing delay, or after the delay the server asked for
+    in a ``Retry-After`` header. No retry is made if it wouldn't start before
+    the deadline, in which case the last error is raised.
+
+    Each attempt is made with a timeout that ends at the deadline, or
+    earlier if ``timeout`` is set, so that the deadline bounds the total time
+    spent on the request.
+
+    Args:
+        deadline (float): The number of seconds after the first attempt after
+            which no more attempts are started and the current attempt times
+            out.
+        initial_backoff (float): The delay before the first retry, in
+            seconds.
+        max_backoff (float): The maximum delay between attempts, in seconds.
+        multiplier (float): The factor by which the delay increases after
+            each attempt.
+        jitter (float): The fraction of the delay that is randomized, between
+            0 and 1.
+        timeout (Optional[float]): The maximum number of seconds each
+            attempt may take, or None to only bound it by the deadline.
+    """
+
+    def __init__(self, deadline=10.0, initial_backoff=0.5, max_backoff=4.0,
+                 multiplier=2.0, jitter=0.5, timeout=None):
+        self.deadline = deadline
+        self.timeout = timeout
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def start(self):
+        """Starts retrying a request.
+
+        Returns:
+            _Retry: The state of the retries of the request.
+        """
+        return _Retry(self)
+
+
+class _Retry(object):
+    """The retries of a single request.
+
+    Args:
+        policy (RetryPolicy): The retry policy.
+    """
+    __slots__ = ('_policy', '_deadline', '_backoff')
+
+    def __init__(self, policy):
+        self._policy = policy
+        self._deadline = _helpers.monotonic() + policy.deadline
+        self._backoff = policy.initial_backoff
+
+    def attempt_timeout(self):
+        """Returns the timeout of the next attempt.
+
+        Returns:
+            float: The number of seconds until the deadline, or the policy's
+                timeout if that is shorter.
+        """
+        remaining = max(self._deadline - _helpers.monotonic(), 0.0)
+        if self._policy.timeout is None:
+            return remaining
+        return min(self._policy.timeout, remaining)
+
+    def next_delay(self, retry_after=None):
+        """Returns how long to wait before the next attempt.
+
+        Args:
+            retry_after (Optional[float]): The delay the server asked for, in
+                seconds.
+
+        Returns:
+            Optional[float]: The delay in seconds, or None if the next
+                attempt would start after the deadline.
+        """
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self._backoff * (
+                1 - self._policy.jitter * random.random())
+            self._backoff = min(
+                self._backoff * self._policy.multiplier,
+                self._policy.max_backoff)
+
+        if _helpers.monotonic() + delay > self._deadline:
+            return None
+        return delay
+
+
+DEFAULT_RETRY = RetryPolicy()
+"""RetryPolicy: The retry policy used unless another one is specified.
+
+Requests to the token endpoint are retried for up to 10 seconds by default.
+Pass ``retry=None`` to make a single attempt with the transport's default
+timeout.
+"""
+
+
+class HedgePolicy(object):
+    """When to hedge requests to the token endpoint.
+
+    If a request hasn't received a response after a delay, a second,
+    identical request is sent. Whichever request completes first provides
+    the response, the other one is abandoned and its response discarded. If
+    one of them fails, the response of the other is used.
+
+    The delay is a percentile of the latency of recent requests, so that
+    only the slowest requests are hedged. Hedges are also limited to a
+    fraction of the requests: each request earns that fraction of a hedge,
+    and a hedge is only sent if a whole one was earned.
+
+    Requests are sent from background threads, so the transport must be
+    safe to use from several threads at once, as
+    :class:`google.auth.transport.urllib3.Request` is. With
+    :mod:`asyncio`, the slower request is cancelled instead.
+
+    Args:
+        percentile (float): The percentile of the recent latencies after
+            which to hedge, between 0 and 100.
+        max_ratio (float): The maximum fraction of requests to hedge.
+        initial_delay (float): The delay in seconds until enough latencies
+            were recorded.
+        min_samples (int): The number of latencies needed to use their
+            percentile.
+        history_size (int): The number of recent latencies to keep.
+
+    Attributes:
+        requests (int): The number of requests made with this policy.
+        hedges (int): The number of those requests that were hedged.
+    """
+
+    def __init__(self, percentile=95.0, max_ratio=0.05, initial_delay=1.0,
+                 min_samples=10, history_size=100):
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._history = _refresh.RefreshHistory(size=history_size)
+        self._lock = _fork.Lock()
+        # The first request may be hedged.
+        self._budget = 1.0
+        self.requests = 0
+        self.hedges = 0
+
+    def start(self):
+        """Starts a request.
+
+        Returns:
+            float: How many seconds to wait for a response before hedging.
+        """
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self._budget + self.max_ratio, 1.0)
+            if len(self._history) < self.min_samples:
+                return self.initial_delay
+            return self._history.latency_percentile(self.percentile)
+
+    def record(self, latency):
+        """Records the latency of a request that received a response.
+
+        Args:
+            latency (float): The latency in seconds.
+        """
+        with self._lock:
+            self._history.record(latency)
+
+    def allow_hedge(self):
+        """Checks if a slow request may be hedged, and counts the hedge if
+        so.
+
+        Returns:
+            bool: True if a hedge may be sent.
+        """
+        with self._lock:
+            if self._budget < 1.0:
+                return False
+            self._budget -= 1.0
+            self.hedges += 1
+            return True
+
+
+_hedge_policy = None
+
+
+def set_hedge_policy(policy):
+    """Sets the hedge policy used for requests that don't specify one.
+
+    Args:
+        policy (Optional[HedgePolicy]): The policy, or None to stop hedging.
+    """
+    global _hedge_policy  # pylint: disable=global-statement
+    _hedge_policy = policy
+
+
+def get_hedge_policy():
+    """Returns the policy set with :func:`set_hedge_policy`.
+
+    Returns:
+        Optional[HedgePolicy]: The policy, or None if requests aren't
+            hedged.
+    """
+    return _hedge_policy
+
+
+def _parse_retry_after(response):
+    """Returns the delay in seconds that a response's ``Retry-After`` header
+    asks for, if any.
+
+    Args:
+        response (google.auth.transport.Response): The response.
+
+    Returns:
+        Optional[float]: The delay, or None if the header is missing or
+            invalid.
+    """
+    value = response.headers.get('retry-after')
+    if not isinstance(value, six.string_types):
+        return None
+    value = value.strip()
+
+    if value.isdigit():
+        return float(value)
+
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(email.utils.mktime_tz(parsed) - _helpers.utcnow_secs(), 0)
 
 
 def _handle_error_response(response_body):
@@ -78,16 +346,28 @@ def _parse_expiry(response_data):
         return None
 
 
-def _token_endpoint_request(request, token_uri, body):
-    """Makes a request to the OAuth 2.0 authorization server's token endpoint.
+def _encode_request(body):
+    """Encodes the body of a token endpoint request.
 
     Args:
-        request (google.auth.transport.Request): A callable used to make
-            HTTP requests.
-        token_uri (str): The OAuth 2.0 authorizations server's token endpoint
-            URI.
         body (Mapping[str, str]): The parameters to send in the request body.
 
+    Returns:
+        Tuple[str, Mapping[str, str]]: The encoded body and the request
+            headers.
+    """
+    headers = {
+        'content-type': _URLENCODED_CONTENT_TYPE,
+    }
+    return urllib.parse.urlencode(body), headers
+
+
+def _decode_response(response):
+    """Decodes a token endpoint response.
+
+    Args:
+        response (google.auth.transport.Response): The response.
+
     Returns:
         Mapping[str, str]: The JSON-decoded response data.
 
@@ -95,53 +375,165 @@ def _token_endpoint_request(request, token_uri, body):
         google.auth.exceptions.RefreshError: If the token endpoint returned
             an error.
     """
-    body = urllib.parse.urlencode(body)
-    headers = {
-        'content-type': _URLENCODED_CONTENT_TYPE,
-    }
+    with _refresh.phase('parse'):
+        response_body = response.data.decode('utf-8')
 
-    response = request(
-        method='POST', url=token_uri, headers=headers, body=body)
+        if response.status != http_client.OK:
+            _handle_error_response(response_body)
 
-    response_body = response.data.decode('utf-8')
+        return json.loads(response_body)
 
-    if response.status != http_client.OK:
-        _handle_error_response(response_body)
 
-    response_data = json.loads(response_body)
+def _retry_delay(retry, response):
+    """Returns how long to wait before retrying a request that received a
+    response.
 
-    return response_data
+    Args:
+        retry (Optional[_Retry]): The state of the retries, or None if the
+            request isn't retried.
+        response (google.auth.transport.Response): The response.
 
+    Returns:
+        Optional[float]: The delay in seconds, or None if the request should
+            not be retried.
+    """
+    if retry is None or response.status not in _RETRYABLE_STATUSES:
+        return None
+    return retry.next_delay(_parse_retry_after(response))
 
-def jwt_grant(request, token_uri, assertion):
-    """Implements the JWT Profile for OAuth 2.0 Authorization Grants.
 
-    For more details, see `rfc7523 section 4`_.
+def _start_attempt(results, hedge, request, kwargs):
+    """Sends a request from a background thread.
+
+    The outcome is put in ``results`` as a tuple of the response and None, or
+    None and the exception raised by the request.
+    """
+    def send():
+        """Sends the request and reports the outcome."""
+        start = _helpers.monotonic()
+        try:
+            response = request(**kwargs)
+        except Exception as exc:  # pylint: disable=broad-except
+            results.put((None, exc))
+            return
+        hedge.record(_helpers.monotonic() - start)
+        results.put((response, None))
+
+    thread = threading.Thread(target=send, name='google-auth-hedge')
+    thread.daemon = True
+    thread.start()
+
+
+def _hedged_request(request, hedge, **kwargs):
+    """Makes a request, hedging it if it is slow.
+
+    Args:
+        request (google.auth.transport.Request): A callable used to make
+            HTTP requests.
+        hedge (HedgePolicy): When to hedge.
+        kwargs: The arguments of the request.
+
+    Returns:
+        google.auth.transport.Response: The first response.
+
+    Raises:
+        Exception: The error of the first request if all requests failed.
+    """
+    results = queue.Queue()
+    _start_attempt(results, hedge, request, kwargs)
+    pending = 1
+    timeout = hedge.start()
+    error = None
+
+    while pending:
+        try:
+            response, exc = results.get(timeout=timeout)
+        except queue.Empty:
+            # At most one hedge is sent.
+            timeout = None
+            if hedge.allow_hedge():
+                _start_attempt(results, hedge, request, kwargs)
+                pending += 1
+            continue
+
+        pending -= 1
+        if exc is None:
+            return response
+        if error is None:
+            error = exc
+
+    raise error
+
+
+def _token_endpoint_request(request, token_uri, body, retry=DEFAULT_RETRY,
+                            hedge=None, idempotent=True):
+    """Makes a request to the OAuth 2.0 authorization server's token endpoint.
 
     Args:
         request (google.auth.transport.Request): A callable used to make
             HTTP requests.
         token_uri (str): The OAuth 2.0 authorizations server's token endpoint
             URI.
-        assertion (str): The OAuth 2.0 assertion.
+        body (Mapping[str, str]): The parameters to send in the request body.
+        retry (Optional[RetryPolicy]): How to retry failed requests and when
+            attempts time out, or None to make a single attempt with the
+            transport's default timeout.
+        hedge (Optional[HedgePolicy]): When to hedge slow requests. If None,
+            the policy set with :func:`set_hedge_policy` is used, if any.
+        idempotent (bool): Whether the request may be sent more than once at
+            the same time. If False, it is never hedged.
 
     Returns:
-        Tuple[str, Optional[datetime], Mapping[str, str]]: The access token,
-            expiration, and additional data returned by the token endpoint.
+        Mapping[str, str]: The JSON-decoded response data.
 
     Raises:
         google.auth.exceptions.RefreshError: If the token endpoint returned
-            an error.
-
-    .. _rfc7523 section 4: https://tools.ietf.org/html/rfc7523#section-4
+            an error, or if the refresh rate limit was exceeded.
+        google.auth.exceptions.TransportError: If the last attempt failed
+            to reach the token endpoint.
     """
-    body = {
+    throttling.check_refresh_rate_limit()
+    body, headers = _encode_request(body)
+    retry = retry.start() if retry is not None else None
+    if not idempotent:
+        hedge = None
+    elif hedge is None:
+        hedge = _hedge_policy
+
+    while True:
+        timeout = retry.attempt_timeout() if retry is not None else None
+        try:
+            with _refresh.phase('http'):
+                if hedge is None:
+                    response = request(
+                        method='POST', url=token_uri, headers=headers,
+                        body=body, timeout=timeout)
+                else:
+                    response = _hedged_request(
+                        request, hedge, method='POST', url=token_uri,
+                        headers=headers, body=body, timeout=timeout)
+        except exceptions.TransportError:
+            delay = retry.next_delay() if retry is not None else None
+            if delay is None:
+                raise
+        else:
+            delay = _retry_delay(retry, response)
+            if delay is None:
+                return _decode_response(response)
+
+        _helpers.sleep(delay)
+
+
+def _jwt_grant_body(assertion):
+    """Returns the request body for a JWT grant."""
+    return {
         'assertion': assertion,
         'grant_type': _JWT_GRANT_TYPE,
     }
 
-    response_data = _token_endpoint_request(request, token_uri, body)
 
+def _parse_jwt_grant_response(response_data):
+    """Extracts the access token and expiration from a JWT grant response."""
     try:
         access_token = response_data['access_token']
     except KeyError:
@@ -153,7 +545,68 @@ def jwt_grant(request, token_uri, assertion):
     return access_token, expiry, response_data
 
 
-def refresh_grant(request, token_uri, refresh_token, client_id, client_secret):
+def _refresh_grant_body(refresh_token, client_id, client_secret):
+    """Returns the request body for a refresh token grant."""
+    return {
+        'grant_type': _REFRESH_GRANT_TYPE,
+        'client_id': client_id,
+        'client_secret': client_secret,
+        'refresh_token': refresh_token,
+    }
+
+
+def _parse_refresh_grant_response(response_data, refresh_token):
+    """Extracts the access token, refresh token and expiration from a refresh
+    token grant response."""
+    try:
+        access_token = response_data['access_token']
+    except KeyError:
+        raise exceptions.RefreshError(
+            'No access token in response.', response_data)
+
+    refresh_token = response_data.get('refresh_token', refresh_token)
+    expiry = _parse_expiry(response_data)
+
+    return access_token, refresh_token, expiry, response_data
+
+
+def jwt_grant(request, token_uri, assertion, retry=DEFAULT_RETRY,
+              hedge=None):
+    """Implements the JWT Profile for OAuth 2.0 Authorization Grants.
+
+    For more details, see `rfc7523 section 4`_.
+
+    Args:
+        request (google.auth.transport.Request): A callable used to make
+            HTTP requests.
+        token_uri (str): The OAuth 2.0 authorizations server's token endpoint
+            URI.
+        assertion (str): The OAuth 2.0 assertion.
+        retry (Optional[RetryPolicy]): How to retry failed requests and when
+            attempts time out, or None to make a single attempt.
+        hedge (Optional[HedgePolicy]): When to hedge slow requests. If None,
+            the policy set with :func:`set_hedge_policy` is used, if any.
+
+    Returns:
+        Tuple[str, Optional[datetime], Mapping[str, str]]: The access token,
+            expiration, and additional data returned by the token endpoint.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the token endpoint returned
+            an error.
+        google.auth.exceptions.TransportError: If the token endpoint could
+            not be reached.
+
+    .. _rfc7523 section 4: https://tools.ietf.org/html/rfc7523#section-4
+    """
+    response_data = _token_endpoint_request(
+        request, token_uri, _jwt_grant_body(assertion), retry=retry,
+        hedge=hedge)
+    return _parse_jwt_grant_response(response_data)
+
+
+def refresh_grant(request, token_uri, refresh_token, client_id, client_secret,
+                  retry=DEFAULT_RETRY):
     """Implements the OAuth 2.0 refresh token grant.
 
     For more details, see `rfc678 section 6`_.
@@ -167,6 +620,9 @@ def refresh_grant(request, token_uri, refresh_token, client_id, client_secret):
             token.
         client_id (str): The OAuth 2.0 application's client ID.
         client_secret (str): The Oauth 2.0 appliaction's client secret.
+        retry (Optional[RetryPolicy]): How to retry failed requests and when
+            attempts time out, or None to make a single attempt. The request
+            is never hedged.
 
     Returns:
         Tuple[str, Optional[str], Optional[datetime], Mapping[str, str]]: The
@@ -176,25 +632,13 @@ def refresh_grant(request, token_uri, refresh_token, client_id, client_secret):
     Raises:
         google.auth.exceptions.RefreshError: If the token endpoint returned
             an error.
+        google.auth.exceptions.TransportError: If the token endpoint could
+            not be reached.
 
     .. _rfc6748 section 6: https://tools.ietf.org/html/rfc6749#section-6
     """
-    body = {
-        'grant_type': _REFRESH_GRANT_TYPE,
-        'client_id': client_id,
-        'client_secret': client_secret,
-        'refresh_token': refresh_token,
-    }
-
-    response_data = _token_endpoint_request(request, token_uri, body)
-
-    try:
-        access_token = response_data['access_token']
-    except KeyError:
-        raise exceptions.RefreshError(
-            'No access token in response.', response_data)
-
-    refresh_token = response_data.get('refresh_token', refresh_token)
-    expiry = _parse_expiry(response_data)
-
-    return access_token, refresh_token, expiry, response_data
+    response_data = _token_endpoint_request(
+        request, token_uri,
+        _refresh_grant_body(refresh_token, client_id, client_secret),
+        retry=retry, idempotent=False)
+    return _parse_refresh_grant_response(response_data, refresh_token)
@@ -0,0 +1,208 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""OAuth 2.0 client for asyncio.
+
+This is the asynchronous counterpart of :mod:`google.oauth2._client`. It uses
+``async`` syntax and is therefore only imported on Python 3.5 and later.
+"""
+
+import asyncio
+
+from google.auth import _helpers
+from google.auth import exceptions
+from google.auth import throttling
+from google.oauth2 import _client
+
+
+async def _hedged_request(request, hedge, **kwargs):
+    """Makes a request, hedging it if it is slow. The slower request is
+    cancelled.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        hedge (google.oauth2._client.HedgePolicy): When to hedge.
+        kwargs: The arguments of the request.
+
+    Returns:
+        google.auth.transport.Response: The first response.
+
+    Raises:
+        Exception: The error of the first request if all requests failed.
+    """
+    async def attempt():
+        """Makes the request and records its latency."""
+        start = _helpers.monotonic()
+        response = await request(**kwargs)
+        hedge.record(_helpers.monotonic() - start)
+        return response
+
+    pending = {asyncio.ensure_future(attempt())}
+    timeout = hedge.start()
+    error = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # At most one hedge is sent.
+                timeout = None
+                if hedge.allow_hedge():
+                    pending.add(asyncio.ensure_future(attempt()))
+                continue
+
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                if error is None:
+                    error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _token_endpoint_request(request, token_uri, body,
+                                  retry=_client.DEFAULT_RETRY, hedge=None,
+                                  idempotent=True):
+    """Makes a request to the OAuth 2.0 authorization server's token endpoint.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        token_uri (str): The OAuth 2.0 authorizations server's token endpoint
+            URI.
+        body (Mapping[str, str]): The parameters to send in the request body.
+        retry (Optional[google.oauth2._client.RetryPolicy]): How to retry
+            failed requests and when attempts time out, or None to make a
+            single attempt with the transport's default timeout.
+        hedge (Optional[google.oauth2._client.HedgePolicy]): When to hedge
+            slow requests. If None, the policy set with
+            :func:`google.oauth2._client.set_hedge_policy` is used, if any.
+        idempotent (bool): Whether the request may be sent more than once at
+            the same time. If False, it is never hedged.
+
+    Returns:
+        Mapping[str, str]: The JSON-decoded response data.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the token endpoint returned
+            an error, or if the refresh rate limit was exceeded.
+        google.auth.exceptions.TransportError: If the last attempt failed
+            to reach the token endpoint.
+    """
+    # pylint: disable=protected-access
+    throttling.check_refresh_rate_limit()
+    body, headers = _client._encode_request(body)
+    retry = retry.start() if retry is not None else None
+    if not idempotent:
+        hedge = None
+    elif hedge is None:
+        hedge = _client.get_hedge_policy()
+
+    while True:
+        timeout = retry.attempt_timeout() if retry is not None else None
+        try:
+            if hedge is None:
+                response = await request(
+                    method='POST', url=token_uri, headers=headers, body=body,
+                    timeout=timeout)
+            else:
+                response = await _hedged_request(
+                    request, hedge, method='POST', url=token_uri,
+                    headers=headers, body=body, timeout=timeout)
+        except exceptions.TransportError:
+            delay = retry.next_delay() if retry is not None else None
+            if delay is None:
+                raise
+        else:
+            delay = _client._retry_delay(retry, response)
+            if delay is None:
+                return _client._decode_response(response)
+
+        await asyncio.sleep(delay)
+
+
+async def jwt_grant(request, token_uri, assertion,
+                    retry=_client.DEFAULT_RETRY, hedge=None):
+    """Implements the JWT Profile for OAuth 2.0 Authorization Grants.
+
+    See :func:`google.oauth2._client.jwt_grant`.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        token_uri (str): The OAuth 2.0 authorizations server's token endpoint
+            URI.
+        assertion (str): The OAuth 2.0 assertion.
+        retry (Optional[google.oauth2._client.RetryPolicy]): How to retry
+            failed requests and when attempts time out, or None to make a
+            single attempt with the transport's default timeout.
+        hedge (Optional[google.oauth2._client.HedgePolicy]): When to hedge
+            slow requests. If None, the policy set with
+            :func:`google.oauth2._client.set_hedge_policy` is used, if any.
+
+    Returns:
+        Tuple[str, Optional[datetime], Mapping[str, str]]: The access token,
+            expiration, and additional data returned by the token endpoint.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the token endpoint returned
+            an error.
+    """
+    # pylint: disable=protected-access
+    response_data = await _token_endpoint_request(
+        request, token_uri, _client._jwt_grant_body(assertion), retry=retry,
+        hedge=hedge)
+    return _client._parse_jwt_grant_response(response_data)
+
+
+async def refresh_grant(request, token_uri, refresh_token, client_id,
+                        client_secret, retry=_client.DEFAULT_RETRY):
+    """Implements the OAuth 2.0 refresh token grant.
+
+    See :func:`google.oauth2._client.refresh_grant`.
+
+    Args:
+        request (google.auth.transport.AsyncRequest): A callable used to make
+            HTTP requests.
+        token_uri (str): The OAuth 2.0 authorizations server's token endpoint
+            URI.
+        refresh_token (str): The refresh token to use to get a new access
+            token.
+        client_id (str): The OAuth 2.0 application's client ID.
+        client_secret (str): The Oauth 2.0 appliaction's client secret.
+        retry (Optional[google.oauth2._client.RetryPolicy]): How to retry
+            failed requests and when attempts time out, or None to make a
+            single attempt with the transport's default timeout. The request
+            is never hedged.
+
+    Returns:
+        Tuple[str, Optional[str], Optional[datetime], Mapping[str, str]]: The
+            access token, new refresh token, expiration, and additional data
+            returned by the token endpoint.
+
+    Raises:
+        google.auth.exceptions.RefreshError: If the token endpoint returned
+            an error.
+    """
+    # pylint: disable=protected-access
+    response_data = await _token_endpoint_request(
+        request, token_uri,
+        _client._refresh_grant_body(refresh_token, client_id, client_secret),
+        retry=retry, idempotent=False)
+    return _client._parse_refresh_grant_response(response_data, refresh_token)
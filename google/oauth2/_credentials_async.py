@@ -0,0 +1,107 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""asyncio support for OAuth 2.0 credentials.
+
+This module implements ``refresh_async`` for
+:class:`google.oauth2.service_account.Credentials` and
+:class:`google.oauth2.credentials.Credentials`. It uses ``async`` syntax and
+is therefore only imported on Python 3.5 and later.
+"""
+
+from google.auth import _credentials_async
+from google.auth import _refresh
+from google.oauth2 import _client_async
+
+# pylint: disable=protected-access
+
+
+@_credentials_async.refresh_method
+async def refresh_service_account(credentials, request):
+    """Refreshes service account credentials.
+
+    The assertion is signed and the token cache, if any, is accessed in the
+    event loop's default executor. Unlike synchronous refreshes, asynchronous
+    refreshes don't hold the token cache's lock while requesting a token.
+
+    Args:
+        credentials (google.oauth2.service_account.Credentials): The
+            credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+
+    Returns:
+        Optional[object]: :data:`google.auth._refresh.CACHE_HIT` if the token
+            didn't come from the token endpoint.
+    """
+    if credentials._get_subject_token():
+        return _refresh.CACHE_HIT
+
+    token_cache = credentials._token_cache
+    if token_cache is not None:
+        key = credentials._token_cache_key()
+        cached = await _credentials_async.run_in_executor(
+            token_cache.get, key)
+        if cached is not None:
+            credentials._set_token(*cached)
+            credentials._set_subject_token()
+            return _refresh.CACHE_HIT
+
+    assertion = await _credentials_async.run_in_executor(
+        credentials._make_authorization_grant_assertion)
+    access_token, expiry, _ = await _client_async.jwt_grant(
+        request, credentials._token_uri, assertion)
+
+    if token_cache is not None and expiry is not None:
+        await _credentials_async.run_in_executor(
+            token_cache.set, key, access_token, expiry)
+
+    credentials._set_token(access_token, expiry)
+    credentials._set_subject_token()
+
+
+@_credentials_async.refresh_method
+async def refresh_user_credentials(credentials, request):
+    """Refreshes OAuth 2.0 user credentials using their refresh token.
+
+    Args:
+        credentials (google.oauth2.credentials.Credentials): The credentials.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+    """
+    access_token, refresh_token, expiry, _ = (
+        await _client_async.refresh_grant(
+            request, credentials._token_uri, credentials._refresh_token,
+            credentials._client_id, credentials._client_secret))
+
+    credentials._set_token(access_token, expiry)
+    credentials._refresh_token = refresh_token
+    credentials._write_tokens()
+
+
+async def apply_self_signed_jwt(jwt_credentials, request, headers):
+    """Applies a self-signed JWT, minting a new one in the event loop's
+    default executor if needed.
+
+    Args:
+        jwt_credentials (google.auth.jwt.Credentials): The credentials minting
+            JWTs for the request's audience.
+        request (google.auth.transport.AsyncRequest): The object used to make
+            HTTP requests.
+        headers (Mapping): The request's headers.
+    """
+    if not jwt_credentials.valid or jwt_credentials.stale:
+        await _credentials_async.run_in_executor(
+            jwt_credentials._ensure_valid, request)
+    jwt_credentials.apply(headers)
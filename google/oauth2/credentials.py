@@ -26,21 +26,169 @@ Obtaining the initial access and refresh token is outside of the scope of this
 module. Consult `rfc6749 section 4.1`_ for complete details on the
 Authorization Code grant flow.
 
+Authorization servers may issue a new refresh token when the credentials are
+refreshed, which invalidates the previous one. To persist the new tokens, for
+example to the file the credentials were loaded from, pass a
+:class:`TokenWriter`::
+
+    def save(credentials, update):
+        with open('user.json', 'w') as fh:
+            json.dump({'refresh_token': update.refresh_token, ...}, fh)
+
+    writer = google.oauth2.credentials.TokenWriter(save)
+    credentials = google.oauth2.credentials.Credentials(
+        token, refresh_token=refresh_token, ..., token_writer=writer)
+
+The writer saves the tokens in a background thread, so refreshes don't wait
+for storage. Refreshes that happen in quick succession result in a single
+write of the latest tokens.
+
 .. _Authorization Code grant: https://tools.ietf.org/html/rfc6749#section-1.3.1
 .. _refresh token: https://tools.ietf.org/html/rfc6749#section-6
 .. _rfc6749 section 4.1: https://tools.ietf.org/html/rfc6749#section-4.1
 """
 
+import collections
+import logging
+import threading
+
+from google.auth import _fork
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import credentials
 from google.oauth2 import _client
 
+try:
+    from google.oauth2 import _credentials_async
+except SyntaxError:  # pragma: NO COVER
+    # asyncio support requires Python 3.5 or later.
+    _credentials_async = None
+
+_LOGGER = logging.getLogger(__name__)
+
+# How long a token writer waits after a refresh before writing, so that a
+# burst of refreshes results in a single write.
+_DEFAULT_WRITE_DELAY_SECS = 1.0
+
+
+TokenUpdate = collections.namedtuple(
+    'TokenUpdate', ['token', 'expiry', 'refresh_token'])
+"""The tokens of user credentials after a refresh.
+
+Attributes:
+    token (str): The access token.
+    expiry (Optional[datetime]): The access token's expiration.
+    refresh_token (str): The refresh token, which may have been replaced by
+        the authorization server.
+"""
+
+
+class TokenWriter(object):
+    """Writes the tokens of refreshed user credentials in a background
+    thread.
+
+    When several refreshes of the same credentials are waiting to be
+    written, only the most recent tokens are written. The thread is started
+    on the first refresh, and restarted in forked child processes.
+
+    The thread doesn't keep the process alive, call :meth:`flush` before
+    exiting to make sure the latest tokens are written.
+
+    Args:
+        write (Callable[[Credentials, TokenUpdate], None]): Persists the
+            tokens of credentials. It is only called by the writer's thread.
+            Errors are logged.
+        delay (float): The number of seconds to wait after a refresh before
+            writing, during which other refreshes are coalesced.
+    """
+
+    def __init__(self, write, delay=_DEFAULT_WRITE_DELAY_SECS):
+        self._write = write
+        self._delay = delay
+        self._lock = _fork.Lock()
+        self._pending = collections.OrderedDict()
+        self._thread = None
+        self._generation = None
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def _ensure_thread(self):
+        """Starts the thread unless it is running in this process. Must be
+        called while holding the lock."""
+        generation = _fork.generation()
+        if self._thread is not None and self._generation == generation:
+            return
+        if self._thread is not None:
+            # The events may have been in use by threads that don't exist in
+            # this process, and the pending tokens are the parent's to write.
+            self._wakeup = threading.Event()
+            self._idle = threading.Event()
+            self._pending = collections.OrderedDict()
+        self._generation = generation
+        self._thread = threading.Thread(
+            target=self._run, name='google-auth-token-writer')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, credentials, update):
+        """Schedules writing the tokens of credentials, replacing any tokens
+        of the same credentials that aren't written yet.
+
+        Args:
+            credentials (Credentials): The credentials.
+            update (TokenUpdate): Their tokens.
+        """
+        with self._lock:
+            self._ensure_thread()
+            self._pending[credentials] = update
+            self._idle.clear()
+            self._wakeup.set()
+
+    def _run(self):
+        """Writes pending tokens as they come."""
+        while True:
+            self._wakeup.wait()
+            _helpers.sleep(self._delay)
+            with self._lock:
+                self._wakeup.clear()
+                pending, self._pending = (
+                    self._pending, collections.OrderedDict())
+
+            for target, update in pending.items():
+                try:
+                    self._write(target, update)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.warning(
+                        'Failed to write refreshed tokens.', exc_info=True)
+
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+
+    def flush(self, timeout=None):
+        """Waits until all pending tokens are written.
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait.
+
+        Returns:
+            bool: True if all tokens were written, False on timeout.
+        """
+        return self._idle.wait(timeout)
+
 
 class Credentials(credentials.Scoped, credentials.Credentials):
     """Credentials using OAuth 2.0 access and refresh tokens."""
+    __slots__ = (
+        '_scopes', '_derived_credentials', '_refresh_token',
+        '_initial_refresh_token', '_token_uri', '_client_id',
+        '_client_secret', '_token_writer')
+    _UNPICKLED_ATTRIBUTES = frozenset(('_token_writer',))
 
     def __init__(self, token, refresh_token=None, token_uri=None,
-                 client_id=None, client_secret=None, scopes=None):
+                 client_id=None, client_secret=None, scopes=None,
+                 token_writer=None):
         """
         Args:
             token (Optional(str)): The OAuth 2.0 access token. Can be None
@@ -59,14 +207,30 @@ class Credentials(credentials.Scoped, credentials.Credentials):
                 to obtain authorization. This is a purely informative parameter
                 that can be used by :meth:`has_scopes`. OAuth 2.0 credentials
                 can not request additional scopes after authorization.
+            token_writer (TokenWriter): Persists the tokens after each
+                refresh. It isn't pickled with the credentials.
         """
         super(Credentials, self).__init__()
         self.token = token
         self._refresh_token = refresh_token
+        # The refresh token the credentials were created with, which
+        # identifies them for token sharing even after the token endpoint
+        # rotated the refresh token.
+        self._initial_refresh_token = refresh_token
         self._scopes = scopes
         self._token_uri = token_uri
         self._client_id = client_id
         self._client_secret = client_secret
+        self._token_writer = token_writer
+
+    def __setstate__(self, state):
+        self._token_writer = None
+        super(Credentials, self).__setstate__(state)
+
+    @property
+    def refresh_token(self):
+        """Optional[str]: The OAuth 2.0 refresh token."""
+        return self._refresh_token
 
     @property
     def requires_scopes(self):
@@ -83,12 +247,57 @@ class Credentials(credentials.Scoped, credentials.Credentials):
         raise NotImplementedError(
             'OAuth 2.0 Credentials can not modify their scopes.')
 
+    def _token_identity(self):
+        """Returns the identity that user credentials share tokens by.
+
+        The identity is based on the refresh token the credentials were
+        created with, so that it doesn't change when the token endpoint
+        rotates the refresh token.
+
+        Returns:
+            Optional[Hashable]: The identity, or None if the credentials
+                can't be refreshed.
+        """
+        if self._initial_refresh_token is None:
+            return None
+        return (
+            type(self),
+            self._client_id,
+            self._initial_refresh_token,
+            frozenset(self._scopes or ()),
+            None,
+            self._token_uri)
+
+    def _shared_state(self):
+        """Returns the current refresh token, so that equivalent credentials
+        keep refreshing after the token endpoint rotated it."""
+        return self._refresh_token
+
+    def _adopt_shared_state(self, state):
+        """Adopts the refresh token of equivalent credentials."""
+        if state is not None:
+            self._refresh_token = state
+
     @_helpers.copy_docstring(credentials.Credentials)
+    @_refresh.refresh_method
     def refresh(self, request):
         access_token, refresh_token, expiry, _ = _client.refresh_grant(
             request, self._token_uri, self._refresh_token, self._client_id,
             self._client_secret)
 
-        self.token = access_token
-        self.expiry = expiry
+        self._set_token(access_token, expiry)
         self._refresh_token = refresh_token
+        self._write_tokens()
+
+    def _write_tokens(self):
+        """Schedules persisting the tokens, if the credentials have a token
+        writer."""
+        if self._token_writer is None:
+            return
+        state = self._token_state
+        self._token_writer.submit(self, TokenUpdate(
+            state.token, state.expiry, self._refresh_token))
+
+    @_helpers.copy_docstring(credentials.Credentials)
+    def refresh_async(self, request):
+        return _credentials_async.refresh_user_credentials(self, request)
@@ -67,18 +67,94 @@ authority" to a service account.
 You can use domain-wise delegation by creating a set of credentials with a
 specific subject using :meth:`~Credentials.with_subject`.
 
+All credentials derived from the same service account credentials with
+:meth:`~Credentials.with_subject` or :meth:`~Credentials.with_scopes` share a
+cache of access tokens, keyed by subject and scopes. Calling
+:meth:`~Credentials.with_subject` again for a user whose token is still fresh
+therefore doesn't request a new token, even if the previously derived
+credentials were discarded. Tokens are evicted from the cache when they
+become stale, and the least recently used ones are evicted when the cache
+grows beyond a fixed memory budget.
+
+Self-signed JWTs
+----------------
+
+Many Google APIs accept a JWT signed by the service account, with the API as
+its audience, in place of an access token. Such a JWT is minted locally, so
+no request to the token endpoint is needed. Pass ``self_signed_jwt=True`` to
+use self-signed JWTs for all requests, or a list of audiences to only use
+them for some APIs::
+
+    credentials = service_account.Credentials.from_service_account_file(
+        'service-account.json',
+        self_signed_jwt=['https://pubsub.googleapis.com/'])
+
+The audience of a request is the scheme and host of its URI, followed by a
+slash. Minted JWTs are cached per audience and reused until they become
+stale. Requests to other audiences, and all requests made with credentials
+that have a subject for domain-wide delegation, use access tokens.
+
 .. _RFC 7523: https://tools.ietf.org/html/rfc7523
 """
 
 import datetime
+import functools
+import json
+
+import six
+from six.moves import urllib
 
+from google.auth import _cache
 from google.auth import _helpers
+from google.auth import _refresh
 from google.auth import _service_account_info
 from google.auth import credentials
 from google.auth import jwt
 from google.oauth2 import _client
 
+try:
+    from google.oauth2 import _credentials_async
+except SyntaxError:  # pragma: NO COVER
+    # asyncio support requires Python 3.5 or later.
+    _credentials_async = None
+
 _DEFAULT_TOKEN_LIFETIME_SECS = 3600  # 1 hour in sections
+# Bounds of the cache of access tokens shared by derived credentials.
+_SUBJECT_TOKEN_CACHE_SIZE = 100000
+_SUBJECT_TOKEN_CACHE_MAX_BYTES = 32 * 1024 * 1024  # 32 MiB
+# The approximate memory used by a cached token in addition to the token.
+_SUBJECT_TOKEN_OVERHEAD_BYTES = 512
+
+
+# The number of audiences to keep self-signed JWTs for.
+_SELF_SIGNED_JWT_CACHE_SIZE = 32
+
+
+def _weigh_subject_token(value):
+    """Returns the approximate memory used by a cached token."""
+    return len(value[0]) + _SUBJECT_TOKEN_OVERHEAD_BYTES
+
+
+def _new_subject_token_cache():
+    """Returns an empty cache of access tokens shared by derived
+    credentials."""
+    return _cache.TTLCache(
+        _SUBJECT_TOKEN_CACHE_SIZE,
+        maxweight=_SUBJECT_TOKEN_CACHE_MAX_BYTES,
+        weigher=_weigh_subject_token)
+
+
+def _request_audience(url):
+    """Returns the audience of self-signed JWTs for requests to a URI.
+
+    Args:
+        url (str): The request URI.
+
+    Returns:
+        str: The URI's scheme and host, followed by a slash.
+    """
+    parts = urllib.parse.urlsplit(url)
+    return urllib.parse.urlunsplit((parts.scheme, parts.netloc, '/', '', ''))
 
 
 class Credentials(credentials.Signing,
@@ -114,9 +190,16 @@ class Credentials(credentials.Signing,
         scoped_credentials = credentials.with_scopes(['email'])
         delegated_credentials = credentials.with_subject(subject)
     """
+    __slots__ = (
+        '_scopes', '_derived_credentials', '_signer',
+        '_service_account_email', '_subject', '_token_uri', '_token_cache',
+        '_additional_claims', '_subject_tokens', '_self_signed_jwt',
+        '_self_signed_jwts')
+    _UNPICKLED_ATTRIBUTES = frozenset(('_subject_tokens', '_self_signed_jwts'))
 
     def __init__(self, signer, service_account_email, token_uri, scopes=None,
-                 subject=None, additional_claims=None):
+                 subject=None, additional_claims=None, token_cache=None,
+                 self_signed_jwt=False):
         """
         Args:
             signer (google.auth.crypt.Signer): The signer used to sign JWTs.
@@ -128,6 +211,16 @@ class Credentials(credentials.Signing,
                 user to for which to request delegated access.
             additional_claims (Mapping[str, str]): Any additional claims for
                 the JWT assertion used in the authorization grant.
+            token_cache (google.auth.token_cache.FileTokenCache): A cache
+                that is checked for a valid access token before requesting a
+                new one from the token endpoint. This allows processes on the
+                same host to share access tokens.
+            self_signed_jwt (Union[bool, Sequence[str]]): Whether to
+                authorize requests with self-signed JWTs instead of access
+                tokens. Either True for all requests, or the audiences of the
+                requests to use them for, for example
+                ``'https://pubsub.googleapis.com/'``. Ignored if ``subject``
+                is specified.
 
         .. note:: Typically one of the helper constructors
             :meth:`from_service_account_file` or
@@ -141,12 +234,29 @@ class Credentials(credentials.Signing,
         self._service_account_email = service_account_email
         self._subject = subject
         self._token_uri = token_uri
+        self._token_cache = token_cache
+        # The access tokens shared with credentials derived from the same
+        # credentials, created when credentials are first derived.
+        self._subject_tokens = None
+        if self_signed_jwt is True or not self_signed_jwt:
+            self._self_signed_jwt = bool(self_signed_jwt)
+        elif isinstance(self_signed_jwt, six.string_types):
+            self._self_signed_jwt = frozenset((self_signed_jwt,))
+        else:
+            self._self_signed_jwt = frozenset(self_signed_jwt)
+        # The JWT credentials used for each audience, created on demand.
+        self._self_signed_jwts = None
 
         if additional_claims is not None:
             self._additional_claims = additional_claims
         else:
             self._additional_claims = {}
 
+    def __setstate__(self, state):
+        self._subject_tokens = None
+        self._self_signed_jwts = None
+        super(Credentials, self).__setstate__(state)
+
     @classmethod
     def _from_signer_and_info(cls, signer, info, **kwargs):
         """Creates a Credentials instance from a signer and service account
@@ -172,6 +282,9 @@ class Credentials(credentials.Signing,
     def from_service_account_info(cls, info, **kwargs):
         """Creates a Credentials instance from parsed service account info.
 
+        The private key is parsed when the credentials first sign an
+        assertion, so credentials that use a cached token never parse it.
+
         Args:
             info (Mapping[str, str]): The service account info in Google
                 format.
@@ -185,15 +298,24 @@ class Credentials(credentials.Signing,
             ValueError: If the info is not in the expected format.
         """
         signer = _service_account_info.from_dict(
-            info, require=['client_email', 'token_uri'])
+            info, require=['client_email', 'token_uri'], lazy=True)
         return cls._from_signer_and_info(signer, info, **kwargs)
 
     @classmethod
-    def from_service_account_file(cls, filename, **kwargs):
+    def from_service_account_file(cls, filename, reload_key=False, **kwargs):
         """Creates a Credentials instance from a service account json file.
 
+        If keys are rotated by rewriting the file, pass ``reload_key=True``.
+        The credentials then check if the file changed when they sign, which
+        is when they refresh, at most every few seconds. When it did, they
+        start signing with the new key. The current access token is kept
+        until it needs to be refreshed. Only the key is reloaded, other
+        changes to the file are ignored.
+
         Args:
             filename (str): The path to the service account json file.
+            reload_key (bool): Whether to reload the private key when the
+                file changes.
             kwargs: Additional arguments to pass to the constructor.
 
         Returns:
@@ -201,7 +323,8 @@ class Credentials(credentials.Signing,
                 credentials.
         """
         info, signer = _service_account_info.from_filename(
-            filename, require=['client_email', 'token_uri'])
+            filename, require=['client_email', 'token_uri'],
+            reload=reload_key, lazy=True)
         return cls._from_signer_and_info(signer, info, **kwargs)
 
     def to_jwt_credentials(self):
@@ -240,22 +363,74 @@ class Credentials(credentials.Signing,
         """
         return True if not self._scopes else False
 
+    def _with_scopes_and_subject(self, scopes, subject):
+        """Returns credentials with the specified scopes and subject.
+
+        Credentials with the same scopes, in the same order, and subject are
+        only created once and share their access token. All derived
+        credentials share a cache of access tokens, so that credentials
+        created again after they were discarded reuse the token of the
+        previous ones.
+
+        Args:
+            scopes (Sequence[str]): The list of scopes to request.
+            subject (str): The subject claim.
+
+        Returns:
+            google.auth.service_account.Credentials: The credentials.
+        """
+        subject_tokens = _cache.get_or_create(
+            self, '_subject_tokens', _new_subject_token_cache)
+
+        def create():
+            """Creates the credentials."""
+            credentials = Credentials(
+                self._signer,
+                service_account_email=self._service_account_email,
+                scopes=scopes,
+                token_uri=self._token_uri,
+                subject=subject,
+                additional_claims=self._additional_claims.copy(),
+                token_cache=self._token_cache,
+                self_signed_jwt=self._self_signed_jwt)
+            # The derived credentials don't have a cache of their own yet.
+            credentials._subject_tokens = subject_tokens
+            return credentials
+
+        # Key on the scopes as given, so that the memoized credentials have
+        # exactly the requested scopes.
+        key = tuple(scopes) if scopes is not None else None
+        return self._derive((key, subject), create)
+
     @_helpers.copy_docstring(credentials.Scoped)
     def with_scopes(self, scopes):
-        return Credentials(
-            self._signer,
-            service_account_email=self._service_account_email,
-            scopes=scopes,
-            token_uri=self._token_uri,
-            subject=self._subject,
-            additional_claims=self._additional_claims.copy())
+        return self._with_scopes_and_subject(scopes, self._subject)
 
     def with_subject(self, subject):
         """Create a copy of these credentials with the specified subject.
 
+        The copy is memoized: calling this method again with the same subject
+        returns the same instance, which shares its access token with the
+        previous callers.
+
         Args:
             subject (str): The subject claim.
 
+        Returns:
+            google.auth.service_account.Credentials: The credentials for the
+                subject.
+        """
+        return self._with_scopes_and_subject(self._scopes, subject)
+
+    def with_self_signed_jwt(self, self_signed_jwt=True):
+        """Create a copy of these credentials that authorizes requests with
+        self-signed JWTs.
+
+        Args:
+            self_signed_jwt (Union[bool, Sequence[str]]): True to use
+                self-signed JWTs for all requests, the audiences to use them
+                for, or False to always use access tokens.
+
         Returns:
             google.auth.service_account.Credentials: A new credentials
                 instance.
@@ -265,8 +440,86 @@ class Credentials(credentials.Signing,
             service_account_email=self._service_account_email,
             scopes=self._scopes,
             token_uri=self._token_uri,
-            subject=subject,
-            additional_claims=self._additional_claims.copy())
+            subject=self._subject,
+            additional_claims=self._additional_claims.copy(),
+            token_cache=self._token_cache,
+            self_signed_jwt=self_signed_jwt)
+
+    def _self_signed_jwt_credentials(self, url):
+        """Returns the credentials minting self-signed JWTs for requests to a
+        URI.
+
+        Args:
+            url (str): The request URI.
+
+        Returns:
+            Optional[google.auth.jwt.Credentials]: The credentials, or None if
+                the request should use an access token.
+        """
+        if not self._self_signed_jwt or self._subject is not None:
+            return None
+        audience = _request_audience(url)
+        if (self._self_signed_jwt is not True and
+                audience not in self._self_signed_jwt):
+            return None
+
+        jwts = _cache.get_or_create(
+            self, '_self_signed_jwts', functools.partial(
+                _cache.LRUCache, _SELF_SIGNED_JWT_CACHE_SIZE))
+
+        jwt_credentials = jwts.get(audience)
+        if jwt_credentials is None:
+            jwt_credentials = jwts.setdefault(audience, jwt.Credentials(
+                self._signer,
+                issuer=self._service_account_email,
+                subject=self._service_account_email,
+                audience=audience))
+        return jwt_credentials
+
+    def before_request(self, request, method, url, headers):
+        """Performs credential-specific before request logic.
+
+        Applies a self-signed JWT if the credentials use them for the
+        request's audience, minting a new one if needed. Otherwise applies
+        the access token, refreshing it if needed.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+            method (str): The request's HTTP method.
+            url (str): The request's URI.
+            headers (Mapping): The request's headers.
+        """
+        jwt_credentials = self._self_signed_jwt_credentials(url)
+        if jwt_credentials is None:
+            super(Credentials, self).before_request(
+                request, method, url, headers)
+        else:
+            jwt_credentials.before_request(request, method, url, headers)
+
+    def before_request_async(self, request, method, url, headers):
+        """Performs credential-specific before request logic without blocking
+        the event loop.
+
+        This is the :mod:`asyncio` counterpart of :meth:`before_request`.
+        Self-signed JWTs are minted in the event loop's default executor.
+
+        Args:
+            request (google.auth.transport.AsyncRequest): The object used to
+                make HTTP requests.
+            method (str): The request's HTTP method.
+            url (str): The request's URI.
+            headers (Mapping): The request's headers.
+
+        Returns:
+            Awaitable[None]: Completes when the headers are updated.
+        """
+        jwt_credentials = self._self_signed_jwt_credentials(url)
+        if jwt_credentials is None:
+            return super(Credentials, self).before_request_async(
+                request, method, url, headers)
+        return _credentials_async.apply_self_signed_jwt(
+            jwt_credentials, request, headers)
 
     def _make_authorization_grant_assertion(self):
         """Create the OAuth 2.0 assertion.
@@ -297,17 +550,128 @@ class Credentials(credentials.Signing,
         if self._subject:
             payload.setdefault('sub', self._subject)
 
-        token = jwt.encode(self._signer, payload)
+        with _refresh.phase('sign'):
+            token = jwt.encode(self._signer, payload)
 
         return token
 
-    @_helpers.copy_docstring(credentials.Credentials)
-    def refresh(self, request):
+    def _token_cache_key(self):
+        """Returns the key identifying these credentials' access tokens in
+        the token cache.
+
+        Returns:
+            str: The token cache key.
+        """
+        return json.dumps([
+            self._service_account_email,
+            sorted(self._scopes or ()),
+            self._subject,
+            self._token_uri,
+            self._additional_claims,
+        ], sort_keys=True)
+
+    def _token_identity(self):
+        """Returns the identity that service account credentials share tokens
+        by.
+
+        Returns:
+            Hashable: The identity.
+        """
+        return (
+            type(self),
+            self._service_account_email,
+            frozenset(self._scopes or ()),
+            self._subject,
+            self._token_uri,
+            json.dumps(self._additional_claims, sort_keys=True))
+
+    def _fetch_token(self, request):
+        """Acquires a new access token from the token endpoint.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+
+        Returns:
+            Tuple[str, Optional[datetime]]: The access token and its
+                expiration.
+        """
         assertion = self._make_authorization_grant_assertion()
         access_token, expiry, _ = _client.jwt_grant(
             request, self._token_uri, assertion)
-        self.token = access_token
-        self.expiry = expiry
+        return access_token, expiry
+
+    def _get_subject_token(self):
+        """Adopts the token of equivalent derived credentials, if there is a
+        fresh one.
+
+        Returns:
+            bool: True if a token was found.
+        """
+        subject_tokens = self._subject_tokens
+        if subject_tokens is None:
+            return False
+        cached = subject_tokens.get(self._token_cache_key())
+        # Never adopt the current token, it may have been rejected.
+        if cached is None or cached[0] == self._token_state.token:
+            return False
+        self._set_token(*cached)
+        return True
+
+    def _set_subject_token(self):
+        """Shares the current token with equivalent derived credentials until
+        it becomes stale."""
+        subject_tokens = self._subject_tokens
+        state = self._token_state
+        if subject_tokens is None or state.stale_deadline is None:
+            return
+        subject_tokens.set(
+            self._token_cache_key(), (state.token, state.expiry),
+            state.stale_deadline)
+
+    @_helpers.copy_docstring(credentials.Credentials)
+    @_refresh.refresh_method
+    def refresh(self, request):
+        if self._get_subject_token():
+            return _refresh.CACHE_HIT
+        cache_hit = self._refresh_token(request)
+        self._set_subject_token()
+        return _refresh.CACHE_HIT if cache_hit else None
+
+    def _refresh_token(self, request):
+        """Acquires a new access token from the token cache, if any, or the
+        token endpoint.
+
+        Args:
+            request (google.auth.transport.Request): The object used to make
+                HTTP requests.
+
+        Returns:
+            bool: True if the token came from the token cache.
+        """
+        if self._token_cache is None:
+            self._set_token(*self._fetch_token(request))
+            return False
+
+        # Hold the lock while going to the network so that other processes
+        # wait for this token instead of requesting their own.
+        key = self._token_cache_key()
+        with self._token_cache.lock(key):
+            cached = self._token_cache.get(key)
+            if cached is not None:
+                self._set_token(*cached)
+                return True
+
+            access_token, expiry = self._fetch_token(request)
+            if expiry is not None:
+                self._token_cache.set(key, access_token, expiry)
+
+        self._set_token(access_token, expiry)
+        return False
+
+    @_helpers.copy_docstring(credentials.Credentials)
+    def refresh_async(self, request):
+        return _credentials_async.refresh_service_account(self, request)
 
     @_helpers.copy_docstring(credentials.Signing)
     def sign_bytes(self, message):
@@ -35,6 +35,8 @@ class _Response(transport.Response):
         response (httplib2.Response): The raw httplib2 response.
         data (bytes): The response body.
     """
+    __slots__ = ('_response', '_data')
+
     def __init__(self, response, data):
         self._response = response
         self._data = data
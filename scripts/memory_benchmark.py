@@ -0,0 +1,109 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the memory used by credentials, signers and responses.
+
+Each class is compared against a subclass without ``__slots__``, which has
+the ``__dict__`` the class would otherwise have. Run it from the project
+root with Python 3::
+
+    python scripts/memory_benchmark.py
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import tracemalloc
+
+from google.auth import crypt
+from google.auth.transport import _http_client
+from google.auth.transport import urllib3
+from google.oauth2 import service_account
+
+
+class _Key(object):
+    """Stands in for a private key, which is shared in real applications."""
+
+
+class _RawResponse(object):
+    """Stands in for the responses of the HTTP libraries."""
+    status = 200
+    headers = {}
+    data = b''
+
+    def getheaders(self):
+        return []
+
+    def read(self):
+        return self.data
+
+
+def _unslotted(cls):
+    """Returns a subclass of a class that has a ``__dict__``."""
+    return type('Unslotted' + cls.__name__, (cls,), {})
+
+
+def _measure(factory, count):
+    """Returns the average number of bytes allocated per object."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return (after - before) / float(count)
+
+
+def _cases():
+    """Yields the name, class and factory of each measured class."""
+    key = _Key()
+    raw_response = _RawResponse()
+
+    yield (
+        'service_account.Credentials', service_account.Credentials,
+        lambda cls: cls(crypt.Signer(key), 'email', 'token_uri'))
+    yield (
+        'crypt.Signer', crypt.Signer, lambda cls: cls(key))
+    yield (
+        'crypt.Verifier', crypt.Verifier, lambda cls: cls(key))
+    yield (
+        '_http_client.Response', _http_client.Response,
+        lambda cls: cls(raw_response))
+    yield (
+        'urllib3._Response', urllib3._Response,
+        lambda cls: cls(raw_response))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--count', type=int, default=100000,
+        help='The number of objects to create of each class.')
+    args = parser.parse_args()
+
+    print('{:<30} {:>10} {:>10} {:>10}'.format(
+        'class', 'slotted', 'dict', 'saved'))
+    for name, cls, factory in _cases():
+        unslotted = _unslotted(cls)
+        slotted_size = _measure(lambda: factory(cls), args.count)
+        unslotted_size = _measure(lambda: factory(unslotted), args.count)
+        print('{:<30} {:>10.0f} {:>10.0f} {:>10.0f}'.format(
+            name, slotted_size, unslotted_size,
+            unslotted_size - slotted_size))
+
+
+if __name__ == '__main__':
+    main()
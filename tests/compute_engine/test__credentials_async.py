@@ -0,0 +1,72 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+
+import mock
+import pytest
+from six.moves import http_client
+
+from google.auth import _helpers
+from google.auth import exceptions
+from google.auth.compute_engine import _metadata
+from google.auth.compute_engine import credentials
+from tests import fakes_async
+
+
+@mock.patch('google.auth._helpers.utcnow', return_value=datetime.datetime.min)
+def test_refresh_async(now_mock):
+    request = fakes_async.FakeAsyncRequest(
+        fakes_async.make_response(http_client.OK, {
+            'email': 'service-account@example.com',
+            'scopes': ['one', 'two']}),
+        fakes_async.make_response(http_client.OK, {
+            'access_token': 'token', 'expires_in': 500}))
+    impl = credentials.Credentials()
+
+    fakes_async.run(impl.refresh_async(request))
+
+    assert impl.token == 'token'
+    assert impl.expiry == _helpers.utcnow() + datetime.timedelta(seconds=500)
+    assert impl._service_account_email == 'service-account@example.com'
+    assert impl.scopes == ['one', 'two']
+
+    info_call, token_call = request.calls
+    assert info_call['url'] == (
+        _metadata._METADATA_ROOT +
+        'instance/service-accounts/default/?recursive=true')
+    assert info_call['headers'] == _metadata._METADATA_HEADERS
+    assert token_call['url'] == (
+        _metadata._METADATA_ROOT +
+        'instance/service-accounts/service-account@example.com/token')
+
+
+def test_refresh_async_transport_error():
+    request = fakes_async.FakeAsyncRequest(
+        exceptions.TransportError('unreachable'))
+    impl = credentials.Credentials()
+
+    with pytest.raises(exceptions.RefreshError) as excinfo:
+        fakes_async.run(impl.refresh_async(request))
+
+    assert excinfo.match(r'unreachable')
+
+
+def test_refresh_async_error_status():
+    request = fakes_async.FakeAsyncRequest(
+        fakes_async.make_response(http_client.NOT_FOUND, 'not found'))
+    impl = credentials.Credentials()
+
+    with pytest.raises(exceptions.RefreshError):
+        fakes_async.run(impl.refresh_async(request))
@@ -157,6 +157,20 @@ def test_get_service_account_token(utcnow, mock_request):
     assert expiry == utcnow() + datetime.timedelta(seconds=ttl)
 
 
+def test_get_service_account_token_rate_limit(mock_request):
+    request_mock = mock_request(
+        json.dumps({'access_token': 'token', 'expires_in': 500}),
+        headers={'content-type': 'application/json'})
+
+    with mock.patch(
+            'google.auth.throttling.get_refresh_rate_limit') as get_limit:
+        get_limit.return_value.try_acquire.return_value = False
+        with pytest.raises(exceptions.RefreshError):
+            _metadata.get_service_account_token(request_mock)
+
+    request_mock.assert_not_called()
+
+
 def test_get_service_account_info(mock_request):
     key, value = 'foo', 'bar'
     request_mock = mock_request(
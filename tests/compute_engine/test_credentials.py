@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import datetime
+import pickle
 
 import mock
 import pytest
@@ -35,6 +36,18 @@ class TestCredentials(object):
         # Scopes aren't needed
         assert not self.credentials.requires_scopes
 
+    def test_pickle(self):
+        self.credentials.token = 'token'
+        self.credentials.expiry = (
+            datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+
+        unpickled = pickle.loads(pickle.dumps(self.credentials))
+
+        assert unpickled.valid
+        assert unpickled.token == 'token'
+        assert unpickled.expiry == self.credentials.expiry
+        assert unpickled._service_account_email == 'default'
+
     @mock.patch(
         'google.auth._helpers.utcnow', return_value=datetime.datetime.min)
     @mock.patch('google.auth.compute_engine._metadata.get')
@@ -0,0 +1,298 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import json
+import os
+import subprocess
+import sys
+
+import mock
+import pytest
+from six.moves import http_client
+
+from google.auth import environment_vars
+from google.auth import exceptions
+from google.auth.compute_engine import _metadata
+from google.auth.compute_engine import token_server
+import google.auth.transport._http_client
+from tests import fakes
+
+
+def make_credentials(lifetime=3600):
+    impl = fakes.CredentialsImpl(
+        lifetime=lifetime, token_format='token{count}')
+    impl._service_account_email = 'service-account@example.com'
+    impl.scopes = ['one', 'two']
+    return impl
+
+
+@pytest.fixture
+def impl():
+    return make_credentials()
+
+
+@pytest.fixture
+def server(impl):
+    server = token_server.TokenServer(
+        impl, mock.sentinel.request, project_id='example-project')
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def http_request():
+    return google.auth.transport._http_client.Request()
+
+
+def _root(server):
+    return 'http://{}/computeMetadata/v1/'.format(server.address)
+
+
+def test_ping(server, http_request, monkeypatch):
+    monkeypatch.setattr(
+        _metadata, '_METADATA_IP_ROOT', 'http://' + server.address)
+    assert _metadata.ping(http_request)
+
+
+def test_missing_flavor_header(server, http_request):
+    response = http_request(_root(server) + 'project/project-id')
+    assert response.status == http_client.FORBIDDEN
+
+
+def test_get_project_id(server, http_request):
+    assert _metadata.get(
+        http_request, 'project/project-id', root=_root(server)) == (
+            'example-project')
+
+
+def test_get_project_id_unknown(server, http_request):
+    server.project_id = None
+    with pytest.raises(exceptions.TransportError):
+        _metadata.get(
+            http_request, 'project/project-id', root=_root(server))
+
+
+def test_get_service_account_info(server, http_request):
+    for account in ('default', 'service-account@example.com'):
+        info = _metadata.get(
+            http_request, 'instance/service-accounts/{}/'.format(account),
+            root=_root(server), recursive=True)
+        assert info == {
+            'email': 'service-account@example.com',
+            'scopes': ['one', 'two'],
+            'aliases': ['default'],
+        }
+
+
+def test_get_email_and_scopes(server, http_request):
+    root = _root(server)
+    path = 'instance/service-accounts/default/'
+    assert _metadata.get(http_request, path + 'email', root=root) == (
+        'service-account@example.com')
+    assert _metadata.get(http_request, path + 'scopes', root=root) == (
+        'one\ntwo')
+
+
+def test_not_found(server, http_request):
+    for path in ('instance/service-accounts/other/token',
+                 'instance/service-accounts/default/identity',
+                 'instance/zone'):
+        with pytest.raises(exceptions.TransportError):
+            _metadata.get(http_request, path, root=_root(server))
+
+
+def test_get_token(server, http_request, impl):
+    data = _metadata.get(
+        http_request, 'instance/service-accounts/default/token',
+        root=_root(server))
+
+    assert data['access_token'] == 'token1'
+    assert data['token_type'] == 'Bearer'
+    assert 3590 < data['expires_in'] <= 3600
+
+    # The token is shared until it is about to expire.
+    data = _metadata.get(
+        http_request, 'instance/service-accounts/default/token',
+        root=_root(server))
+    assert data['access_token'] == 'token1'
+    assert impl.refreshes == 1
+
+
+def test_get_token_refresh_error(http_request, impl):
+    # Fail the refresh before the server's background refresher starts.
+    impl.error = exceptions.RefreshError('failed')
+    server = token_server.TokenServer(impl, mock.sentinel.request)
+    server.start()
+    try:
+        with pytest.raises(exceptions.TransportError) as excinfo:
+            _metadata.get(
+                http_request, 'instance/service-accounts/default/token',
+                root=_root(server))
+    finally:
+        server.stop()
+    assert excinfo.match(r'Status: 503')
+
+
+def test_compute_engine_credentials(server):
+    # The metadata server address is read when _metadata is imported, so use
+    # a separate process, as another process on the host would.
+    script = (
+        'import google.auth.transport._http_client\n'
+        'from google.auth import compute_engine\n'
+        'credentials = compute_engine.Credentials()\n'
+        'credentials.refresh(google.auth.transport._http_client.Request())\n'
+        'print(credentials.token)\n'
+        'print(credentials.scopes)\n')
+    env = dict(os.environ)
+    env[environment_vars.GCE_METADATA_ROOT] = server.address
+
+    output = subprocess.check_output(
+        [sys.executable, '-c', script], env=env,
+        cwd=os.path.join(os.path.dirname(__file__), '..', '..'))
+
+    assert output.decode('utf-8').split('\n')[:2] == [
+        'token1', "['one', 'two']"]
+
+
+def test_get_token_refreshes_within_margin(impl):
+    server = token_server.TokenServer(
+        impl, mock.sentinel.request, refresh_margin=3600)
+    try:
+        assert server.get_token()[0] == 'token1'
+        assert server.get_token()[0] == 'token2'
+    finally:
+        server._httpd.server_close()
+
+
+def test_get_token_no_expiry():
+    impl = make_credentials(lifetime=None)
+    server = token_server.TokenServer(
+        impl, mock.sentinel.request, refresh_margin=60)
+    try:
+        assert server.get_token() == ('token1', 60)
+        assert server.get_token() == ('token1', 60)
+    finally:
+        server._httpd.server_close()
+
+
+def test_service_account_email_default():
+    impl = make_credentials()
+    impl._service_account_email = None
+    server = token_server.TokenServer(impl, mock.sentinel.request)
+    try:
+        assert server.service_account_email == 'default'
+    finally:
+        server._httpd.server_close()
+
+
+def test_refresh_loop_refreshes_ahead(impl):
+    server = token_server.TokenServer(
+        impl, mock.sentinel.request, refresh_margin=0)
+
+    def wait(timeout):
+        # Stop after the first iteration.
+        assert timeout == pytest.approx(3600, abs=1)
+        server._stopped.set()
+
+    try:
+        with mock.patch.object(server._stopped, 'wait', side_effect=wait):
+            server._refresh_loop()
+    finally:
+        server._httpd.server_close()
+
+    assert impl.refreshes == 1
+
+
+def test_refresh_loop_retries(impl):
+    impl.error = exceptions.RefreshError('failed')
+    server = token_server.TokenServer(impl, mock.sentinel.request)
+
+    def wait(timeout):
+        assert timeout == token_server._RETRY_INTERVAL_SECS
+        server._stopped.set()
+
+    try:
+        with mock.patch.object(server._stopped, 'wait', side_effect=wait):
+            server._refresh_loop()
+    finally:
+        server._httpd.server_close()
+
+
+def test_refresh_loop_no_expiry():
+    impl = make_credentials(lifetime=None)
+    server = token_server.TokenServer(impl, mock.sentinel.request)
+    try:
+        server._refresh_loop()
+    finally:
+        server._httpd.server_close()
+
+    assert impl.refreshes == 1
+
+
+def test_refresher_restarted_after_fork(impl):
+    server = token_server.TokenServer(impl, mock.sentinel.request)
+    try:
+        with mock.patch.object(server, '_start_thread') as start_thread:
+            # Not started, nothing to restart.
+            server.get_token()
+            assert not start_thread.called
+
+            server._start_refresher()
+            server.get_token()
+            assert start_thread.call_count == 1
+
+            with mock.patch('google.auth._fork.generation',
+                            return_value=server._refresher_generation + 1):
+                server.get_token()
+                assert start_thread.call_count == 2
+                server.get_token()
+                assert start_thread.call_count == 2
+    finally:
+        server._httpd.server_close()
+
+
+def test__load_credentials_file(tmpdir):
+    info = {
+        'type': 'service_account',
+        'project_id': 'example-project',
+        'client_email': 'service-account@example.com',
+        'private_key': 'key',
+        'token_uri': 'https://example.com/token',
+    }
+    filename = tmpdir.join('key.json')
+    filename.write(json.dumps(info))
+
+    with mock.patch(
+            'google.oauth2.service_account.Credentials.'
+            'from_service_account_file') as from_file:
+        credentials, project_id = token_server._load_credentials(
+            str(filename), ['one'])
+
+    assert credentials is from_file.return_value
+    from_file.assert_called_once_with(str(filename), scopes=['one'])
+    assert project_id == 'example-project'
+
+
+@mock.patch('google.auth.default')
+def test__load_credentials_default(default):
+    scoped = mock.Mock(requires_scopes=True)
+    default.return_value = (scoped, 'example-project')
+
+    credentials, project_id = token_server._load_credentials(None, ['one'])
+
+    assert credentials is scoped.with_scopes.return_value
+    scoped.with_scopes.assert_called_once_with(['one'])
+    assert project_id == 'example-project'
@@ -0,0 +1,75 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fake credentials shared by the tests."""
+
+import datetime
+import threading
+
+from google.auth import _helpers
+from google.auth import _refresh
+from google.auth import credentials
+
+
+class CredentialsImpl(credentials.Credentials):
+    """Credentials whose token is derived from the refresh request.
+
+    Args:
+        error (Exception): If set, refreshing raises it instead.
+        lifetime (Optional[float]): The lifetime of the tokens in seconds, or
+            None if they don't expire.
+        token_format (str): The format of the tokens. ``{request}`` is
+            replaced by the refresh request and ``{count}`` by the number of
+            refresh attempts so far.
+        identity (Hashable): The identity under which the token is shared,
+            see :mod:`google.auth.token_sharing`.
+        phases (Sequence[str]): The refresh phases to time.
+        event (threading.Event): If set, refreshing waits for it.
+    """
+
+    def __init__(self, error=None, lifetime=None, token_format='{request}',
+                 identity=None, phases=(), event=None):
+        super(CredentialsImpl, self).__init__()
+        self.error = error
+        self.lifetime = lifetime
+        self.token_format = token_format
+        self.identity = identity
+        self.phases = phases
+        self.event = event
+        self.refreshes = 0
+        self.threads = []
+
+    def _token_identity(self):
+        return self.identity
+
+    def _expiry(self):
+        if self.lifetime is None:
+            return None
+        return _helpers.utcnow() + datetime.timedelta(seconds=self.lifetime)
+
+    @_refresh.refresh_method
+    def refresh(self, request):
+        """Refresh docstring."""
+        self.refreshes += 1
+        self.threads.append(threading.current_thread())
+        for name in self.phases:
+            with _refresh.phase(name):
+                pass
+        if self.event is not None:
+            self.event.wait()
+        if self.error is not None:
+            raise self.error
+        self._set_token(
+            self.token_format.format(request=request, count=self.refreshes),
+            self._expiry())
@@ -0,0 +1,89 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fakes shared by the asyncio tests.
+
+This module uses async syntax and must only be imported on Python 3.5 and
+later.
+"""
+
+import asyncio
+import json
+
+import mock
+
+from google.auth import _credentials_async
+from tests import fakes
+
+
+def run(coroutine):
+    """Runs a coroutine on a new event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_response(status, data):
+    """Creates a response with a JSON body."""
+    return mock.Mock(
+        status=status, data=json.dumps(data).encode('utf-8'),
+        headers={'content-type': 'application/json'})
+
+
+class FakeAsyncRequest(object):
+    """An asynchronous request returning canned responses.
+
+    Args:
+        responses (Union[mock.Mock, Exception]): The responses to return, or
+            errors to raise, in order. The last one is returned again for any
+            further requests.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        if len(self.responses) > 1:
+            response = self.responses.pop(0)
+        else:
+            response = self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class CredentialsImpl(fakes.CredentialsImpl):
+    """Credentials that can only be refreshed asynchronously.
+
+    Takes the same arguments as :class:`tests.fakes.CredentialsImpl`, except
+    ``event``.
+    """
+
+    def refresh(self, request):
+        raise NotImplementedError()
+
+    @_credentials_async.refresh_method
+    async def refresh_async(self, request):
+        self.refreshes += 1
+        # Give other coroutines a chance to run during the refresh.
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        self._set_token(
+            self.token_format.format(request=request, count=self.refreshes),
+            self._expiry())
@@ -14,14 +14,19 @@
 
 import datetime
 import json
+import threading
+import time
 
 import mock
 import pytest
 import six
+from six.moves import BaseHTTPServer
 from six.moves import http_client
+from six.moves import socketserver
 from six.moves import urllib
 
 from google.auth import exceptions
+import google.auth.transport._http_client
 from google.oauth2 import _client
 
 
@@ -73,7 +78,10 @@ def test__token_endpoint_request():
         method='POST',
         url='http://example.com',
         headers={'content-type': 'application/x-www-form-urlencoded'},
-        body='test=params')
+        body='test=params',
+        timeout=mock.ANY)
+    assert 0 < request.call_args[1]['timeout'] <= (
+        _client.DEFAULT_RETRY.deadline)
 
     # Check result
     assert result == {'test': 'response'}
@@ -89,6 +97,196 @@ def test__token_endpoint_request_error():
         _client._token_endpoint_request(request, 'http://example.com', {})
 
 
+def test__token_endpoint_request_rate_limit():
+    request = _make_request({'test': 'response'})
+
+    with mock.patch(
+            'google.auth.throttling.get_refresh_rate_limit') as get_limit:
+        get_limit.return_value.try_acquire.return_value = False
+        with pytest.raises(exceptions.RefreshError) as excinfo:
+            _client._token_endpoint_request(
+                request, 'http://example.com', {'test': 'params'})
+
+    assert excinfo.match(r'rate limit')
+    request.assert_not_called()
+
+
+def _make_response(status, data=b'{}', headers=None):
+    response = mock.Mock()
+    response.status = status
+    response.data = data
+    response.headers = headers or {}
+    return response
+
+
+@pytest.fixture
+def sleep():
+    with mock.patch('google.auth._helpers.sleep') as sleep:
+        yield sleep
+
+
+@pytest.fixture
+def no_jitter():
+    with mock.patch('random.random', return_value=0.0):
+        yield
+
+
+@pytest.mark.usefixtures('no_jitter')
+def test__token_endpoint_request_retries_server_errors(sleep):
+    request = mock.Mock(side_effect=[
+        _make_response(http_client.SERVICE_UNAVAILABLE),
+        _make_response(http_client.INTERNAL_SERVER_ERROR),
+        _make_response(http_client.OK, b'{"test": "response"}')])
+
+    result = _client._token_endpoint_request(
+        request, 'http://example.com', {})
+
+    assert result == {'test': 'response'}
+    assert request.call_count == 3
+    assert sleep.call_args_list == [mock.call(0.5), mock.call(1.0)]
+
+
+@pytest.mark.usefixtures('no_jitter')
+def test__token_endpoint_request_retries_transport_errors(sleep):
+    request = mock.Mock(side_effect=[
+        exceptions.TransportError('connection reset'),
+        _make_response(http_client.OK, b'{"test": "response"}')])
+
+    result = _client._token_endpoint_request(
+        request, 'http://example.com', {})
+
+    assert result == {'test': 'response'}
+    sleep.assert_called_once_with(0.5)
+
+
+def test__token_endpoint_request_retry_after(sleep):
+    request = mock.Mock(side_effect=[
+        _make_response(
+            http_client.SERVICE_UNAVAILABLE, headers={'retry-after': '3'}),
+        _make_response(http_client.OK, b'{"test": "response"}')])
+
+    _client._token_endpoint_request(request, 'http://example.com', {})
+
+    sleep.assert_called_once_with(3.0)
+
+
+def test__token_endpoint_request_retry_after_exceeds_deadline(sleep):
+    request = mock.Mock(return_value=_make_response(
+        http_client.SERVICE_UNAVAILABLE, b'Unavailable',
+        headers={'retry-after': '60'}))
+
+    with pytest.raises(exceptions.RefreshError) as excinfo:
+        _client._token_endpoint_request(request, 'http://example.com', {})
+
+    assert excinfo.match(r'Unavailable')
+    assert request.call_count == 1
+    assert not sleep.called
+
+
+def test__token_endpoint_request_retry_deadline():
+    request = mock.Mock(side_effect=exceptions.TransportError('down'))
+    retry = _client.RetryPolicy(deadline=5.0, initial_backoff=2.0, jitter=0)
+    clock = {'now': 0.0}
+
+    def sleep(secs):
+        clock['now'] += secs
+
+    with mock.patch(
+            'google.auth._helpers.monotonic', side_effect=lambda: (
+                clock['now'])):
+        with mock.patch('google.auth._helpers.sleep', side_effect=sleep):
+            with pytest.raises(exceptions.TransportError):
+                _client._token_endpoint_request(
+                    request, 'http://example.com', {}, retry=retry)
+
+    # Attempts at 0 and 2 seconds, the next one would start after 6 seconds.
+    assert request.call_count == 2
+    assert clock['now'] == 2.0
+
+
+def test__token_endpoint_request_no_retry(sleep):
+    request = mock.Mock(side_effect=exceptions.TransportError('down'))
+
+    with pytest.raises(exceptions.TransportError):
+        _client._token_endpoint_request(
+            request, 'http://example.com', {}, retry=None)
+
+    assert request.call_count == 1
+    assert not sleep.called
+    assert request.call_args[1]['timeout'] is None
+
+
+def test__token_endpoint_request_attempt_timeout():
+    # Each attempt times out at the deadline, or earlier if the policy's
+    # timeout is shorter.
+    request = mock.Mock(side_effect=exceptions.TransportError('down'))
+    retry = _client.RetryPolicy(
+        deadline=5.0, initial_backoff=2.0, jitter=0, timeout=4.0)
+    clock = {'now': 0.0}
+
+    def sleep(secs):
+        clock['now'] += secs
+
+    with mock.patch(
+            'google.auth._helpers.monotonic', side_effect=lambda: (
+                clock['now'])):
+        with mock.patch('google.auth._helpers.sleep', side_effect=sleep):
+            with pytest.raises(exceptions.TransportError):
+                _client._token_endpoint_request(
+                    request, 'http://example.com', {}, retry=retry)
+
+    timeouts = [call[1]['timeout'] for call in request.call_args_list]
+    assert timeouts == [4.0, 3.0]
+
+
+def test__token_endpoint_request_stops_after_deadline(sleep):
+    retry = _client.RetryPolicy(deadline=5.0, initial_backoff=0.5, jitter=0)
+    clock = {'now': 0.0}
+
+    def slow_request(**kwargs):
+        # The attempt times out at the deadline.
+        clock['now'] += kwargs['timeout']
+        raise exceptions.TransportError('timed out')
+
+    request = mock.Mock(side_effect=slow_request)
+
+    with mock.patch(
+            'google.auth._helpers.monotonic', side_effect=lambda: (
+                clock['now'])):
+        with pytest.raises(exceptions.TransportError):
+            _client._token_endpoint_request(
+                request, 'http://example.com', {}, retry=retry)
+
+    assert request.call_count == 1
+    assert clock['now'] == 5.0
+    assert not sleep.called
+
+
+def test__token_endpoint_request_client_error_not_retried(sleep):
+    request = mock.Mock(return_value=_make_response(
+        http_client.BAD_REQUEST, b'Error'))
+
+    with pytest.raises(exceptions.RefreshError):
+        _client._token_endpoint_request(request, 'http://example.com', {})
+
+    assert request.call_count == 1
+
+
+@pytest.mark.parametrize('value,expected', [
+    (None, None),
+    ('5', 5.0),
+    ('Thu, 01 Jan 1970 00:00:30 GMT', 20.0),
+    ('Thu, 01 Jan 1970 00:00:00 GMT', 0),
+    ('soon', None),
+])
+def test__parse_retry_after(value, expected):
+    headers = {} if value is None else {'retry-after': value}
+    response = _make_response(http_client.SERVICE_UNAVAILABLE, headers=headers)
+
+    with mock.patch('google.auth._helpers.utcnow_secs', return_value=10):
+        assert _client._parse_retry_after(response) == expected
+
+
 def _verify_request_params(request, params):
     request_body = request.call_args[1]['body']
     request_params = urllib.parse.parse_qs(request_body)
@@ -156,6 +354,31 @@ def test_refresh_grant(now_mock):
     assert extra_data['extra'] == 'data'
 
 
+def test_jwt_grant_retry(sleep):
+    request = mock.Mock(side_effect=[
+        _make_response(http_client.SERVICE_UNAVAILABLE),
+        _make_response(http_client.OK, b'{"access_token": "token"}')])
+
+    token, _, _ = _client.jwt_grant(
+        request, 'http://example.com', 'assertion_value',
+        retry=_client.RetryPolicy(initial_backoff=0.1, jitter=0))
+
+    assert token == 'token'
+    sleep.assert_called_once_with(0.1)
+
+
+def test_refresh_grant_no_retry():
+    request = mock.Mock(return_value=_make_response(
+        http_client.SERVICE_UNAVAILABLE, b'Unavailable'))
+
+    with pytest.raises(exceptions.RefreshError):
+        _client.refresh_grant(
+            request, 'http://example.com', 'refresh_token', 'client_id',
+            'client_secret', retry=None)
+
+    assert request.call_count == 1
+
+
 def test_refresh_grant_no_access_token():
     request = _make_request({
         # No access token.
@@ -167,3 +390,160 @@ def test_refresh_grant_no_access_token():
         _client.refresh_grant(
             request, 'http://example.com', 'refresh_token', 'client_id',
             'client_secret')
+
+
+def test_hedge_policy_delay():
+    policy = _client.HedgePolicy(
+        percentile=90, initial_delay=2.0, min_samples=10)
+
+    assert policy.start() == 2.0
+
+    for latency in range(1, 11):
+        policy.record(latency / 10.0)
+
+    assert policy.start() == 0.9
+    assert policy.requests == 2
+
+
+def test_hedge_policy_budget():
+    policy = _client.HedgePolicy(max_ratio=0.25)
+
+    policy.start()
+    assert policy.allow_hedge()
+    assert not policy.allow_hedge()
+
+    for _ in range(3):
+        policy.start()
+        assert not policy.allow_hedge()
+    policy.start()
+
+    assert policy.allow_hedge()
+    assert policy.hedges == 2
+
+
+def test__hedged_request_fast_response():
+    policy = _client.HedgePolicy(initial_delay=5.0)
+    request = mock.Mock(return_value=mock.sentinel.response)
+
+    response = _client._hedged_request(request, policy, url='url')
+
+    assert response is mock.sentinel.response
+    request.assert_called_once_with(url='url')
+    assert policy.hedges == 0
+    assert len(policy._history) == 1
+
+
+def test__hedged_request_uses_hedge_after_failure():
+    policy = _client.HedgePolicy(initial_delay=0.05)
+    responses = [exceptions.TransportError('slow failure'), 'hedge']
+
+    def request(**kwargs):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            time.sleep(0.2)
+            raise response
+        return response
+
+    assert _client._hedged_request(request, policy) == 'hedge'
+    assert policy.hedges == 1
+
+
+def test__hedged_request_error():
+    policy = _client.HedgePolicy(initial_delay=5.0)
+    request = mock.Mock(side_effect=exceptions.TransportError('error'))
+
+    with pytest.raises(exceptions.TransportError):
+        _client._hedged_request(request, policy)
+
+    assert policy.hedges == 0
+
+
+def test__token_endpoint_request_default_hedge_policy():
+    policy = _client.HedgePolicy()
+    request = _make_request({'access_token': 'token'})
+    _client.set_hedge_policy(policy)
+
+    try:
+        assert _client.get_hedge_policy() is policy
+        _client._token_endpoint_request(request, 'http://example.com', {})
+    finally:
+        _client.set_hedge_policy(None)
+
+    assert policy.requests == 1
+
+
+def test_refresh_grant_never_hedged():
+    policy = _client.HedgePolicy(initial_delay=0.01)
+    request = _make_request({'access_token': 'token'})
+    slow_request = mock.Mock(
+        side_effect=lambda **kwargs: time.sleep(0.2) or request(**kwargs))
+    _client.set_hedge_policy(policy)
+
+    try:
+        _client.refresh_grant(
+            slow_request, 'http://example.com', 'refresh_token',
+            'client_id', 'client_secret')
+    finally:
+        _client.set_hedge_policy(None)
+
+    # A second grant could invalidate the refresh token returned by the first.
+    assert slow_request.call_count == 1
+    assert policy.requests == 0
+
+
+class SlowTokenHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    def do_POST(self):
+        with self.server.lock:
+            delay = self.server.delays.pop(0) if self.server.delays else 0
+        time.sleep(delay)
+        body = json.dumps({'access_token': 'token', 'expires_in': 3600})
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SlowTokenServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def token_server():
+    server = SlowTokenServer(('127.0.0.1', 0), SlowTokenHandler)
+    server.lock = threading.Lock()
+    server.delays = []
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _timed_jwt_grant(server, hedge):
+    token_uri = 'http://127.0.0.1:{}/token'.format(server.server_address[1])
+    request = google.auth.transport._http_client.Request()
+    start = time.time()
+    token, _, _ = _client.jwt_grant(
+        request, token_uri, 'assertion', hedge=hedge)
+    assert token == 'token'
+    return time.time() - start
+
+
+def test_hedging_reduces_latency(token_server):
+    # The first request to the server is slow, the following ones aren't.
+    token_server.delays = [1.0]
+    unhedged = _timed_jwt_grant(token_server, None)
+
+    token_server.delays = [1.0]
+    policy = _client.HedgePolicy(initial_delay=0.1)
+    hedged = _timed_jwt_grant(token_server, policy)
+
+    assert unhedged >= 1.0
+    assert hedged < 0.5
+    assert policy.hedges == 1
@@ -0,0 +1,248 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import datetime
+import json
+import os
+
+import mock
+import pytest
+from six.moves import http_client
+from six.moves import urllib
+
+from google.auth import _helpers
+from google.auth import exceptions
+from google.auth import jwt
+from google.auth import token_cache
+from google.oauth2 import _client
+from google.oauth2 import _client_async
+from google.oauth2 import credentials
+from google.oauth2 import service_account
+from tests import fakes_async
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+with open(os.path.join(DATA_DIR, 'public_cert.pem'), 'rb') as fh:
+    PUBLIC_CERT_BYTES = fh.read()
+
+with open(os.path.join(DATA_DIR, 'service_account.json'), 'r') as fh:
+    SERVICE_ACCOUNT_INFO = json.load(fh)
+
+TOKEN_URI = 'https://example.com/oauth2/token'
+
+
+def test_token_endpoint_request_retries():
+    responses = [
+        mock.Mock(status=http_client.SERVICE_UNAVAILABLE, data=b'',
+                  headers={'retry-after': '0'}),
+        mock.Mock(status=http_client.OK, data=b'{"access_token": "token"}',
+                  headers={}),
+    ]
+
+    async def request(**kwargs):
+        return responses.pop(0)
+
+    result = fakes_async.run(
+        _client_async.jwt_grant(request, TOKEN_URI, 'assertion'))
+
+    assert result[0] == 'token'
+    assert not responses
+
+
+def test_token_endpoint_request_attempt_timeout():
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.OK, {'access_token': 'token'}))
+
+    fakes_async.run(
+        _client_async.jwt_grant(request, TOKEN_URI, 'assertion'))
+    fakes_async.run(_client_async.jwt_grant(
+        request, TOKEN_URI, 'assertion', retry=None))
+
+    first, second = request.calls
+    assert 0 < first['timeout'] <= _client.DEFAULT_RETRY.deadline
+    assert second['timeout'] is None
+
+
+@pytest.fixture
+def service_account_credentials():
+    return service_account.Credentials.from_service_account_info(
+        SERVICE_ACCOUNT_INFO, scopes=['email'])
+
+
+def test_token_endpoint_request_hedges():
+    calls = []
+    cancelled = []
+    response = mock.Mock(
+        status=http_client.OK, data=b'{"access_token": "token"}',
+        headers={})
+
+    async def request(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+        return response
+
+    policy = _client.HedgePolicy(initial_delay=0.05)
+    result = fakes_async.run(_client_async.jwt_grant(
+        request, TOKEN_URI, 'assertion', hedge=policy))
+
+    assert result[0] == 'token'
+    assert len(calls) == 2
+    assert cancelled == [True]
+    assert policy.hedges == 1
+
+
+def test_refresh_grant_never_hedged():
+    calls = []
+    response = fakes_async.make_response(
+        http_client.OK, {'access_token': 'token'})
+
+    async def request(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.2)
+        return response
+
+    policy = _client.HedgePolicy(initial_delay=0.01)
+    _client.set_hedge_policy(policy)
+    try:
+        fakes_async.run(_client_async.refresh_grant(
+            request, TOKEN_URI, 'refresh_token', 'client_id',
+            'client_secret'))
+    finally:
+        _client.set_hedge_policy(None)
+
+    assert len(calls) == 1
+    assert policy.requests == 0
+
+
+def test_service_account_refresh_async(service_account_credentials):
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.OK, {'access_token': 'token', 'expires_in': 500}))
+
+    fakes_async.run(service_account_credentials.refresh_async(request))
+
+    assert service_account_credentials.token == 'token'
+    assert service_account_credentials.valid
+
+    call, = request.calls
+    assert call['method'] == 'POST'
+    assert call['url'] == service_account_credentials._token_uri
+    body = urllib.parse.parse_qs(call['body'])
+    assertion = jwt.decode(body['assertion'][0], PUBLIC_CERT_BYTES)
+    assert assertion['scope'] == 'email'
+
+
+def test_service_account_refresh_async_signs_in_executor(
+        service_account_credentials):
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.OK, {'access_token': 'token', 'expires_in': 500}))
+
+    with mock.patch(
+            'google.auth._credentials_async.run_in_executor',
+            wraps=_run_in_executor) as run_in_executor:
+        fakes_async.run(service_account_credentials.refresh_async(request))
+
+    run_in_executor.assert_called_once_with(
+        service_account_credentials._make_authorization_grant_assertion)
+
+
+def _run_in_executor(func, *args):
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(None, func, *args)
+
+
+def test_service_account_before_request_async_self_signed_jwt():
+    credentials = service_account.Credentials.from_service_account_info(
+        SERVICE_ACCOUNT_INFO, self_signed_jwt=True)
+    request = fakes_async.FakeAsyncRequest(
+        fakes_async.make_response(http_client.OK, {}))
+    headers = {}
+
+    fakes_async.run(credentials.before_request_async(
+        request, 'GET', 'https://pubsub.googleapis.com/v1/topics', headers))
+
+    assert not request.calls
+    token = headers['authorization'].split()[1]
+    payload = jwt.decode(token, PUBLIC_CERT_BYTES)
+    assert payload['aud'] == 'https://pubsub.googleapis.com/'
+
+
+def test_service_account_refresh_async_error(service_account_credentials):
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.BAD_REQUEST,
+        {'error': 'invalid_grant', 'error_description': 'Bad grant'}))
+
+    with pytest.raises(exceptions.RefreshError):
+        fakes_async.run(service_account_credentials.refresh_async(request))
+
+    assert not service_account_credentials.valid
+
+
+def test_service_account_refresh_async_token_cache(tmpdir):
+    cache = token_cache.FileTokenCache(str(tmpdir))
+    first = service_account.Credentials.from_service_account_info(
+        SERVICE_ACCOUNT_INFO, token_cache=cache)
+    second = service_account.Credentials.from_service_account_info(
+        SERVICE_ACCOUNT_INFO, token_cache=cache)
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.OK, {'access_token': 'token', 'expires_in': 3600}))
+
+    fakes_async.run(first.refresh_async(request))
+    fakes_async.run(second.refresh_async(request))
+
+    assert len(request.calls) == 1
+    assert second.token == 'token'
+    assert second.expiry == first.expiry.replace(microsecond=0)
+    assert len(first._refresh_history) == 1
+    assert second._refresh_history is None
+
+
+@mock.patch('google.auth._helpers.utcnow', return_value=datetime.datetime.min)
+def test_user_credentials_refresh_async(now_mock):
+    user_credentials = credentials.Credentials(
+        token=None, refresh_token='refresh_token', token_uri=TOKEN_URI,
+        client_id='client_id', client_secret='client_secret')
+    request = fakes_async.FakeAsyncRequest(fakes_async.make_response(
+        http_client.OK, {
+            'access_token': 'token', 'refresh_token': 'new_refresh_token',
+            'expires_in': 500}))
+
+    fakes_async.run(user_credentials.refresh_async(request))
+
+    assert user_credentials.token == 'token'
+    assert user_credentials.expiry == (
+        _helpers.utcnow() + datetime.timedelta(seconds=500))
+    assert user_credentials._refresh_token == 'new_refresh_token'
+    body = urllib.parse.parse_qs(request.calls[0]['body'])
+    assert body['grant_type'] == ['refresh_token']
+    assert body['refresh_token'] == ['refresh_token']
+
+
+def test_user_credentials_refresh_async_no_access_token():
+    user_credentials = credentials.Credentials(
+        token=None, refresh_token='refresh_token', token_uri=TOKEN_URI,
+        client_id='client_id', client_secret='client_secret')
+    request = fakes_async.FakeAsyncRequest(
+        fakes_async.make_response(http_client.OK, {'expires_in': 500}))
+
+    with pytest.raises(exceptions.RefreshError) as excinfo:
+        fakes_async.run(user_credentials.refresh_async(request))
+
+    assert excinfo.match(r'No access token')
@@ -13,11 +13,13 @@
 # limitations under the License.
 
 import datetime
+import pickle
 
 import mock
 import pytest
 
 from google.auth import _helpers
+from google.auth import token_sharing
 from google.oauth2 import credentials
 
 
@@ -41,6 +43,21 @@ class TestCredentials(object):
         # Scopes aren't required for these credentials
         assert not self.credentials.requires_scopes
 
+    def test_pickle(self):
+        self.credentials.token = 'token'
+        self.credentials.expiry = (
+            datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+
+        unpickled = pickle.loads(pickle.dumps(self.credentials))
+
+        assert unpickled.valid
+        assert unpickled.token == 'token'
+        assert unpickled.expiry == self.credentials.expiry
+        assert unpickled._refresh_token == self.REFRESH_TOKEN
+        assert unpickled._token_uri == self.TOKEN_URI
+        assert unpickled._client_id == self.CLIENT_ID
+        assert unpickled._client_secret == self.CLIENT_SECRET
+
     def test_create_scoped(self):
         with pytest.raises(NotImplementedError):
             self.credentials.with_scopes(['email'])
@@ -77,3 +94,139 @@ class TestCredentials(object):
         # Check that the credentials are valid (have a token and are not
         # expired)
         assert self.credentials.valid
+
+    @mock.patch('google.oauth2._client.refresh_grant')
+    def test_refresh_writes_tokens(self, refresh_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=500)
+        refresh_grant_mock.return_value = (
+            'token', 'new_refresh_token', expiry, {})
+        writer = mock.create_autospec(credentials.TokenWriter, instance=True)
+        self.credentials._token_writer = writer
+
+        self.credentials.refresh(mock.Mock())
+
+        assert self.credentials.refresh_token == 'new_refresh_token'
+        writer.submit.assert_called_once_with(
+            self.credentials,
+            credentials.TokenUpdate('token', expiry, 'new_refresh_token'))
+
+    @mock.patch('google.oauth2._client.refresh_grant')
+    def test_token_sharing_survives_rotation(self, refresh_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        refresh_grant_mock.return_value = (
+            'token', 'new_refresh_token', expiry, {})
+        other = credentials.Credentials(
+            token=None, refresh_token=self.REFRESH_TOKEN,
+            token_uri=self.TOKEN_URI, client_id=self.CLIENT_ID,
+            client_secret=self.CLIENT_SECRET)
+        identity = self.credentials._token_identity()
+
+        token_sharing.set_token_store(token_sharing.TokenStore())
+        try:
+            self.credentials.refresh(mock.Mock())
+            other.refresh(mock.Mock())
+        finally:
+            token_sharing.set_token_store(None)
+
+        assert self.credentials.refresh_token == 'new_refresh_token'
+        assert self.credentials._token_identity() == identity
+        # The other credentials used the shared token.
+        assert refresh_grant_mock.call_count == 1
+        assert other.token == 'token'
+
+    @mock.patch('google.oauth2._client.refresh_grant')
+    def test_token_sharing_adopts_rotated_refresh_token(
+            self, refresh_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        refresh_grant_mock.side_effect = [
+            ('token1', 'refresh_token1', expiry, {}),
+            ('token2', 'refresh_token2', expiry, {})]
+        other = credentials.Credentials(
+            token=None, refresh_token=self.REFRESH_TOKEN,
+            token_uri=self.TOKEN_URI, client_id=self.CLIENT_ID,
+            client_secret=self.CLIENT_SECRET)
+
+        token_sharing.set_token_store(token_sharing.TokenStore())
+        try:
+            self.credentials.refresh(mock.Mock())
+            other.refresh(mock.Mock())
+            assert other.refresh_token == 'refresh_token1'
+            # The shared token was rejected, so the other credentials
+            # refresh with the rotated refresh token.
+            other.refresh(mock.Mock())
+        finally:
+            token_sharing.set_token_store(None)
+
+        assert refresh_grant_mock.call_count == 2
+        assert refresh_grant_mock.call_args[0][2] == 'refresh_token1'
+        assert other.token == 'token2'
+        assert other.refresh_token == 'refresh_token2'
+
+    def test_pickle_drops_token_writer(self):
+        self.credentials._token_writer = credentials.TokenWriter(mock.Mock())
+
+        unpickled = pickle.loads(pickle.dumps(self.credentials))
+
+        assert unpickled._token_writer is None
+
+
+def test_token_writer_writes():
+    written = []
+    writer = credentials.TokenWriter(
+        lambda target, update: written.append((target, update)), delay=0)
+    target = object()
+    update = credentials.TokenUpdate('token', None, 'refresh_token')
+
+    writer.submit(target, update)
+
+    assert writer.flush(timeout=5)
+    assert written == [(target, update)]
+
+
+def test_token_writer_coalesces():
+    written = []
+    writer = credentials.TokenWriter(
+        lambda target, update: written.append((target, update)), delay=0.1)
+    first, second = object(), object()
+
+    for index in range(10):
+        writer.submit(first, credentials.TokenUpdate(
+            'token{}'.format(index), None, 'refresh_token'))
+    writer.submit(second, credentials.TokenUpdate(
+        'other', None, 'refresh_token'))
+
+    assert writer.flush(timeout=5)
+    assert written == [
+        (first, credentials.TokenUpdate('token9', None, 'refresh_token')),
+        (second, credentials.TokenUpdate('other', None, 'refresh_token'))]
+
+
+def test_token_writer_logs_errors(caplog):
+    write = mock.Mock(side_effect=[IOError('disk full'), None])
+    writer = credentials.TokenWriter(write, delay=0)
+    update = credentials.TokenUpdate('token', None, 'refresh_token')
+
+    writer.submit(object(), update)
+    assert writer.flush(timeout=5)
+    writer.submit(object(), update)
+    assert writer.flush(timeout=5)
+
+    assert write.call_count == 2
+    assert 'Failed to write refreshed tokens' in caplog.text
+
+
+def test_token_writer_restarts_after_fork():
+    write = mock.Mock()
+    writer = credentials.TokenWriter(write, delay=0)
+    update = credentials.TokenUpdate('token', None, 'refresh_token')
+    writer.submit(object(), update)
+    assert writer.flush(timeout=5)
+    thread = writer._thread
+
+    with mock.patch(
+            'google.auth._fork.generation', return_value=object()):
+        writer.submit(object(), update)
+        assert writer.flush(timeout=5)
+
+    assert writer._thread is not thread
+    assert write.call_count == 2
@@ -15,13 +15,19 @@
 import datetime
 import json
 import os
+import pickle
 
 import mock
 import pytest
+from six.moves import http_client
 
 from google.auth import _helpers
+from google.auth import _service_account_info
+from google.auth import credentials
 from google.auth import crypt
 from google.auth import jwt
+from google.auth import token_cache
+from google.auth import token_sharing
 from google.oauth2 import service_account
 
 
@@ -57,6 +63,9 @@ class TestCredentials(object):
         self.credentials = service_account.Credentials(
             signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI)
 
+    def test_has_no_dict(self):
+        assert not hasattr(self.credentials, '__dict__')
+
     def test_from_service_account_info(self):
         credentials = service_account.Credentials.from_service_account_info(
             SERVICE_ACCOUNT_INFO)
@@ -67,6 +76,13 @@ class TestCredentials(object):
                 SERVICE_ACCOUNT_INFO['client_email'])
         assert credentials._token_uri == SERVICE_ACCOUNT_INFO['token_uri']
 
+    def test_from_service_account_info_lazy_signer(self):
+        credentials = service_account.Credentials.from_service_account_info(
+            SERVICE_ACCOUNT_INFO)
+
+        assert isinstance(credentials._signer, crypt.LazySigner)
+        assert credentials._signer._signer is None
+
     def test_from_service_account_info_args(self):
         info = SERVICE_ACCOUNT_INFO.copy()
         scopes = ['email', 'profile']
@@ -94,6 +110,15 @@ class TestCredentials(object):
         assert credentials._service_account_email == info['client_email']
         assert credentials._token_uri == info['token_uri']
 
+    def test_from_service_account_file_reload_key(self):
+        credentials = service_account.Credentials.from_service_account_file(
+            SERVICE_ACCOUNT_JSON_FILE, reload_key=True)
+
+        assert isinstance(
+            credentials._signer, _service_account_info.ReloadingSigner)
+        assert (credentials.with_subject('subject')._signer is
+                credentials._signer)
+
     def test_from_service_account_file_args(self):
         info = SERVICE_ACCOUNT_INFO.copy()
         scopes = ['email', 'profile']
@@ -134,11 +159,68 @@ class TestCredentials(object):
         signature = self.credentials.sign_bytes(to_sign)
         assert crypt.verify_signature(to_sign, signature, PUBLIC_CERT_BYTES)
 
+    def test_pickle(self):
+        credentials = self.credentials.with_scopes(['email'])
+        credentials.token = 'token'
+        credentials.expiry = (
+            datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+
+        unpickled = pickle.loads(pickle.dumps(credentials))
+
+        assert unpickled.valid
+        assert unpickled.token == 'token'
+        assert unpickled.expiry == credentials.expiry
+        assert unpickled.scopes == ['email']
+        assert unpickled._service_account_email == self.SERVICE_ACCOUNT_EMAIL
+        signature = unpickled.sign_bytes(b'123')
+        assert crypt.verify_signature(b'123', signature, PUBLIC_CERT_BYTES)
+
     def test_create_scoped(self):
         scopes = ['email', 'profile']
         credentials = self.credentials.with_scopes(scopes)
         assert credentials._scopes == scopes
 
+    def test_with_scopes_memoized(self):
+        credentials = self.credentials.with_scopes(['email', 'profile'])
+
+        assert self.credentials.with_scopes(['email', 'profile']) is (
+            credentials)
+        assert self.credentials.with_scopes(['email']) is not credentials
+
+    def test_with_scopes_memoized_keeps_order(self):
+        credentials = self.credentials.with_scopes(['email', 'profile'])
+        reordered = self.credentials.with_scopes(['profile', 'email'])
+
+        assert reordered is not credentials
+        assert reordered._scopes == ['profile', 'email']
+        assert self.credentials.with_scopes(['profile', 'email']) is (
+            reordered)
+
+    def test_with_subject_memoized(self):
+        credentials = self.credentials.with_subject('user@example.com')
+
+        assert self.credentials.with_subject('user@example.com') is (
+            credentials)
+        assert credentials._subject == 'user@example.com'
+        assert self.credentials.with_subject('other@example.com') is not (
+            credentials)
+        # Derivations with different scopes are distinct.
+        assert self.credentials.with_scopes(['email']).with_subject(
+            'user@example.com') is not credentials
+
+    def test_with_scopes_memoized_shares_token(self):
+        credentials = self.credentials.with_scopes(['email'])
+        credentials.token = 'token'
+
+        assert self.credentials.with_scopes(['email']).valid
+
+    def test_derived_credentials_bounded(self):
+        for index in range(credentials._DERIVED_CREDENTIALS_CACHE_SIZE + 1):
+            self.credentials.with_subject('user{}@example.com'.format(index))
+
+        assert (len(self.credentials._derived_credentials) ==
+                credentials._DERIVED_CREDENTIALS_CACHE_SIZE)
+
     def test__make_authorization_grant_assertion(self):
         token = self.credentials._make_authorization_grant_assertion()
         payload = jwt.decode(token, PUBLIC_CERT_BYTES)
@@ -185,6 +267,294 @@ class TestCredentials(object):
         # expired)
         assert self.credentials.valid
 
+    def test_token_cache_key(self):
+        scoped = self.credentials.with_scopes(['two', 'one'])
+        reordered = self.credentials.with_scopes(['one', 'two'])
+        delegated = scoped.with_subject('user@example.com')
+
+        assert scoped._token_cache_key() == reordered._token_cache_key()
+        assert scoped._token_cache_key() != delegated._token_cache_key()
+        assert (self.credentials._token_cache_key() !=
+                scoped._token_cache_key())
+
+    def test_token_identity(self, signer):
+        equivalent = service_account.Credentials(
+            signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI)
+        scoped = self.credentials.with_scopes(['two', 'one'])
+        reordered = equivalent.with_scopes(['one', 'two'])
+        delegated = scoped.with_subject('user@example.com')
+
+        assert (self.credentials._token_identity() ==
+                equivalent._token_identity())
+        assert scoped._token_identity() == reordered._token_identity()
+        assert scoped._token_identity() != delegated._token_identity()
+        assert (self.credentials._token_identity() !=
+                scoped._token_identity())
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_shared_token(self, jwt_grant_mock, signer):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+        equivalent = service_account.Credentials(
+            signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI)
+        token_sharing.set_token_store(token_sharing.TokenStore())
+
+        try:
+            self.credentials.refresh(mock.Mock())
+            equivalent.refresh(mock.Mock())
+        finally:
+            token_sharing.set_token_store(None)
+
+        assert jwt_grant_mock.call_count == 1
+        assert equivalent.token == 'token'
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_subject_token_reused(self, jwt_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+        delegated = self.credentials.with_subject('user@example.com')
+        delegated.refresh(mock.Mock())
+        # Discard the memoized credentials, the token remains cached.
+        self.credentials._derived_credentials.clear()
+
+        recreated = self.credentials.with_subject('user@example.com')
+        recreated.refresh(mock.Mock())
+
+        assert recreated is not delegated
+        assert jwt_grant_mock.call_count == 1
+        assert recreated.token == 'token'
+        assert len(delegated._refresh_history) == 1
+        assert recreated._refresh_history is None
+        assert len(self.credentials._subject_tokens) == 1
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_subject_token_per_subject(self, jwt_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.side_effect = [
+            ('token1', expiry, None), ('token2', expiry, None)]
+
+        first = self.credentials.with_subject('user1@example.com')
+        first.refresh(mock.Mock())
+        second = self.credentials.with_subject('user2@example.com')
+        second.refresh(mock.Mock())
+
+        assert first.token == 'token1'
+        assert second.token == 'token2'
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_subject_token_rejected(self, jwt_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.side_effect = [
+            ('token1', expiry, None), ('token2', expiry, None)]
+        delegated = self.credentials.with_subject('user@example.com')
+        delegated.refresh(mock.Mock())
+
+        # Refreshing again, for example because the token was rejected,
+        # doesn't reuse the cached token.
+        delegated.refresh(mock.Mock())
+
+        assert delegated.token == 'token2'
+        self.credentials._derived_credentials.clear()
+        recreated = self.credentials.with_subject('user@example.com')
+        recreated.refresh(mock.Mock())
+        assert recreated.token == 'token2'
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_subject_token_stale(self, jwt_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=10)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+        delegated = self.credentials.with_subject('user@example.com')
+        delegated.refresh(mock.Mock())
+
+        stale_deadline = delegated._token_state.stale_deadline
+        subject_tokens = self.credentials._subject_tokens
+        key = delegated._token_cache_key()
+
+        assert subject_tokens.get(key) == ('token', expiry)
+        with mock.patch(
+                'google.auth._helpers.monotonic', return_value=stale_deadline):
+            assert subject_tokens.get(key) is None
+
+    def test_subject_tokens_not_pickled(self):
+        self.credentials.with_subject('user@example.com')
+        self.credentials._subject_tokens.set(
+            'key', ('token', None), _helpers.monotonic() + 60)
+
+        unpickled = pickle.loads(pickle.dumps(self.credentials))
+
+        assert unpickled._subject_tokens is None
+
+    def test_caches_created_on_demand(self):
+        assert self.credentials._derived_credentials is None
+        assert self.credentials._subject_tokens is None
+        assert self.credentials._self_signed_jwts is None
+
+        derived = self.credentials.with_subject('user@example.com')
+
+        assert derived._subject_tokens is self.credentials._subject_tokens
+        assert derived._subject_tokens is not None
+        assert derived._derived_credentials is None
+        assert derived._self_signed_jwts is None
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_before_request_self_signed_jwt(self, jwt_grant_mock, signer):
+        credentials = service_account.Credentials(
+            signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI,
+            self_signed_jwt=True)
+        headers = {}
+
+        credentials.before_request(
+            mock.Mock(), 'GET', 'https://pubsub.googleapis.com/v1/topics',
+            headers)
+
+        assert not jwt_grant_mock.called
+        token = headers['authorization'].split()[1]
+        payload = jwt.decode(token, PUBLIC_CERT_BYTES)
+        assert payload['iss'] == self.SERVICE_ACCOUNT_EMAIL
+        assert payload['sub'] == self.SERVICE_ACCOUNT_EMAIL
+        assert payload['aud'] == 'https://pubsub.googleapis.com/'
+
+    def test_before_request_self_signed_jwt_cached(self, signer):
+        credentials = service_account.Credentials(
+            signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI,
+            self_signed_jwt=True)
+        url = 'https://pubsub.googleapis.com/v1/topics'
+        first, second, other = {}, {}, {}
+
+        with mock.patch(
+                'google.auth.jwt.encode', wraps=jwt.encode) as encode_mock:
+            credentials.before_request(mock.Mock(), 'GET', url, first)
+            credentials.before_request(
+                mock.Mock(), 'GET', url + '?pageSize=1', second)
+            credentials.before_request(
+                mock.Mock(), 'GET', 'https://storage.googleapis.com/b',
+                other)
+
+        assert encode_mock.call_count == 2
+        assert first == second
+        assert first != other
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_before_request_self_signed_jwt_audiences(
+            self, jwt_grant_mock, signer):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+        credentials = service_account.Credentials(
+            signer, self.SERVICE_ACCOUNT_EMAIL, self.TOKEN_URI,
+            self_signed_jwt=['https://pubsub.googleapis.com/'])
+        pubsub, storage = {}, {}
+
+        credentials.before_request(
+            mock.Mock(), 'GET', 'https://pubsub.googleapis.com/v1/topics',
+            pubsub)
+        credentials.before_request(
+            mock.Mock(), 'GET', 'https://storage.googleapis.com/b', storage)
+
+        assert pubsub['authorization'] != 'Bearer token'
+        assert storage['authorization'] == 'Bearer token'
+        assert jwt_grant_mock.call_count == 1
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_before_request_self_signed_jwt_subject(self, jwt_grant_mock):
+        expiry = _helpers.utcnow() + datetime.timedelta(seconds=3600)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+        credentials = self.credentials.with_self_signed_jwt().with_subject(
+            'user@example.com')
+        headers = {}
+
+        credentials.before_request(
+            mock.Mock(), 'GET', 'https://pubsub.googleapis.com/v1/topics',
+            headers)
+
+        # Domain-wide delegation requires an access token.
+        assert headers['authorization'] == 'Bearer token'
+
+    def test_with_self_signed_jwt(self):
+        credentials = self.credentials.with_self_signed_jwt(
+            'https://pubsub.googleapis.com/')
+
+        assert not self.credentials._self_signed_jwt
+        assert credentials._self_signed_jwt == frozenset(
+            ['https://pubsub.googleapis.com/'])
+        assert credentials.with_scopes(['email'])._self_signed_jwt == (
+            credentials._self_signed_jwt)
+
+    def test_self_signed_jwts_not_pickled(self):
+        credentials = self.credentials.with_self_signed_jwt()
+        credentials.before_request(
+            mock.Mock(), 'GET', 'https://pubsub.googleapis.com/', {})
+
+        unpickled = pickle.loads(pickle.dumps(credentials))
+
+        assert unpickled._self_signed_jwt is True
+        assert unpickled._self_signed_jwts is None
+
+    def test_with_scopes_and_subject_keep_token_cache(self, tmpdir):
+        cache = token_cache.FileTokenCache(str(tmpdir))
+        credentials = service_account.Credentials.from_service_account_info(
+            SERVICE_ACCOUNT_INFO, token_cache=cache)
+
+        assert credentials.with_scopes(['email'])._token_cache is cache
+        assert credentials.with_subject('subject')._token_cache is cache
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_token_cache_miss(self, jwt_grant_mock, tmpdir):
+        cache = token_cache.FileTokenCache(str(tmpdir))
+        self.credentials._token_cache = cache
+        expiry = _helpers.utcnow().replace(microsecond=0) + datetime.timedelta(
+            seconds=3600)
+        jwt_grant_mock.return_value = ('token', expiry, None)
+
+        self.credentials.refresh(mock.Mock())
+
+        assert jwt_grant_mock.called
+        assert self.credentials.token == 'token'
+        assert cache.get(self.credentials._token_cache_key()) == (
+            'token', expiry)
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_token_cache_hit(self, jwt_grant_mock, tmpdir):
+        cache = token_cache.FileTokenCache(str(tmpdir))
+        self.credentials._token_cache = cache
+        expiry = _helpers.utcnow().replace(microsecond=0) + datetime.timedelta(
+            seconds=3600)
+        cache.set(self.credentials._token_cache_key(), 'cached', expiry)
+
+        self.credentials.refresh(mock.Mock())
+
+        assert not jwt_grant_mock.called
+        assert self.credentials.token == 'cached'
+        assert self.credentials.expiry == expiry
+        assert self.credentials.valid
+        # The cache's latency says nothing about the token endpoint's.
+        assert self.credentials._refresh_history is None
+
+    @mock.patch('google.oauth2._client.jwt_grant')
+    def test_refresh_token_cache_no_expiry(self, jwt_grant_mock, tmpdir):
+        cache = token_cache.FileTokenCache(str(tmpdir))
+        self.credentials._token_cache = cache
+        jwt_grant_mock.return_value = ('token', None, None)
+
+        self.credentials.refresh(mock.Mock())
+
+        assert self.credentials.token == 'token'
+        assert cache.get(self.credentials._token_cache_key()) is None
+
+    def test_refresh_hook_timings(self):
+        response = mock.Mock()
+        response.status = http_client.OK
+        response.data = json.dumps({
+            'access_token': 'token', 'expires_in': 500}).encode('utf-8')
+        request = mock.Mock(return_value=response)
+        hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+        self.credentials.add_refresh_hook(hook)
+
+        self.credentials.refresh(request)
+
+        assert self.credentials.token == 'token'
+        _, timings = hook.on_refresh_success.call_args[0]
+        assert sorted(timings.keys()) == ['http', 'parse', 'sign', 'total']
+
     @mock.patch('google.oauth2._client.jwt_grant')
     def test_before_request_refreshes(self, jwt_grant_mock):
         token = 'token'
@@ -0,0 +1,94 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import pytest
+
+import google.auth
+from google.auth import exceptions
+from tests import fakes
+
+
+def test_refresh_many():
+    error = exceptions.RefreshError('failed')
+    impls = [fakes.CredentialsImpl(), fakes.CredentialsImpl(error=error),
+             fakes.CredentialsImpl()]
+
+    outcomes = google.auth.refresh_many(iter(impls), 'token')
+
+    assert outcomes == [
+        google.auth.RefreshOutcome(impls[0], None),
+        google.auth.RefreshOutcome(impls[1], error),
+        google.auth.RefreshOutcome(impls[2], None),
+    ]
+    assert impls[0].token == impls[2].token == 'token'
+    assert not impls[1].valid
+
+
+def test_refresh_many_empty():
+    assert google.auth.refresh_many([], 'token') == []
+
+
+def test_refresh_many_concurrent():
+    # Each refresh blocks until all of them have started.
+    barrier_count = [0]
+    lock = threading.Lock()
+    started = threading.Event()
+
+    class BlockingImpl(fakes.CredentialsImpl):
+        def refresh(self, request):
+            with lock:
+                barrier_count[0] += 1
+                if barrier_count[0] == 4:
+                    started.set()
+            assert started.wait(5)
+            super(BlockingImpl, self).refresh(request)
+
+    impls = [BlockingImpl() for _ in range(4)]
+
+    outcomes = google.auth.refresh_many(impls, 'token', max_workers=4)
+
+    assert all(outcome.error is None for outcome in outcomes)
+    assert len(set(impl.threads[0] for impl in impls)) == 4
+
+
+def test_refresh_many_bounded_workers():
+    impls = [fakes.CredentialsImpl() for _ in range(10)]
+
+    google.auth.refresh_many(impls, 'token', max_workers=2)
+
+    assert len(set(impl.threads[0] for impl in impls)) <= 2
+
+
+def test_refresh_many_deadline():
+    event = threading.Event()
+    slow = fakes.CredentialsImpl(event=event)
+    skipped = fakes.CredentialsImpl()
+
+    try:
+        outcomes = google.auth.refresh_many(
+            [slow, skipped], 'token', max_workers=1, deadline=0.1)
+    finally:
+        event.set()
+
+    for outcome in outcomes:
+        assert isinstance(outcome.error, exceptions.RefreshError)
+        assert outcome.error.args[0].startswith('The deadline passed')
+
+
+def test_refresh_many_invalid_max_workers():
+    with pytest.raises(ValueError):
+        google.auth.refresh_many(
+            [fakes.CredentialsImpl()], 'token', max_workers=0)
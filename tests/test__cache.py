@@ -0,0 +1,260 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import mock
+import pytest
+
+from google.auth import _cache
+
+
+def test_get_and_set():
+    cache = _cache.LRUCache(2)
+    assert cache.get('a') is None
+    assert cache.get('a', 'default') == 'default'
+
+    cache.set('a', 1)
+    cache.set('b', 2)
+
+    assert len(cache) == 2
+    assert 'a' in cache
+    assert cache.get('a') == 1
+    assert cache.get('b') == 2
+
+
+def test_set_replaces():
+    cache = _cache.LRUCache(2)
+    cache.set('a', 1)
+    cache.set('a', 2)
+
+    assert len(cache) == 1
+    assert cache.get('a') == 2
+
+
+def test_evicts_least_recently_used():
+    cache = _cache.LRUCache(2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    # Using 'a' makes 'b' the least recently used.
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+
+def test_setdefault():
+    cache = _cache.LRUCache(2)
+
+    assert cache.setdefault('a', 1) == 1
+    assert cache.setdefault('a', 2) == 1
+    cache.setdefault('b', 2)
+    cache.setdefault('a', 3)
+    cache.setdefault('c', 3)
+
+    assert len(cache) == 2
+    assert 'b' not in cache
+
+
+def test_pop():
+    cache = _cache.LRUCache(2)
+    cache.set('a', 1)
+
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
+    assert cache.pop('a', 'default') == 'default'
+    assert len(cache) == 0
+
+
+def test_clear():
+    cache = _cache.LRUCache(2, maxweight=10, weigher=len)
+    cache.set('a', 'aaa')
+    cache.clear()
+
+    assert len(cache) == 0
+    assert cache.weight == 0
+
+
+def test_maxweight_requires_weigher():
+    with pytest.raises(ValueError):
+        _cache.LRUCache(2, maxweight=10)
+
+
+def test_evicts_by_weight():
+    cache = _cache.LRUCache(10, maxweight=5, weigher=len)
+    cache.set('a', 'aa')
+    cache.set('b', 'bb')
+    assert cache.weight == 4
+
+    cache.set('c', 'ccc')
+
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert 'c' in cache
+    assert cache.weight == 5
+    assert cache.evictions == 1
+
+
+def test_keeps_single_heavy_item():
+    cache = _cache.LRUCache(10, maxweight=5, weigher=len)
+    cache.set('a', 'a')
+    cache.set('b', 'bbbbbbbb')
+
+    assert len(cache) == 1
+    assert 'b' in cache
+    assert cache.weight == 8
+
+
+def test_set_replaces_weight():
+    cache = _cache.LRUCache(10, maxweight=5, weigher=len)
+    cache.set('a', 'aaaa')
+    cache.set('a', 'a')
+
+    assert cache.weight == 1
+    assert cache.pop('a') == 'a'
+    assert cache.weight == 0
+
+
+def test_discard():
+    cache = _cache.LRUCache(2)
+    value = ['value']
+    cache.set('a', value)
+
+    cache.discard('a', ['value'])
+    assert cache.get('a') is value
+
+    cache.discard('a', value)
+    assert 'a' not in cache
+    cache.discard('a', value)
+
+
+def test_get_or_create():
+    holder = mock.Mock(cache=None)
+    create = mock.Mock(side_effect=dict)
+
+    cache = _cache.get_or_create(holder, 'cache', create)
+
+    assert holder.cache is cache
+    assert _cache.get_or_create(holder, 'cache', create) is cache
+    assert create.call_count == 1
+
+
+def test_get_or_create_concurrent():
+    holder = mock.Mock(cache=None)
+    caches = []
+
+    def use_cache():
+        caches.append(_cache.get_or_create(holder, 'cache', dict))
+
+    threads = [threading.Thread(target=use_cache) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(cache is holder.cache for cache in caches)
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('google.auth._helpers.monotonic', return_value=100.0) as (
+            monotonic):
+        yield monotonic
+
+
+def test_ttl_get_and_set(monotonic):
+    cache = _cache.TTLCache(2)
+    cache.set('a', 1, 110.0)
+
+    assert cache.get('a') == 1
+    assert cache.pop('a') == 1
+    assert cache.pop('a') is None
+
+
+def test_ttl_get_expired(monotonic):
+    cache = _cache.TTLCache(2)
+    cache.set('a', 1, 110.0)
+    monotonic.return_value = 110.0
+
+    assert cache.get('a') is None
+    assert cache.get('a', 'default') == 'default'
+    assert 'a' not in cache
+
+
+def test_ttl_evicts_least_recently_used(monotonic):
+    cache = _cache.TTLCache(2)
+    cache.set('a', 1, 200.0)
+    cache.set('b', 2, 110.0)
+    cache.set('c', 3, 200.0)
+
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert 'c' in cache
+
+
+def test_ttl_evicts_by_weight(monotonic):
+    cache = _cache.TTLCache(10, maxweight=5, weigher=len)
+    cache.set('a', 'aaa', 200.0)
+    cache.set('b', 'bb', 110.0)
+    assert cache.weight == 5
+
+    cache.set('c', 'cc', 200.0)
+
+    assert 'a' not in cache
+    assert 'b' in cache
+    assert cache.weight == 4
+    assert cache.evictions == 1
+
+
+def test_ttl_expired_discarded_on_lookup(monotonic):
+    cache = _cache.TTLCache(10, maxweight=5, weigher=len)
+    cache.set('a', 'aaa', 110.0)
+    monotonic.return_value = 120.0
+
+    assert len(cache) == 1
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    assert cache.weight == 0
+
+
+def test_ttl_setdefault(monotonic):
+    cache = _cache.TTLCache(2)
+
+    assert cache.setdefault('a', 1, 110.0) == 1
+    assert cache.setdefault('a', 2, 120.0) == 1
+    assert cache.get('a') == 1
+
+    # An expired item is replaced.
+    monotonic.return_value = 110.0
+    assert cache.setdefault('a', 3, 120.0) == 3
+    assert cache.get('a') == 3
+
+
+def test_ttl_setdefault_expired_value(monotonic):
+    cache = _cache.TTLCache(2)
+
+    # The added item is returned even if its deadline already passed.
+    assert cache.setdefault('a', 1, 90.0) == 1
+    assert cache.get('a') is None
+
+
+def test_ttl_pop_expired(monotonic):
+    cache = _cache.TTLCache(2)
+    cache.set('a', 1, 110.0)
+    monotonic.return_value = 110.0
+
+    assert cache.pop('a', 'default') == 'default'
+    assert 'a' not in cache
@@ -0,0 +1,172 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import datetime
+import threading
+
+import mock
+import pytest
+
+from google.auth import _credentials_async
+from google.auth import credentials
+from google.auth import exceptions
+from tests import fakes_async
+
+
+def test_run_in_executor():
+    async def in_executor():
+        return await _credentials_async.run_in_executor(
+            threading.current_thread)
+
+    assert fakes_async.run(in_executor()) is not threading.current_thread()
+
+
+def test_before_request_async():
+    impl = fakes_async.CredentialsImpl()
+    headers = {}
+
+    fakes_async.run(impl.before_request_async(
+        'token', 'GET', 'http://example.com', headers))
+
+    assert headers == {'authorization': 'Bearer token'}
+    assert impl.valid
+
+
+def test_before_request_async_single_flight():
+    impl = fakes_async.CredentialsImpl()
+
+    async def make_requests():
+        headers = [{} for _ in range(5)]
+        await asyncio.gather(*[
+            impl.before_request_async(
+                'token', 'GET', 'http://example.com', request_headers)
+            for request_headers in headers])
+        return headers
+
+    headers = fakes_async.run(make_requests())
+
+    assert impl.refreshes == 1
+    assert headers == [{'authorization': 'Bearer token'}] * 5
+
+
+def test_before_request_async_error():
+    impl = fakes_async.CredentialsImpl(error=exceptions.RefreshError('failed'))
+
+    async def make_requests():
+        return await asyncio.gather(*[
+            impl.before_request_async('token', 'GET', 'http://example.com', {})
+            for _ in range(2)], return_exceptions=True)
+
+    results = fakes_async.run(make_requests())
+
+    assert impl.refreshes == 1
+    assert all(isinstance(result, exceptions.RefreshError)
+               for result in results)
+    assert impl._refresh_failure is not None
+
+
+def test_before_request_async_cancelled_waiter():
+    impl = fakes_async.CredentialsImpl()
+
+    async def cancel_one_waiter():
+        first = asyncio.ensure_future(impl.before_request_async(
+            'token', 'GET', 'http://example.com', {}))
+        second = asyncio.ensure_future(impl.before_request_async(
+            'token', 'GET', 'http://example.com', {}))
+        await asyncio.sleep(0)
+        first.cancel()
+        await second
+
+    fakes_async.run(cancel_one_waiter())
+
+    assert impl.refreshes == 1
+    assert impl.valid
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('google.auth._helpers.monotonic') as monotonic:
+        monotonic.return_value = 100.0
+        yield monotonic
+
+
+def make_stale(impl, monotonic):
+    impl.token = 'stale'
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    monotonic.return_value = impl._token_state.stale_deadline
+
+
+def test_before_request_async_stale(monotonic):
+    impl = fakes_async.CredentialsImpl()
+    make_stale(impl, monotonic)
+    headers = {}
+
+    async def make_request():
+        await impl.before_request_async(
+            'token', 'GET', 'http://example.com', headers)
+        # The request doesn't wait for the refresh.
+        assert headers == {'authorization': 'Bearer stale'}
+        await impl._async_refresh[1]
+
+    fakes_async.run(make_request())
+
+    assert impl.token == 'token'
+    assert not impl.stale
+
+
+def test_before_request_async_stale_error(monotonic):
+    impl = fakes_async.CredentialsImpl(error=exceptions.RefreshError('failed'))
+    make_stale(impl, monotonic)
+    headers = {}
+
+    async def make_requests():
+        await impl.before_request_async(
+            'token', 'GET', 'http://example.com', headers)
+        await asyncio.sleep(0.01)
+        # Backing off from the failed refresh.
+        await impl.before_request_async(
+            'token', 'GET', 'http://example.com', headers)
+        await asyncio.sleep(0.01)
+
+    with mock.patch('google.auth._credentials_async._LOGGER') as logger:
+        fakes_async.run(make_requests())
+
+    assert headers == {'authorization': 'Bearer stale'}
+    assert impl.refreshes == 1
+    assert logger.warning.call_count == 1
+
+
+def test_refresh_method_hooks():
+    hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+    impl = fakes_async.CredentialsImpl(error=exceptions.RefreshError('failed'))
+    impl.add_refresh_hook(hook)
+
+    with pytest.raises(exceptions.RefreshError):
+        fakes_async.run(impl.refresh_async('token'))
+
+    hook.on_refresh_start.assert_called_once_with(impl)
+    _, _, timings = hook.on_refresh_failure.call_args[0]
+    assert list(timings.keys()) == ['total']
+
+    # Backing off from the failed refresh.
+    impl.error = None
+    with pytest.raises(exceptions.RefreshError):
+        fakes_async.run(impl.refresh_async('token'))
+    assert impl.refreshes == 1
+
+    impl._refresh_failure = None
+    fakes_async.run(impl.refresh_async('token'))
+    _, timings = hook.on_refresh_success.call_args[0]
+    assert list(timings.keys()) == ['total']
@@ -0,0 +1,125 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import threading
+
+import mock
+import pytest
+
+from google.auth import _fork
+from google.oauth2 import credentials
+
+
+def test_lock():
+    lock = _fork.Lock()
+
+    with lock:
+        assert not lock.acquire(False)
+
+    assert lock.acquire(False)
+    lock.release()
+
+
+def test_lock_new_generation():
+    lock = _fork.Lock()
+    lock.acquire()
+
+    with mock.patch('google.auth._fork.generation',
+                    return_value=_fork.generation() + 1):
+        # The lock acquired in the previous generation is replaced.
+        assert lock.acquire(False)
+        lock.release()
+
+
+def test_lock_release_after_new_generation():
+    lock = _fork.Lock()
+    lock.acquire()
+    acquired = lock._held
+
+    with mock.patch('google.auth._fork.generation',
+                    return_value=_fork.generation() + 1):
+        # The lock that was acquired is released, not the replacement.
+        lock.release()
+
+        assert acquired.acquire(False)
+        assert lock.acquire(False)
+        lock.release()
+
+
+def test_lock_release_unacquired():
+    lock = _fork.Lock()
+
+    with pytest.raises(RuntimeError):
+        lock.release()
+
+
+def test_lock_new_generation_swapped_once():
+    lock = _fork.Lock()
+    locks = []
+
+    with mock.patch('google.auth._fork.generation',
+                    return_value=_fork.generation() + 1):
+        threads = [
+            threading.Thread(target=lambda: locks.append(lock._current()))
+            for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(set(id(current) for current in locks)) == 1
+
+
+@pytest.mark.skipif(
+    not hasattr(os, 'fork'), reason='os.fork is not available.')
+def test_fork():  # pragma: NO COVER
+    lock = _fork.Lock()
+    parent_generation = _fork.generation()
+
+    with lock:
+        pid = os.fork()
+        if pid == 0:
+            # In the child, the lock held by the parent is released.
+            ok = (_fork.generation() != parent_generation and
+                  lock.acquire(False))
+            os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status)
+    assert os.WEXITSTATUS(status) == 0
+
+
+@pytest.mark.skipif(
+    not hasattr(os, 'fork'), reason='os.fork is not available.')
+def test_fork_token_writer():  # pragma: NO COVER
+    written = []
+    writer = credentials.TokenWriter(
+        lambda target, update: written.append((target, update)), delay=60)
+    update = credentials.TokenUpdate('token', None, 'refresh_token')
+    # The parent's tokens are still pending when the process forks.
+    writer.submit('parent', update)
+
+    pid = os.fork()
+    if pid == 0:
+        # In the child, only the child's tokens are written.
+        writer._delay = 0
+        writer.submit('child', update)
+        ok = writer.flush(timeout=5) and written == [('child', update)]
+        os._exit(0 if ok else 1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status)
+    assert os.WEXITSTATUS(status) == 0
@@ -14,6 +14,7 @@
 
 import datetime
 
+import mock
 import pytest
 from six.moves import urllib
 
@@ -51,10 +52,74 @@ def test_copy_docstring_non_existing():
         _helpers.copy_docstring(SourceClass)(func2)
 
 
+class FakeClock(_helpers.Clock):
+    def __init__(self):
+        self.now = datetime.datetime(1990, 5, 29)
+        self.mono = 100.0
+
+    def utcnow(self):
+        return self.now
+
+    def time(self):
+        return _helpers.datetime_to_secs(self.now)
+
+    def monotonic(self):
+        return self.mono
+
+    def sleep(self, secs):
+        self.now += datetime.timedelta(seconds=secs)
+        self.mono += secs
+
+
+@pytest.fixture
+def fake_clock():
+    clock = FakeClock()
+    previous = _helpers.set_clock(clock)
+    yield clock
+    _helpers.set_clock(previous)
+
+
 def test_utcnow():
     assert isinstance(_helpers.utcnow(), datetime.datetime)
 
 
+def test_clock():
+    clock = _helpers.Clock()
+    assert isinstance(clock.utcnow(), datetime.datetime)
+    assert isinstance(clock.time(), float)
+    first = clock.monotonic()
+    assert clock.monotonic() >= first
+
+
+def test_set_clock(fake_clock):
+    assert _helpers.get_clock() is fake_clock
+    assert _helpers.utcnow() == fake_clock.now
+    assert _helpers.utcnow_secs() == 643939200
+    assert _helpers.monotonic() == fake_clock.mono
+
+
+def test_expiry_to_deadline(fake_clock):
+    expiry = fake_clock.now + datetime.timedelta(seconds=500)
+    assert _helpers.expiry_to_deadline(expiry) == fake_clock.mono + 500
+
+    expiry = fake_clock.now - datetime.timedelta(seconds=60)
+    assert _helpers.expiry_to_deadline(expiry) == fake_clock.mono - 60
+
+
+def test_sleep(fake_clock):
+    _helpers.sleep(5)
+    assert fake_clock.mono == 105.0
+
+    _helpers.sleep(-1)
+    assert fake_clock.mono == 105.0
+
+
+def test_clock_sleep():
+    with mock.patch('time.sleep') as sleep:
+        _helpers.Clock().sleep(1.5)
+    sleep.assert_called_once_with(1.5)
+
+
 def test_datetime_to_secs():
     assert _helpers.datetime_to_secs(
         datetime.datetime(1970, 1, 1)) == 0
@@ -147,6 +212,8 @@ def test_string_to_scopes():
         ('', []),
         ('a', ['a']),
         ('a b c d e f', ['a', 'b', 'c', 'd', 'e', 'f']),
+        (['a', 'b'], ['a', 'b']),
+        (('a',), ['a']),
     ]
 
     for case, expected in cases:
@@ -0,0 +1,281 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import mock
+import pytest
+
+from google.auth import _refresh
+from google.auth import credentials
+from google.auth import exceptions
+from tests import fakes
+
+
+def test_phase_without_refresh():
+    with _refresh.phase('http') as phase:
+        assert phase is _refresh._NULL_PHASE
+
+
+def test_refresh_method_preserves_docstring():
+    assert fakes.CredentialsImpl.refresh.__doc__ == 'Refresh docstring.'
+
+
+def test_refresh_method_no_hooks():
+    credentials = fakes.CredentialsImpl(phases=('http',))
+    credentials.refresh('token')
+    assert credentials.token == 'token'
+
+
+def test_refresh_method_success():
+    hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+    impl = fakes.CredentialsImpl(phases=('sign', 'http', 'http'))
+    impl.add_refresh_hook(hook)
+
+    impl.refresh('token')
+
+    hook.on_refresh_start.assert_called_once_with(impl)
+    assert hook.on_refresh_success.call_count == 1
+    assert not hook.on_refresh_failure.called
+    _, timings = hook.on_refresh_success.call_args[0]
+    assert sorted(timings.keys()) == ['http', 'sign', 'total']
+    assert timings['total'] >= timings['http'] >= 0
+
+
+def test_refresh_method_failure():
+    hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+    error = ValueError('failed')
+    impl = fakes.CredentialsImpl(phases=('http',), error=error)
+    impl.add_refresh_hook(hook)
+
+    with pytest.raises(ValueError):
+        impl.refresh('token')
+
+    hook.on_refresh_start.assert_called_once_with(impl)
+    assert not hook.on_refresh_success.called
+    _, exc, timings = hook.on_refresh_failure.call_args[0]
+    assert exc is error
+    assert sorted(timings.keys()) == ['http', 'total']
+    # The timings are no longer collected once the refresh has finished.
+    assert _refresh.phase('http') is _refresh._NULL_PHASE
+
+
+def test_refresh_method_hook_error():
+    hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+    hook.on_refresh_start.side_effect = ValueError('hook failed')
+    other_hook = mock.create_autospec(credentials.RefreshHook, instance=True)
+    impl = fakes.CredentialsImpl()
+    impl.add_refresh_hook(hook)
+    impl.add_refresh_hook(other_hook)
+
+    impl.refresh('token')
+
+    assert impl.token == 'token'
+    assert hook.on_refresh_success.called
+    assert other_hook.on_refresh_start.called
+    assert other_hook.on_refresh_success.called
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('google.auth._helpers.monotonic', return_value=100.0) as (
+            monotonic):
+        yield monotonic
+
+
+@pytest.fixture
+def no_jitter():
+    with mock.patch('random.random', return_value=0.0):
+        yield
+
+
+@pytest.mark.usefixtures('no_jitter')
+def test_refresh_method_backs_off(monotonic):
+    error = exceptions.RefreshError('failed')
+    impl = fakes.CredentialsImpl(error=error)
+
+    with pytest.raises(exceptions.RefreshError):
+        impl.refresh('token')
+    assert impl._refresh_failure.failures == 1
+
+    # Refreshing again right away fails without calling the method.
+    impl.error = None
+    with pytest.raises(exceptions.RefreshError) as excinfo:
+        impl.refresh('token')
+    assert excinfo.value is not error
+    assert excinfo.match(r'another 1.0 seconds.*failed')
+    assert impl.token is None
+
+    # Once the delay passed the method is called again.
+    monotonic.return_value = 101.0
+    impl.refresh('token')
+
+    assert impl.token == 'token'
+    assert impl._refresh_failure is None
+
+
+@pytest.mark.usefixtures('no_jitter')
+def test_refresh_method_backoff_increases(monotonic):
+    impl = fakes.CredentialsImpl(error=exceptions.TransportError('failed'))
+
+    for failures in range(1, 10):
+        with pytest.raises(exceptions.TransportError):
+            impl.refresh('token')
+        assert impl._refresh_failure.failures == failures
+        delay = impl._refresh_failure.retry_at - monotonic.return_value
+        assert delay == min(2 ** (failures - 1), _refresh._MAX_BACKOFF_SECS)
+        monotonic.return_value = impl._refresh_failure.retry_at
+
+
+def test_refresh_method_backoff_jitter(monotonic):
+    impl = fakes.CredentialsImpl(error=exceptions.RefreshError('failed'))
+
+    with mock.patch('random.random', return_value=1.0):
+        with pytest.raises(exceptions.RefreshError):
+            impl.refresh('token')
+
+    assert impl._refresh_failure.retry_at == 100.5
+
+
+def test_refresh_method_other_errors_dont_back_off():
+    impl = fakes.CredentialsImpl(error=ValueError())
+
+    with pytest.raises(ValueError):
+        impl.refresh('token')
+
+    assert impl._refresh_failure is None
+
+
+def test_refresh_method_not_rate_limited():
+    # Only requests to the token endpoint count against the rate limit.
+    impl = fakes.CredentialsImpl()
+
+    with mock.patch(
+            'google.auth.throttling.get_refresh_rate_limit') as get_limit:
+        get_limit.return_value.try_acquire.return_value = False
+        impl.refresh('token')
+
+    assert impl.token == 'token'
+
+
+def test_refresh_history_empty():
+    history = _refresh.RefreshHistory()
+
+    assert len(history) == 0
+    assert history.latency_percentile(95) is None
+    assert history.error_rate == 0.0
+
+
+def test_refresh_history_percentiles():
+    history = _refresh.RefreshHistory()
+    for latency in range(1, 11):
+        history.record(float(latency))
+
+    assert len(history) == 10
+    assert history.latency_percentile(50) == 5.0
+    assert history.latency_percentile(95) == 10.0
+    assert history.latency_percentile(0) == 1.0
+
+
+def test_refresh_history_keeps_recent_refreshes():
+    history = _refresh.RefreshHistory(size=4)
+    for _ in range(4):
+        history.record(10.0, failed=True)
+    assert history.error_rate == 1.0
+
+    for _ in range(3):
+        history.record(1.0)
+
+    assert len(history) == 4
+    assert history.error_rate == 0.25
+    assert history.latency_percentile(50) == 1.0
+    assert history.latency_percentile(100) == 10.0
+
+
+def test_refresh_ahead_default():
+    assert _refresh.refresh_ahead(None) == (
+        _refresh._DEFAULT_REFRESH_AHEAD_SECS)
+    assert _refresh.refresh_ahead(_refresh.RefreshHistory()) == (
+        _refresh._DEFAULT_REFRESH_AHEAD_SECS)
+
+
+def test_refresh_ahead_fast_and_reliable():
+    history = _refresh.RefreshHistory()
+    history.record(0.1)
+
+    assert _refresh.refresh_ahead(history) == _refresh._MIN_REFRESH_AHEAD_SECS
+
+
+def test_refresh_ahead_slow():
+    history = _refresh.RefreshHistory()
+    history.record(20.0)
+
+    assert _refresh.refresh_ahead(history) == 40.0
+
+
+def test_refresh_ahead_unreliable():
+    history = _refresh.RefreshHistory(size=10)
+    for failed in (True, False) * 5:
+        history.record(1.0, failed=failed)
+
+    # Seven attempts are needed for one to succeed with 99% probability,
+    # with backoff delays of 1, 2, 4, 8, 16 and 32 seconds between them.
+    assert _refresh.refresh_ahead(history) == 2 * (7 * 1.0 + 63)
+
+
+def test_refresh_ahead_failing():
+    history = _refresh.RefreshHistory()
+    history.record(60.0, failed=True)
+
+    assert _refresh.refresh_ahead(history) == _refresh._MAX_REFRESH_AHEAD_SECS
+
+
+def test_refresh_method_records_history(monotonic):
+    impl = fakes.CredentialsImpl()
+    monotonic.side_effect = [100.0, 102.5]
+
+    impl.refresh('token')
+
+    assert len(impl._refresh_history) == 1
+    assert impl._refresh_history.latency_percentile(50) == 2.5
+    assert impl._refresh_history.error_rate == 0.0
+
+
+def test_refresh_method_cache_hit():
+    impl = fakes.CredentialsImpl()
+    impl._refresh_failure = _refresh._RefreshFailure(1, 0.0, ValueError())
+    refresh = _refresh.refresh_method(
+        lambda credentials, request: _refresh.CACHE_HIT)
+
+    assert refresh(impl, 'token') is None
+    assert impl._refresh_failure is None
+    assert impl._refresh_history is None
+
+
+def test_refresh_method_records_failures(monotonic):
+    impl = fakes.CredentialsImpl(error=exceptions.RefreshError('failed'))
+
+    with pytest.raises(exceptions.RefreshError):
+        impl.refresh('token')
+
+    assert impl._refresh_history.error_rate == 1.0
+
+    # Throttled refreshes and other errors are not recorded.
+    with pytest.raises(exceptions.RefreshError):
+        impl.refresh('token')
+    impl._refresh_failure = None
+    impl.error = ValueError()
+    with pytest.raises(ValueError):
+        impl.refresh('token')
+
+    assert len(impl._refresh_history) == 1
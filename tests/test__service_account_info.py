@@ -14,8 +14,11 @@
 
 import json
 import os
+import pickle
 
+import mock
 import pytest
+import rsa
 import six
 
 from google.auth import _service_account_info
@@ -35,6 +38,22 @@ def test_from_dict():
     assert signer.key_id == SERVICE_ACCOUNT_INFO['private_key_id']
 
 
+def test_from_dict_lazy():
+    signer = _service_account_info.from_dict(SERVICE_ACCOUNT_INFO, lazy=True)
+    assert isinstance(signer, crypt.LazySigner)
+    assert signer.key_id == SERVICE_ACCOUNT_INFO['private_key_id']
+
+
+def test_from_dict_lazy_bad_private_key():
+    info = SERVICE_ACCOUNT_INFO.copy()
+    info['private_key'] = 'garbage'
+
+    with pytest.raises(ValueError) as excinfo:
+        _service_account_info.from_dict(info, lazy=True)
+
+    assert excinfo.match(r'No key could be detected')
+
+
 def test_from_dict_bad_private_key():
     info = SERVICE_ACCOUNT_INFO.copy()
     info['private_key'] = 'garbage'
@@ -61,3 +80,100 @@ def test_from_filename():
 
     assert isinstance(signer, crypt.Signer)
     assert signer.key_id == SERVICE_ACCOUNT_INFO['private_key_id']
+
+
+@pytest.fixture(scope='module')
+def other_private_key():
+    _, private_key = rsa.newkeys(512)
+    return private_key.save_pkcs1().decode('utf-8')
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('google.auth._helpers.monotonic', return_value=100.0) as (
+            monotonic):
+        yield monotonic
+
+
+def _write_info(filename, private_key, key_id):
+    info = SERVICE_ACCOUNT_INFO.copy()
+    info['private_key'] = private_key
+    info['private_key_id'] = key_id
+    filename.write(json.dumps(info))
+
+
+def _expire_check_interval(monotonic):
+    monotonic.return_value += _service_account_info._RELOAD_CHECK_INTERVAL_SECS
+
+
+def test_from_filename_reload():
+    info, signer = _service_account_info.from_filename(
+        SERVICE_ACCOUNT_JSON_FILE, reload=True)
+
+    assert info == SERVICE_ACCOUNT_INFO
+    assert isinstance(signer, _service_account_info.ReloadingSigner)
+    assert signer.key_id == SERVICE_ACCOUNT_INFO['private_key_id']
+
+
+def test_reloading_signer_reloads(tmpdir, monotonic, other_private_key):
+    filename = tmpdir.join('service_account.json')
+    _write_info(filename, SERVICE_ACCOUNT_INFO['private_key'], 'old')
+    _, signer = _service_account_info.from_filename(
+        str(filename), reload=True)
+    # Rotating by replacing the file changes its inode.
+    replacement = tmpdir.join('replacement.json')
+    _write_info(replacement, other_private_key, 'new')
+    replacement.rename(filename)
+
+    # The file isn't checked again right away.
+    signer.sign('message')
+    assert signer.key_id == 'old'
+
+    _expire_check_interval(monotonic)
+    signature = signer.sign('message')
+
+    assert signer.key_id == 'new'
+    expected = crypt.Signer.from_string(other_private_key).sign('message')
+    assert signature == expected
+
+
+def test_reloading_signer_unchanged(tmpdir, monotonic):
+    filename = tmpdir.join('service_account.json')
+    _write_info(filename, SERVICE_ACCOUNT_INFO['private_key'], 'old')
+    _, signer = _service_account_info.from_filename(
+        str(filename), reload=True)
+    _expire_check_interval(monotonic)
+
+    with mock.patch(
+            'google.auth._service_account_info._read') as read_mock:
+        signer.sign('message')
+
+    assert not read_mock.called
+
+
+def test_reloading_signer_keeps_key_on_error(tmpdir, monotonic):
+    filename = tmpdir.join('service_account.json')
+    _write_info(filename, SERVICE_ACCOUNT_INFO['private_key'], 'old')
+    _, signer = _service_account_info.from_filename(
+        str(filename), reload=True)
+    filename.write('{"private_key": ')
+    _expire_check_interval(monotonic)
+
+    signer.sign('message')
+    assert signer.key_id == 'old'
+
+    filename.remove()
+    _expire_check_interval(monotonic)
+
+    signer.sign('message')
+    assert signer.key_id == 'old'
+
+
+def test_reloading_signer_pickle(monotonic):
+    _, signer = _service_account_info.from_filename(
+        SERVICE_ACCOUNT_JSON_FILE, reload=True)
+
+    unpickled = pickle.loads(pickle.dumps(signer))
+
+    assert unpickled.key_id == signer.key_id
+    assert unpickled.sign('message') == signer.sign('message')
@@ -69,6 +69,8 @@ class TestCredentials(object):
 
         assert scoped_credentials.has_scopes(['email'])
         assert not scoped_credentials.requires_scopes
+        assert credentials.with_scopes(['email']) is scoped_credentials
+        assert credentials.with_scopes(['profile']) is not scoped_credentials
 
     @mock.patch(
         'google.auth._helpers.utcnow',
@@ -13,8 +13,17 @@
 # limitations under the License.
 
 import datetime
+import pickle
+import weakref
 
+import mock
+import pytest
+
+from google.auth import _fork
+from google.auth import _refresh
 from google.auth import credentials
+from google.auth import exceptions
+from tests import fakes
 
 
 class CredentialsImpl(credentials.Credentials):
@@ -30,6 +39,18 @@ def test_credentials_constructor():
     assert not credentials.valid
 
 
+def test_subclass_without_slots_has_dict():
+    impl = CredentialsImpl()
+    impl.custom = 'value'
+
+    assert impl.__dict__ == {'custom': 'value'}
+
+
+def test_weakref():
+    impl = CredentialsImpl()
+    assert weakref.ref(impl)() is impl
+
+
 def test_expired_and_valid():
     credentials = CredentialsImpl()
     credentials.token = 'token'
@@ -44,6 +65,64 @@ def test_expired_and_valid():
     assert credentials.expired
 
 
+def test_expired_uses_monotonic_clock():
+    credentials = CredentialsImpl()
+    credentials.token = 'token'
+    credentials.expiry = (
+        datetime.datetime.utcnow() + datetime.timedelta(seconds=60))
+
+    # A jump in the wall clock does not affect expiration.
+    with mock.patch('google.auth._helpers.utcnow') as now:
+        now.return_value = credentials.expiry + datetime.timedelta(days=1)
+        assert credentials.valid
+
+    with mock.patch('google.auth._helpers.monotonic') as now:
+        now.return_value = credentials._token_state.expiry_deadline
+        assert credentials.expired
+        assert not credentials.valid
+
+
+def test_set_token_replaces_state():
+    impl = CredentialsImpl()
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    previous = impl._token_state
+
+    impl._set_token('token', expiry)
+
+    state = impl._token_state
+    assert state is not previous
+    assert previous.token is None
+    assert (state.token, state.expiry) == ('token', expiry)
+    assert state.header == 'Bearer token'
+    assert impl.token == 'token'
+    assert impl.expiry == expiry
+    assert impl.valid
+
+
+def test_token_setter_keeps_expiry():
+    impl = CredentialsImpl()
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    impl._set_token('token', expiry)
+
+    impl.token = 'other'
+
+    assert impl._token_state.token == 'other'
+    assert impl._token_state.expiry == expiry
+    assert impl._token_state.header == 'Bearer other'
+
+
+def test_apply():
+    impl = CredentialsImpl()
+    impl._set_token(b'token', None)
+    headers = {}
+
+    impl.apply(headers)
+    assert headers['authorization'] == 'Bearer token'
+
+    impl.apply(headers, token='other')
+    assert headers['authorization'] == 'Bearer other'
+
+
 def test_before_request():
     credentials = CredentialsImpl()
     request = 'token'
@@ -65,6 +144,294 @@ def test_before_request():
     assert headers['authorization'] == 'Bearer token'
 
 
+def _refresh_ahead(impl):
+    state = impl._token_state
+    return state.expiry_deadline - state.stale_deadline
+
+
+def test_stale():
+    impl = CredentialsImpl()
+    impl.token = 'token'
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    assert not impl.stale
+    assert _refresh_ahead(impl) == _refresh._DEFAULT_REFRESH_AHEAD_SECS
+
+    with mock.patch('google.auth._helpers.monotonic') as now:
+        now.return_value = impl._token_state.stale_deadline
+        assert impl.stale
+        assert impl.valid
+
+
+def test_stale_short_lived_token():
+    impl = CredentialsImpl()
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=60)
+
+    assert 29 < _refresh_ahead(impl) <= 30
+
+
+def test_refresh_stats_default():
+    impl = CredentialsImpl()
+
+    assert impl.refresh_stats == credentials.RefreshStats(
+        refreshes=0, error_rate=0.0, latency_p50=None, latency_p95=None,
+        refresh_ahead=_refresh._DEFAULT_REFRESH_AHEAD_SECS)
+
+
+def test_stale_adapts_to_refresh_history():
+    impl = CredentialsImpl()
+    impl._refresh_history = _refresh.RefreshHistory()
+    impl._refresh_history.record(20.0)
+    impl._refresh_history.record(0.5)
+
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    assert impl.refresh_stats == credentials.RefreshStats(
+        refreshes=2, error_rate=0.0, latency_p50=0.5, latency_p95=20.0,
+        refresh_ahead=40.0)
+    assert _refresh_ahead(impl) == 40.0
+
+
+class FailingCredentialsImpl(CredentialsImpl):
+    def __init__(self, failures):
+        super(FailingCredentialsImpl, self).__init__()
+        self.token = 'stale'
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+        self.failures = failures
+
+    def refresh(self, request):
+        if self.failures:
+            self.failures -= 1
+            raise exceptions.RefreshError('failed')
+        self.token = request
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+
+@pytest.fixture
+def stale_clock():
+    with mock.patch('google.auth._helpers.monotonic') as now:
+        now.return_value = 100.0
+        yield now
+
+
+@pytest.fixture
+def sleep():
+    with mock.patch('google.auth._helpers.sleep') as sleep:
+        yield sleep
+
+
+def test_before_request_stale_refreshes_in_background(stale_clock, sleep):
+    impl = FailingCredentialsImpl(failures=0)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    headers = {}
+
+    impl.before_request('token', 'GET', 'http://example.com', headers)
+
+    # The request goes ahead with the stale token, and the credentials are
+    # refreshed in the background.
+    assert headers['authorization'] == 'Bearer stale'
+    impl._revalidation[1].join()
+    assert impl.token == 'token'
+    assert not impl.stale
+    sleep.assert_not_called()
+
+    impl.before_request('token', 'GET', 'http://example.com', headers)
+    assert headers['authorization'] == 'Bearer token'
+
+
+def test_before_request_stale_refresh_fails(stale_clock, sleep):
+    impl = FailingCredentialsImpl(failures=2)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    headers = {}
+
+    impl.before_request('token', 'GET', 'http://example.com', headers)
+
+    assert headers['authorization'] == 'Bearer stale'
+    impl._revalidation[1].join()
+    assert impl.failures == 0
+    assert impl.token == 'token'
+    assert not impl.stale
+    assert sleep.call_count == 2
+
+
+def test_before_request_stale_while_revalidating(stale_clock):
+    impl = FailingCredentialsImpl(failures=0)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    thread = mock.Mock()
+    thread.is_alive.return_value = True
+    impl._revalidation = (_fork.generation(), thread)
+    headers = {}
+
+    impl.before_request('token', 'GET', 'http://example.com', headers)
+
+    assert headers['authorization'] == 'Bearer stale'
+
+
+def test_before_request_stale_while_refreshing(stale_clock):
+    impl = FailingCredentialsImpl(failures=0)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    headers = {}
+
+    with impl._refresh_lock:
+        impl.before_request('token', 'GET', 'http://example.com', headers)
+
+    assert headers['authorization'] == 'Bearer stale'
+
+
+def test_before_request_expired_refresh_fails(stale_clock):
+    impl = FailingCredentialsImpl(failures=1)
+    stale_clock.return_value = impl._token_state.expiry_deadline
+
+    with pytest.raises(exceptions.RefreshError):
+        impl.before_request('token', 'GET', 'http://example.com', {})
+
+
+def test_revalidate_in_background_stops_when_expired(stale_clock):
+    impl = FailingCredentialsImpl(failures=1)
+    stale_clock.return_value = impl._token_state.expiry_deadline
+
+    impl._revalidate_in_background('token')
+
+    assert impl.failures == 1
+
+
+def test_revalidate_in_background_backs_off(stale_clock, sleep):
+    impl = FailingCredentialsImpl(failures=1)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    impl._refresh_failure = mock.Mock(
+        retry_at=impl._token_state.stale_deadline + 5)
+
+    impl._revalidate_in_background('token')
+
+    sleep.assert_called_once_with(5)
+    assert impl.token == 'token'
+
+
+def test_revalidate_in_background_backs_off_without_failure(
+        stale_clock, sleep):
+    # Refreshes rejected before they start don't record a backoff, the
+    # background refresh must not retry them right away.
+    impl = FailingCredentialsImpl(failures=3)
+    stale_clock.return_value = impl._token_state.stale_deadline
+
+    with mock.patch('random.random', return_value=0.0):
+        impl._revalidate_in_background('token')
+
+    assert [call[0][0] for call in sleep.call_args_list] == [
+        1.0, 2.0, 4.0]
+    assert impl.token == 'token'
+
+
+def test_revalidate_in_background_throttled(stale_clock, sleep):
+    impl = fakes.CredentialsImpl(lifetime=3600)
+    impl.token = 'stale'
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    stale_clock.return_value = impl._token_state.stale_deadline
+    impl._refresh_failure = _refresh._RefreshFailure(
+        1, impl._token_state.stale_deadline + 30,
+        exceptions.RefreshError('failed'))
+
+    def advance(delay):
+        stale_clock.return_value += delay
+
+    sleep.side_effect = advance
+
+    impl._revalidate_in_background('token')
+
+    assert impl.token == 'token'
+    sleep.assert_called_once_with(30)
+
+
+def test_before_request_refreshed_while_waiting():
+    impl = CredentialsImpl()
+
+    def refresh_in_other_thread():
+        # Simulate another thread refreshing the credentials while this one
+        # waits for the lock.
+        impl.token = 'other'
+
+    impl._refresh_lock = mock.MagicMock()
+    impl._refresh_lock.__enter__.side_effect = refresh_in_other_thread
+
+    impl.before_request('token', 'GET', 'http://example.com', {})
+
+    assert impl.token == 'other'
+
+
+def test_refresh_hooks():
+    hook = credentials.RefreshHook()
+    impl = CredentialsImpl()
+
+    impl.add_refresh_hook(hook)
+    assert impl._refresh_hooks == (hook,)
+
+    impl.remove_refresh_hook(hook)
+    assert impl._refresh_hooks == ()
+
+    with pytest.raises(ValueError):
+        impl.remove_refresh_hook(hook)
+
+
+def test_refresh_hook_defaults():
+    hook = credentials.RefreshHook()
+    impl = CredentialsImpl()
+    hook.on_refresh_start(impl)
+    hook.on_refresh_success(impl, {'total': 1.0})
+    hook.on_refresh_failure(impl, ValueError(), {'total': 1.0})
+
+
+def test_pickle():
+    hook = credentials.RefreshHook()
+    impl = CredentialsImpl()
+    impl.token = 'token'
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=60)
+    impl.add_refresh_hook(hook)
+    impl._refresh_history = _refresh.RefreshHistory()
+
+    unpickled = pickle.loads(pickle.dumps(impl))
+
+    assert unpickled.token == 'token'
+    assert unpickled.expiry == impl.expiry
+    assert unpickled.valid
+    assert unpickled._refresh_hooks == ()
+    assert unpickled._refresh_lock is not impl._refresh_lock
+    assert unpickled._refresh_history is None
+
+
+def test_pickle_recomputes_deadline():
+    impl = CredentialsImpl()
+    impl.token = 'token'
+    impl.expiry = datetime.datetime.utcnow() + datetime.timedelta(seconds=60)
+    data = pickle.dumps(impl)
+
+    # The monotonic clock of another process has an unrelated origin.
+    with mock.patch('google.auth._helpers.monotonic', return_value=1e9):
+        unpickled = pickle.loads(data)
+        assert unpickled.valid
+
+    assert unpickled._token_state.expiry_deadline > 1e9
+
+
+class UnpickledAttributeCredentialsImpl(CredentialsImpl):
+    _UNPICKLED_ATTRIBUTES = frozenset(('connection',))
+
+    def __setstate__(self, state):
+        self.connection = None
+        super(UnpickledAttributeCredentialsImpl, self).__setstate__(state)
+
+
+def test_pickle_subclass_unpickled_attributes():
+    impl = UnpickledAttributeCredentialsImpl()
+    impl.connection = 'connection'
+    impl.custom = 'value'
+
+    unpickled = pickle.loads(pickle.dumps(impl))
+
+    assert unpickled.connection is None
+    assert unpickled.custom == 'value'
+    assert 'connection' not in impl.__getstate__()
+
+
 class ScopedCredentialsImpl(credentials.Scoped, CredentialsImpl):
     @property
     def requires_scopes(self):
@@ -89,6 +456,37 @@ def test_scoped_credentials_scopes():
     assert not credentials.has_scopes(['three'])
 
 
+def test_scoped_credentials_derive():
+    impl = ScopedCredentialsImpl()
+    create = mock.Mock(side_effect=CredentialsImpl)
+
+    derived = impl._derive('key', create)
+
+    assert impl._derive('key', create) is derived
+    assert impl._derive('other', create) is not derived
+    assert create.call_count == 2
+
+
+def test_scoped_credentials_pickle():
+    impl = ScopedCredentialsImpl()
+    impl._scopes = ['one']
+    impl._derive('key', CredentialsImpl)
+
+    unpickled = pickle.loads(pickle.dumps(impl))
+
+    assert unpickled.scopes == ['one']
+    assert unpickled._derived_credentials is None
+
+
 def test_scoped_credentials_requires_scopes():
     credentials = ScopedCredentialsImpl()
     assert not credentials.requires_scopes
+
+
+def test_refresh_async_not_implemented():
+    impl = CredentialsImpl()
+
+    with pytest.raises(NotImplementedError) as excinfo:
+        impl.refresh_async('token')
+
+    assert excinfo.match(r'CredentialsImpl')
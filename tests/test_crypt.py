@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import os
+import pickle
 
 import mock
 from pyasn1_modules import pem
@@ -128,6 +129,19 @@ class TestVerifier(object):
         assert isinstance(verifier, crypt.Verifier)
         assert isinstance(verifier._pubkey, rsa.key.PublicKey)
 
+    def test_has_no_dict(self):
+        verifier = crypt.Verifier.from_string(PUBLIC_KEY_BYTES)
+        assert not hasattr(verifier, '__dict__')
+
+    @pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_pickle(self, protocol):
+        signer = crypt.Signer.from_string(PRIVATE_KEY_BYTES)
+        verifier = crypt.Verifier.from_string(PUBLIC_KEY_BYTES)
+
+        unpickled = pickle.loads(pickle.dumps(verifier, protocol))
+
+        assert unpickled.verify(b'foo', signer.sign(b'foo'))
+
     def test_from_string_pub_cert_failure(self):
         cert_bytes = PUBLIC_CERT_BYTES
         true_der = rsa.pem.load_pem(cert_bytes, 'CERTIFICATE')
@@ -139,6 +153,20 @@ class TestVerifier(object):
 
 
 class TestSigner(object):
+    @pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_pickle(self, protocol):
+        signer = crypt.Signer.from_string(PKCS1_KEY_BYTES, key_id='1')
+        verifier = crypt.Verifier.from_string(PUBLIC_KEY_BYTES)
+
+        unpickled = pickle.loads(pickle.dumps(signer, protocol))
+
+        assert unpickled.key_id == '1'
+        assert verifier.verify(b'foo', unpickled.sign(b'foo'))
+
+    def test_has_no_dict(self):
+        signer = crypt.Signer.from_string(PKCS1_KEY_BYTES)
+        assert not hasattr(signer, '__dict__')
+
     def test_from_string_pkcs1(self):
         signer = crypt.Signer.from_string(PKCS1_KEY_BYTES)
         assert isinstance(signer, crypt.Signer)
@@ -184,3 +212,52 @@ class TestSigner(object):
         key_bytes = 'bogus-key'
         with pytest.raises(ValueError):
             crypt.Signer.from_string(key_bytes)
+
+
+class TestLazySigner(object):
+    def test_sign(self):
+        signer = crypt.LazySigner(PKCS8_KEY_BYTES, key_id='1')
+        verifier = crypt.Verifier.from_string(PUBLIC_KEY_BYTES)
+
+        assert signer.key_id == '1'
+        assert verifier.verify(b'foo', signer.sign(b'foo'))
+
+    def test_parses_key_once_on_first_sign(self):
+        with mock.patch(
+                'google.auth.crypt.Signer.from_string',
+                wraps=crypt.Signer.from_string) as from_string:
+            signer = crypt.LazySigner(PKCS1_KEY_BYTES, key_id='1')
+            assert not from_string.called
+
+            signer.sign(b'foo')
+            signer.sign(b'bar')
+
+        from_string.assert_called_once_with(
+            _helpers.from_bytes(PKCS1_KEY_BYTES), key_id='1')
+
+    @pytest.mark.parametrize('protocol', range(pickle.HIGHEST_PROTOCOL + 1))
+    def test_pickle(self, protocol):
+        signer = crypt.LazySigner(PKCS1_KEY_BYTES, key_id='1')
+        signer.sign(b'foo')
+        verifier = crypt.Verifier.from_string(PUBLIC_KEY_BYTES)
+
+        unpickled = pickle.loads(pickle.dumps(signer, protocol))
+
+        assert unpickled.key_id == '1'
+        assert unpickled._signer is None
+        assert verifier.verify(b'foo', unpickled.sign(b'foo'))
+
+    def test_has_no_dict(self):
+        signer = crypt.LazySigner(PKCS1_KEY_BYTES)
+        assert not hasattr(signer, '__dict__')
+
+    def test_bogus_key(self):
+        with pytest.raises(ValueError):
+            crypt.LazySigner('bogus-key')
+
+    def test_bad_key_fails_on_sign(self):
+        # The marker is found, but not at the start of a line.
+        signer = crypt.LazySigner('bogus ' + crypt._PKCS1_MARKER[0])
+
+        with pytest.raises(ValueError):
+            signer.sign(b'foo')
@@ -16,6 +16,7 @@ import base64
 import datetime
 import json
 import os
+import pickle
 
 import mock
 import pytest
@@ -259,6 +260,18 @@ class TestCredentials:
         # Expiration hasn't been set yet
         assert not self.credentials.expired
 
+    def test_pickle(self):
+        self.credentials.refresh(None)
+
+        unpickled = pickle.loads(pickle.dumps(self.credentials))
+
+        assert unpickled.valid
+        assert unpickled.token == self.credentials.token
+        assert unpickled.expiry == self.credentials.expiry
+        unpickled.refresh(None)
+        payload = jwt.decode(unpickled.token, PUBLIC_CERT_BYTES)
+        assert payload['iss'] == self.SERVICE_ACCOUNT_EMAIL
+
     def test_sign_bytes(self):
         to_sign = b'123'
         signature = self.credentials.sign_bytes(to_sign)
@@ -280,9 +293,10 @@ class TestCredentials:
         self.credentials.refresh(None)
         assert not self.credentials.expired
 
-        with mock.patch('google.auth._helpers.utcnow') as now:
-            one_day = datetime.timedelta(days=1)
-            now.return_value = self.credentials.expiry + one_day
+        one_day = datetime.timedelta(days=1).total_seconds()
+        with mock.patch('google.auth._helpers.monotonic') as now:
+            now.return_value = (
+                self.credentials._token_state.expiry_deadline + one_day)
             assert self.credentials.expired
 
     def test_before_request_one_time_token(self):
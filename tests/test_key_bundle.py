@@ -0,0 +1,142 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+
+import mock
+import pytest
+
+from google.auth import key_bundle
+from google.oauth2 import service_account
+
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+SERVICE_ACCOUNT_JSON_FILE = os.path.join(DATA_DIR, 'service_account.json')
+
+with open(SERVICE_ACCOUNT_JSON_FILE, 'r') as fh:
+    SERVICE_ACCOUNT_INFO = json.load(fh)
+
+
+def make_info(index):
+    info = SERVICE_ACCOUNT_INFO.copy()
+    info['client_email'] = 'tenant{}@example.com'.format(index)
+    info['private_key_id'] = 'key{}'.format(index)
+    return info
+
+
+@pytest.fixture
+def bundle_path(tmpdir):
+    path = str(tmpdir.join('bundle.keys'))
+    key_bundle.build(path, [make_info(index) for index in range(50)])
+    return path
+
+
+def test_get_by_client_email(bundle_path):
+    with key_bundle.KeyBundle(bundle_path) as bundle:
+        assert len(bundle) == 50
+        for index in range(50):
+            info = bundle.get(client_email='tenant{}@example.com'.format(
+                index))
+            assert info == make_info(index)
+
+
+def test_get_by_key_id(bundle_path):
+    with key_bundle.KeyBundle(bundle_path) as bundle:
+        assert bundle.get(key_id='key7') == make_info(7)
+        assert bundle.get(
+            client_email='tenant7@example.com', key_id='key7') == (
+                make_info(7))
+        assert bundle.get(
+            client_email='tenant8@example.com', key_id='key7') is None
+
+
+def test_get_missing(bundle_path):
+    with key_bundle.KeyBundle(bundle_path) as bundle:
+        assert bundle.get(client_email='other@example.com') is None
+        assert bundle.get(key_id='other') is None
+
+
+def test_get_requires_field(bundle_path):
+    with key_bundle.KeyBundle(bundle_path) as bundle:
+        with pytest.raises(ValueError):
+            bundle.get()
+
+
+def test_get_hash_collision(tmpdir):
+    path = str(tmpdir.join('bundle.keys'))
+    with mock.patch('google.auth.key_bundle._hash', return_value=1):
+        key_bundle.build(path, [make_info(1), make_info(2)])
+
+        with key_bundle.KeyBundle(path) as bundle:
+            assert bundle.get(client_email='tenant2@example.com') == (
+                make_info(2))
+            assert bundle.get(key_id='key1') == make_info(1)
+
+
+def test_get_duplicate_client_email(tmpdir):
+    path = str(tmpdir.join('bundle.keys'))
+    rotated = make_info(1)
+    rotated['private_key_id'] = 'rotated'
+    key_bundle.build(path, [make_info(1), rotated])
+
+    with key_bundle.KeyBundle(path) as bundle:
+        assert bundle.get(client_email='tenant1@example.com') == make_info(1)
+        assert bundle.get(key_id='rotated') == rotated
+
+
+def test_empty_bundle(tmpdir):
+    path = str(tmpdir.join('bundle.keys'))
+    key_bundle.build(path, [])
+
+    with key_bundle.KeyBundle(path) as bundle:
+        assert len(bundle) == 0
+        assert bundle.get(client_email='tenant1@example.com') is None
+
+
+def test_build_invalid_key(tmpdir):
+    path = str(tmpdir.join('bundle.keys'))
+    info = make_info(1)
+    info['private_key'] = 'garbage'
+
+    with pytest.raises(ValueError):
+        key_bundle.build(path, [info])
+
+    assert not tmpdir.listdir()
+
+
+def test_build_from_files(tmpdir):
+    key_path = tmpdir.join('key.json')
+    key_path.write(json.dumps(make_info(1)))
+    path = str(tmpdir.join('bundle.keys'))
+
+    key_bundle.build_from_files(path, [str(key_path)])
+
+    with key_bundle.KeyBundle(path) as bundle:
+        info = bundle.get(client_email='tenant1@example.com')
+    credentials = service_account.Credentials.from_service_account_info(info)
+    assert credentials._service_account_email == 'tenant1@example.com'
+
+
+def test_not_a_bundle(tmpdir):
+    path = tmpdir.join('bundle.keys')
+    path.write(json.dumps(SERVICE_ACCOUNT_INFO))
+
+    with pytest.raises(ValueError):
+        key_bundle.KeyBundle(str(path))
+
+    path.write('')
+
+    with pytest.raises(ValueError):
+        key_bundle.KeyBundle(str(path))
@@ -0,0 +1,117 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from google.auth import registry
+
+
+@pytest.fixture
+def loader():
+    return mock.Mock(side_effect=lambda tenant_id: object())
+
+
+def test_get_loads_once(loader):
+    tenants = registry.CredentialsRegistry(loader)
+
+    first = tenants.get('tenant')
+    second = tenants.get('tenant')
+
+    assert first is second
+    loader.assert_called_once_with('tenant')
+    assert 'tenant' in tenants
+    assert len(tenants) == 1
+    assert tenants.stats == registry.RegistryStats(
+        hits=1, misses=1, evictions=0, size=1, weight=0)
+
+
+def test_get_loader_error(loader):
+    loader.side_effect = ValueError()
+    tenants = registry.CredentialsRegistry(loader)
+
+    with pytest.raises(ValueError):
+        tenants.get('tenant')
+
+    assert 'tenant' not in tenants
+
+
+def test_get_concurrent_load_keeps_first(loader):
+    tenants = registry.CredentialsRegistry(loader)
+    winner = object()
+
+    def load_while_racing(tenant_id):
+        # Another thread finishes loading the same tenant first.
+        tenants._cache.set(tenant_id, winner)
+        return object()
+
+    loader.side_effect = load_while_racing
+
+    assert tenants.get('tenant') is winner
+    assert tenants.get('tenant') is winner
+
+
+def test_evicts_by_size(loader):
+    tenants = registry.CredentialsRegistry(loader, max_size=2)
+
+    tenants.get('a')
+    tenants.get('b')
+    tenants.get('a')
+    tenants.get('c')
+
+    assert 'a' in tenants
+    assert 'b' not in tenants
+    assert tenants.stats.evictions == 1
+    assert tenants.stats.size == 2
+
+
+def test_evicts_by_weight(loader):
+    tenants = registry.CredentialsRegistry(
+        loader, max_weight=25, weigher=lambda credentials: 10)
+
+    tenants.get('a')
+    tenants.get('b')
+    tenants.get('c')
+
+    assert 'a' not in tenants
+    stats = tenants.stats
+    assert stats.evictions == 1
+    assert stats.size == 2
+    assert stats.weight == 20
+
+
+def test_max_weight_requires_weigher(loader):
+    with pytest.raises(ValueError):
+        registry.CredentialsRegistry(loader, max_weight=10)
+
+
+def test_invalidate(loader):
+    tenants = registry.CredentialsRegistry(loader)
+    first = tenants.get('tenant')
+
+    tenants.invalidate('tenant')
+    tenants.invalidate('other')
+
+    assert tenants.get('tenant') is not first
+    assert loader.call_count == 2
+
+
+def test_clear(loader):
+    tenants = registry.CredentialsRegistry(loader)
+    tenants.get('a')
+    tenants.get('b')
+
+    tenants.clear()
+
+    assert len(tenants) == 0
@@ -0,0 +1,88 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from google.auth import exceptions
+from google.auth import throttling
+
+
+@pytest.fixture
+def monotonic():
+    with mock.patch('google.auth._helpers.monotonic', return_value=100.0) as (
+            monotonic):
+        yield monotonic
+
+
+def test_token_bucket_defaults(monotonic):
+    bucket = throttling.TokenBucket(0.5)
+    assert bucket.capacity == 1
+
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    monotonic.return_value = 102.0
+    assert bucket.try_acquire()
+
+
+def test_token_bucket_burst_and_refill(monotonic):
+    bucket = throttling.TokenBucket(2, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [
+        True, True, True, False]
+
+    monotonic.return_value = 100.5
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+    # The bucket doesn't fill beyond its capacity.
+    monotonic.return_value = 1000.0
+    assert [bucket.try_acquire() for _ in range(4)] == [
+        True, True, True, False]
+
+
+@pytest.mark.parametrize('rate,capacity', [(0, None), (1, 0), (-1, 1)])
+def test_token_bucket_invalid(rate, capacity):
+    with pytest.raises(ValueError):
+        throttling.TokenBucket(rate, capacity)
+
+
+def test_set_refresh_rate_limit():
+    assert throttling.get_refresh_rate_limit() is None
+
+    throttling.set_refresh_rate_limit(10, burst=20)
+    try:
+        limit = throttling.get_refresh_rate_limit()
+        assert limit.rate == 10
+        assert limit.capacity == 20
+    finally:
+        throttling.set_refresh_rate_limit(None)
+
+    assert throttling.get_refresh_rate_limit() is None
+
+
+def test_check_refresh_rate_limit(monotonic):
+    # No limit by default.
+    throttling.check_refresh_rate_limit()
+
+    throttling.set_refresh_rate_limit(1)
+    try:
+        throttling.check_refresh_rate_limit()
+        with pytest.raises(exceptions.RefreshError) as excinfo:
+            throttling.check_refresh_rate_limit()
+    finally:
+        throttling.set_refresh_rate_limit(None)
+
+    assert excinfo.match(r'rate limit')
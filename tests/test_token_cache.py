@@ -0,0 +1,134 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import datetime
+import os
+
+import mock
+import pytest
+
+from google.auth import _helpers
+from google.auth import token_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: NO COVER
+    fcntl = None
+
+
+@pytest.fixture
+def cache(tmpdir):
+    return token_cache.FileTokenCache(str(tmpdir.join('tokens')))
+
+
+def _expiry(seconds):
+    # The cache stores expiration in whole seconds.
+    now = _helpers.utcnow().replace(microsecond=0)
+    return now + datetime.timedelta(seconds=seconds)
+
+
+def test_get_missing(cache):
+    assert cache.get('key') is None
+
+
+def test_set_and_get(cache):
+    expiry = _expiry(3600)
+    cache.set('key', 'token', expiry)
+
+    assert cache.get('key') == ('token', expiry)
+    assert cache.get('other') is None
+
+
+def test_set_replaces(cache):
+    cache.set('key', 'token', _expiry(3600))
+    cache.set('key', 'token2', _expiry(3600))
+
+    token, _ = cache.get('key')
+    assert token == 'token2'
+
+
+def test_set_bytes_token(cache):
+    cache.set('key', b'token', _expiry(3600))
+
+    token, _ = cache.get('key')
+    assert token == u'token'
+
+
+def test_get_about_to_expire(cache):
+    cache.set('key', 'token', _expiry(60))
+    assert cache.get('key') is None
+
+
+def test_get_min_remaining(tmpdir):
+    cache = token_cache.FileTokenCache(str(tmpdir), min_remaining=30)
+    cache.set('key', 'token', _expiry(60))
+    assert cache.get('key') is not None
+
+
+def test_get_corrupt(cache):
+    cache.set('key', 'token', _expiry(3600))
+    with open(cache._path('key', '.json'), 'w') as file_obj:
+        file_obj.write('{not json')
+
+    assert cache.get('key') is None
+
+
+def test_set_failure_removes_temp_file(cache, tmpdir):
+    with mock.patch('google.auth.token_cache._replace',
+                    side_effect=OSError('replace failed')):
+        with pytest.raises(OSError):
+            cache.set('key', 'token', _expiry(3600))
+
+    assert os.listdir(str(tmpdir.join('tokens'))) == []
+
+
+def test_directory_permissions(cache, tmpdir):
+    cache.set('key', 'token', _expiry(3600))
+    mode = os.stat(str(tmpdir.join('tokens'))).st_mode
+    assert mode & 0o077 == 0
+
+
+def test_existing_directory(tmpdir):
+    cache = token_cache.FileTokenCache(str(tmpdir))
+    cache.set('key', 'token', _expiry(3600))
+    assert cache.get('key') is not None
+
+
+def test_unusable_directory(tmpdir):
+    path = tmpdir.join('file')
+    path.write('')
+    cache = token_cache.FileTokenCache(os.path.join(str(path), 'tokens'))
+
+    with pytest.raises(OSError):
+        with cache.lock('key'):
+            pass  # pragma: NO COVER
+
+
+@pytest.mark.skipif(fcntl is None, reason='File locking is not available.')
+def test_lock_is_exclusive(cache):
+    with cache.lock('key'):
+        fd = os.open(cache._path('key', '.lock'), os.O_RDWR)
+        try:
+            with pytest.raises(IOError):
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(fd)
+
+    # The lock is released once the block exits.
+    fd = os.open(cache._path('key', '.lock'), os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    finally:
+        os.close(fd)
@@ -0,0 +1,149 @@
+# Copyright 2016 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import mock
+import pytest
+
+from google.auth import exceptions
+from google.auth import token_sharing
+from tests import fakes
+
+
+def make_credentials(identity='identity'):
+    return fakes.CredentialsImpl(
+        identity=identity, lifetime=3600, token_format='{request}-{count}')
+
+
+@pytest.fixture
+def store():
+    store = token_sharing.TokenStore()
+    token_sharing.set_token_store(store)
+    yield store
+    token_sharing.set_token_store(None)
+
+
+def test_disabled_by_default():
+    assert token_sharing.get_token_store() is None
+    assert token_sharing.shared_token(make_credentials()) is None
+
+
+def test_set_token_store(store):
+    assert token_sharing.get_token_store() is store
+
+
+def test_shared_token_without_identity(store):
+    assert token_sharing.shared_token(make_credentials(identity=None)) is None
+    assert len(store) == 0
+
+
+def test_shared_token_by_identity(store):
+    first = token_sharing.shared_token(make_credentials())
+
+    assert token_sharing.shared_token(make_credentials()) is first
+    assert token_sharing.shared_token(make_credentials('other')) is not first
+    assert len(store) == 2
+
+    store.clear()
+    assert len(store) == 0
+
+
+def test_store_max_size():
+    store = token_sharing.TokenStore(max_size=1)
+    store.shared_token('one')
+    store.shared_token('two')
+
+    assert len(store) == 1
+
+
+@pytest.mark.usefixtures('store')
+def test_equivalent_credentials_share_token():
+    first = make_credentials()
+    second = make_credentials()
+
+    first.refresh('token')
+    second.refresh('token')
+
+    assert first.refreshes == 1
+    assert second.refreshes == 0
+    assert second.token == 'token-1'
+    assert second.expiry == first.expiry
+
+
+def test_tokens_not_shared_without_store():
+    first = make_credentials()
+    second = make_credentials()
+
+    first.refresh('token')
+    second.refresh('token')
+
+    assert first.refreshes == second.refreshes == 1
+
+
+@pytest.mark.usefixtures('store')
+def test_different_credentials_dont_share_token():
+    first = make_credentials()
+    second = make_credentials('other')
+
+    first.refresh('token')
+    second.refresh('token')
+
+    assert second.refreshes == 1
+
+
+@pytest.mark.usefixtures('store')
+def test_refresh_with_shared_token_refreshes():
+    first = make_credentials()
+    second = make_credentials()
+    first.refresh('token')
+    second.refresh('token')
+
+    # The shared token was rejected, so refreshing again gets a new one.
+    second.refresh('other')
+
+    assert second.refreshes == 1
+    assert second.token == 'other-1'
+
+    # The new token is shared in turn.
+    first.refresh('token')
+    assert first.refreshes == 1
+    assert first.token == 'other-1'
+
+
+@pytest.mark.usefixtures('store')
+def test_stale_shared_token_not_used():
+    first = make_credentials()
+    second = make_credentials()
+    first.refresh('token')
+
+    with mock.patch('google.auth._helpers.monotonic') as monotonic:
+        monotonic.return_value = first._token_state.stale_deadline
+        second.refresh('token')
+
+    assert second.refreshes == 1
+
+
+@pytest.mark.usefixtures('store')
+def test_failed_refresh_not_shared():
+    first = make_credentials()
+    shared = token_sharing.shared_token(first)
+
+    with mock.patch.object(
+            fakes.CredentialsImpl, '_set_token',
+            side_effect=exceptions.RefreshError('failed')):
+        with pytest.raises(exceptions.RefreshError):
+            first.refresh('token')
+
+    assert shared.state is None
+    assert shared.lock.acquire(False)
+    shared.lock.release()
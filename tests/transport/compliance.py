@@ -62,6 +62,12 @@ class RequestResponseTests(object):
         assert response.headers['x-test-header'] == 'value'
         assert response.data == b'Basic Content'
 
+    def test_response_has_no_dict(self, server):
+        request = self.make_request()
+        response = request(url=server.url + '/basic', method='GET')
+
+        assert not hasattr(response, '__dict__')
+
     def test_request_timeout(self, server):
         request = self.make_request()
         response = request(url=server.url + '/basic', method='GET', timeout=2)
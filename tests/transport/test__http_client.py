@@ -12,7 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import socket
+import threading
+
+import mock
 import pytest
+from six.moves import BaseHTTPServer
+from six.moves import socketserver
 
 from google.auth import exceptions
 import google.auth.transport._http_client
@@ -24,9 +30,120 @@ class TestRequestResponse(compliance.RequestResponseTests):
     def make_request(self):
         return google.auth.transport._http_client.Request()
 
-    def test_non_http(self):
+    def test_unsupported_scheme(self):
         request = self.make_request()
         with pytest.raises(exceptions.TransportError) as excinfo:
-            request(url='https://{}'.format(compliance.NXDOMAIN), method='GET')
+            request(url='ftp://{}'.format(compliance.NXDOMAIN), method='GET')
+
+        assert excinfo.match('ftp')
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.server.connections.add(self.client_address)
+        body = self.rfile.read(int(self.headers['content-length']))
+        self.send_response(200)
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class KeepAliveServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = KeepAliveServer(('127.0.0.1', 0), KeepAliveHandler)
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def pools():
+    pools = google.auth.transport._http_client._POOLS
+    with mock.patch.dict(pools, clear=True):
+        yield pools
+
+
+def _url(server):
+    return 'http://127.0.0.1:{}/token'.format(server.server_address[1])
+
+
+@pytest.mark.usefixtures('pools')
+def test_connections_are_reused(keep_alive_server):
+    for body in (b'one', b'two', b'three'):
+        request = google.auth.transport._http_client.Request()
+        response = request(
+            url=_url(keep_alive_server), method='POST', body=body)
+        assert response.data == body
+
+    assert len(keep_alive_server.connections) == 1
+
+
+def test_closed_connection_is_replaced(keep_alive_server, pools):
+    request = google.auth.transport._http_client.Request()
+    request(url=_url(keep_alive_server), method='POST', body=b'one')
+
+    # Simulate the server closing the idle connection.
+    pool, = pools.values()
+    pool._idle[0].sock.shutdown(socket.SHUT_RDWR)
+
+    response = request(url=_url(keep_alive_server), method='POST', body=b'two')
+
+    assert response.data == b'two'
+    assert len(keep_alive_server.connections) == 2
+
+
+def test_connections_discarded_after_fork(keep_alive_server, pools):
+    request = google.auth.transport._http_client.Request()
+    request(url=_url(keep_alive_server), method='POST', body=b'one')
+    assert len(pools) == 1
+
+    with mock.patch(
+            'google.auth._fork.generation', return_value=object()):
+        request(url=_url(keep_alive_server), method='POST', body=b'two')
+
+    assert len(keep_alive_server.connections) == 2
+
+
+def test_idle_connections_bounded():
+    pool = google.auth.transport._http_client._ConnectionPool(
+        'http', 'localhost')
+    connections = [mock.Mock() for _ in range(
+        google.auth.transport._http_client._MAX_IDLE_CONNECTIONS + 1)]
+
+    for connection in connections:
+        pool.put(connection)
+
+    assert len(pool._idle) == (
+        google.auth.transport._http_client._MAX_IDLE_CONNECTIONS)
+    assert connections[-1].close.called
+
+
+def test_https_connection_resumes_tls_session():
+    pool = google.auth.transport._http_client._ConnectionPool(
+        'https', 'localhost')
+    connection = pool.connect(timeout=1)
+    pool.tls_session = mock.sentinel.session
+    connection._create_connection = mock.Mock()
+
+    with mock.patch.object(
+            google.auth.transport._http_client._tls_context(),
+            'wrap_socket') as wrap_socket:
+        connection.connect()
 
-        assert excinfo.match('https')
+    wrap_socket.assert_called_once_with(
+        connection._create_connection.return_value,
+        server_hostname='localhost',
+        session=mock.sentinel.session)